@@ -0,0 +1,300 @@
+"""
+Análises em memória sobre um snapshot colunar dos chamados
+
+Os chamados (com cliente, responsável, categoria e status) são lidos do banco numa varredura
+só, uma vez por versão dos dados, para colunas do pandas/NumPy: nomes como categóricos, datas
+como número do dia e as marcas de status/escopo como booleanos. Os gráficos do Dashboard
+(status, categoria, cliente) e as métricas de tempo de resolução (percentis, faixas de idade
+dos abertos, quebras por cliente e categoria) filtram e agrupam sobre esses arrays, sem voltar
+ao banco a cada mudança de filtro. O snapshot e os resultados ficam no cache (em_cache),
+compartilhados entre as sessões, até a próxima escrita no banco.
+"""
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from database import get_db, em_cache
+
+SLA_DIAS = int(os.environ.get('BI_SLA_DIAS', '7'))   # prazo de resolução, em dias
+PERCENTIS = (50, 75, 90, 95)
+
+# Faixas de idade dos chamados abertos: (até N dias, rótulo); a última não tem limite
+FAIXAS_IDADE = [
+    (7, "até 7 dias"),
+    (15, "8 a 15 dias"),
+    (30, "16 a 30 dias"),
+    (60, "31 a 60 dias"),
+    (90, "61 a 90 dias"),
+    (None, "mais de 90 dias"),
+]
+
+GRUPOS_SLA = ('categoria', 'cliente', 'responsavel')
+
+SEM_DATA = -1   # abertura/resolucao do snapshot: sem data (ou data inválida)
+
+_EPOCA = date(1970, 1, 1)
+
+def _dia(valor):
+    """date ou 'AAAA-MM-DD' -> número do dia (dias desde 1970, a escala das colunas do snapshot)"""
+    return (date.fromisoformat(str(valor)[:10]) - _EPOCA).days
+
+def _categorico(codigos, nomes):
+    """Categórico a partir de ids do banco: codigos são posições em nomes (-1 = sem valor)"""
+    return pd.Categorical.from_codes(codigos, categories=pd.Index(nomes, dtype=object))
+
+def _posicoes(ids_tabela, ids):
+    """ids do banco -> posição na tabela de códigos, por indexação (id que não existe mais fica -1)"""
+    tabela = np.full(max(int(ids_tabela.max(initial=0)), int(ids.max(initial=0))) + 1, -1, dtype=np.int32)
+    tabela[ids_tabela] = np.arange(len(ids_tabela), dtype=np.int32)
+    return tabela[ids]
+
+def _marca(valores, posicao):
+    """Marca (critico, geral...) de cada chamado pela posição na tabela de códigos; -1 = False"""
+    return np.append(np.asarray(valores, dtype=bool), False)[posicao]
+
+@em_cache
+def carregar_chamados():
+    """
+    Snapshot de todos os chamados em colunas:
+      cliente, responsavel, categoria, status: categóricos (responsável é o atual do cliente;
+        chamado de cliente apagado fica sem cliente e com responsável '', como nas séries)
+      abertura, resolucao: número do dia (SEM_DATA = sem data; resolucao também em abertos)
+      resolvido: tem data_resolucao (o critério das tabelas de resumo)
+      critico, normal: marcas do status atual; critico_efetivo: do status original (ou atual)
+      escopo_kpi: fora da categoria Geral e sem observação N/A (o escopo de obter_estatisticas)
+      problema: escopo_kpi e fora do checklist pelo status efetivo (o escopo dos KPIs de
+        chamados e das séries), com data de abertura
+    Fica no cache até a próxima escrita no banco.
+    """
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None   # tuplas: nada de um sqlite3.Row por chamado
+        cursor.execute("SELECT id, nome, IFNULL(classificacao, '') FROM clientes ORDER BY id")
+        clientes = cursor.fetchall()
+        cursor.execute("SELECT id, nome, geral FROM categorias ORDER BY id")
+        categorias = cursor.fetchall()
+        cursor.execute("SELECT id, nome, critico, checklist, normal FROM status_chamado ORDER BY id")
+        status = cursor.fetchall()
+        # julianday('1970-01-01') = 2440587.5, então a diferença já é o número do dia
+        cursor.execute(f"""
+            SELECT cliente_id, categoria_id, status_id, IFNULL(NULLIF(status_original_id, 0), status_id),
+                   IFNULL(observacao != 'N/A', 0), NULLIF(data_resolucao, '') IS NOT NULL,
+                   IFNULL(CAST(julianday(data_abertura) - 2440587.5 AS INTEGER), {SEM_DATA}),
+                   IFNULL(CAST(julianday(NULLIF(data_resolucao, '')) - 2440587.5 AS INTEGER), {SEM_DATA})
+            FROM chamados
+        """)
+        linhas = np.array(cursor.fetchall(), dtype=np.int32).reshape(-1, 8)
+
+    cliente = _posicoes(np.array([c[0] for c in clientes], dtype=np.int32), linhas[:, 0])
+    categoria = _posicoes(np.array([c[0] for c in categorias], dtype=np.int32), linhas[:, 1])
+    ids_status = np.array([s[0] for s in status], dtype=np.int32)
+    status_atual = _posicoes(ids_status, linhas[:, 2])
+    status_efetivo = _posicoes(ids_status, linhas[:, 3])
+    responsaveis, responsavel_cliente = np.unique([c[2] for c in clientes] + [''], return_inverse=True)
+    responsavel = np.where(cliente >= 0, responsavel_cliente[cliente], responsavel_cliente[-1])
+
+    escopo_kpi = linhas[:, 4].astype(bool) & ~_marca([c[2] for c in categorias], categoria)
+    checklist = _marca([s[3] for s in status], status_efetivo)
+    return pd.DataFrame({
+        'cliente': _categorico(cliente, [c[1] for c in clientes]),
+        'responsavel': _categorico(responsavel, responsaveis),
+        'categoria': _categorico(categoria, [c[1] for c in categorias]),
+        'status': _categorico(status_atual, [s[1] for s in status]),
+        'abertura': linhas[:, 6],
+        'resolucao': linhas[:, 7],
+        'resolvido': linhas[:, 5].astype(bool),
+        'critico': _marca([s[2] for s in status], status_atual),
+        'critico_efetivo': _marca([s[2] for s in status], status_efetivo),
+        'normal': _marca([s[4] for s in status], status_atual),
+        'escopo_kpi': escopo_kpi,
+        'problema': escopo_kpi & ~checklist & (linhas[:, 6] != SEM_DATA),
+    })
+
+def _contagem(coluna, mascara):
+    """Chamados de mascara por código do categórico coluna (os sem valor ficam de fora)"""
+    codigos = coluna.cat.codes.to_numpy()
+    return np.bincount(codigos[mascara & (codigos >= 0)], minlength=len(coluna.cat.categories))
+
+def _filtro_responsaveis(chamados, responsaveis):
+    """Máscara dos chamados cujo responsável está em responsaveis (None = todos)"""
+    if responsaveis is None:
+        return np.ones(len(chamados), dtype=bool)
+    return chamados['responsavel'].isin(list(responsaveis)).to_numpy()
+
+@em_cache
+def totais_por_status():
+    """
+    Chamados por status atual (fora dos status normais), no escopo de obter_estatisticas:
+    DataFrame Status/Quantidade em ordem de nome, só com os status que têm chamados.
+    """
+    chamados = carregar_chamados()
+    mascara = chamados['escopo_kpi'].to_numpy() & ~chamados['normal'].to_numpy()
+    quantidade = _contagem(chamados['status'], mascara)
+    tabela = pd.DataFrame({'Status': chamados['status'].cat.categories, 'Quantidade': quantidade})
+    return tabela[quantidade > 0].sort_values('Status').reset_index(drop=True)
+
+def _criticos_por(chamados, grupo, mascara):
+    """
+    Abertos com status atual crítico e resolvidos com status efetivo crítico por grupo
+    (a regra dos gráficos de categoria e de cliente), em ordem de nome
+    """
+    resolvido = chamados['resolvido'].to_numpy()
+    critico = chamados['critico'].to_numpy()
+    critico_efetivo = chamados['critico_efetivo'].to_numpy()
+    tabela = pd.DataFrame({
+        grupo: chamados[grupo].cat.categories,
+        'abertos': _contagem(chamados[grupo], mascara & critico & ~resolvido),
+        'resolvidos': _contagem(chamados[grupo], mascara & critico_efetivo & resolvido),
+        'criticos': _contagem(chamados[grupo], mascara & (critico | critico_efetivo)),
+    })
+    return tabela.sort_values(grupo).reset_index(drop=True)
+
+@em_cache
+def totais_por_categoria():
+    """
+    Chamados críticos abertos e resolvidos por categoria, no escopo de obter_estatisticas:
+    DataFrame categoria/abertos/resolvidos com as categorias que têm chamados críticos.
+    """
+    chamados = carregar_chamados()
+    tabela = _criticos_por(chamados, 'categoria', chamados['escopo_kpi'].to_numpy())
+    return tabela[tabela['criticos'] > 0].drop(columns='criticos').reset_index(drop=True)
+
+@em_cache
+def totais_por_cliente(responsaveis=None, busca=None):
+    """
+    Chamados críticos abertos e resolvidos por cliente (todos os chamados, como
+    listar_totais_por_cliente): DataFrame cliente/abertos/resolvidos só com os clientes que
+    têm algum. responsaveis: classificações aceitas (None = todas); busca: trecho do nome
+    do cliente (case insensitive).
+    """
+    chamados = carregar_chamados()
+    mascara = _filtro_responsaveis(chamados, responsaveis)
+    if busca:
+        nomes = chamados['cliente'].cat.categories.str.contains(busca.strip(), case=False, regex=False)
+        mascara = mascara & _marca(nomes, chamados['cliente'].cat.codes.to_numpy())
+    tabela = _criticos_por(chamados, 'cliente', mascara).drop(columns='criticos')
+    return tabela[(tabela['abertos'] > 0) | (tabela['resolvidos'] > 0)].reset_index(drop=True)
+
+def _selecao(tempos, data_inicio, data_fim, categoria, responsaveis):
+    """
+    Máscaras (chamados de problema resolvidos no período, abertos no fim do período) e o dia
+    de referência (data_fim, ou hoje), já com os filtros de categoria e responsável.
+    """
+    referencia = _dia(data_fim or date.today())
+    abertura = tempos['abertura'].to_numpy()
+    resolucao = tempos['resolucao'].to_numpy()
+    filtro = tempos['problema'].to_numpy() & _filtro_responsaveis(tempos, responsaveis)
+    if categoria:
+        filtro &= (tempos['categoria'] == categoria).to_numpy()
+    resolvidos = filtro & (resolucao != SEM_DATA) & (resolucao <= referencia)
+    if data_inicio:
+        resolvidos &= resolucao >= _dia(data_inicio)
+    abertos = filtro & (abertura <= referencia) & ((resolucao == SEM_DATA) | (resolucao > referencia))
+    return resolvidos, abertos, referencia
+
+def _duracoes(tempos):
+    """Dias até a resolução (resolução antes da abertura conta 0, como nas séries)"""
+    return np.maximum(tempos['resolucao'].to_numpy() - tempos['abertura'].to_numpy(), 0)
+
+def _percentis_por_grupo(codigos, dias, n_grupos):
+    """
+    Percentis (PERCENTIS) de dias em cada grupo, sem groupby: uma ordenação só pela chave
+    grupo * (maior + 1) + dias deixa cada grupo contíguo e em ordem, e o percentil "de baixo"
+    do grupo é o elemento início + (n - 1) * p // 100. Retorna ({p: array}, contagem); grupos
+    vazios ficam NaN.
+    """
+    contagem = np.bincount(codigos, minlength=n_grupos)
+    base = int(dias.max(initial=0)) + 1
+    ordenados = np.sort(codigos.astype(np.int64) * base + dias) % base
+    inicio = np.cumsum(contagem) - contagem
+    com_dados = contagem > 0
+    percentis = {}
+    for p in PERCENTIS:
+        valores = np.full(n_grupos, np.nan)
+        posicao = inicio[com_dados] + (contagem[com_dados] - 1) * p // 100
+        valores[com_dados] = ordenados[posicao]
+        percentis[p] = valores
+    return percentis, contagem
+
+@em_cache
+def resumo_sla(data_inicio=None, data_fim=None, categoria=None, responsaveis=None, sla_dias=SLA_DIAS):
+    """
+    Tempo de resolução dos chamados resolvidos no período e situação dos abertos no fim dele.
+
+    Args:
+        data_inicio, data_fim: intervalo inclusivo de data_resolucao (date ou 'AAAA-MM-DD');
+            data_fim também é o dia em que os abertos são contados (padrão: hoje)
+        categoria: nome da categoria (None = todas)
+        responsaveis: classificações aceitas (None = todas; '' = sem responsável)
+        sla_dias: prazo de resolução
+
+    Returns:
+        dict com resolvidos, media_dias, percentis {50: dias, ...} (None sem resolvidos;
+        percentil "de baixo", sem interpolar: sempre um tempo que aconteceu), dentro_sla
+        (% resolvidos no prazo), abertos e abertos_acima_sla
+    """
+    tempos = carregar_chamados()
+    resolvidos, abertos, referencia = _selecao(tempos, data_inicio, data_fim, categoria, responsaveis)
+    duracoes = _duracoes(tempos)[resolvidos]
+    idades = referencia - tempos['abertura'].to_numpy()[abertos]
+    percentis, _ = _percentis_por_grupo(np.zeros(duracoes.size, dtype=np.int64), duracoes, 1)
+    tem_resolvidos = duracoes.size > 0
+    return {
+        'resolvidos': int(duracoes.size),
+        'media_dias': float(duracoes.mean()) if tem_resolvidos else None,
+        'percentis': {p: int(valores[0]) if tem_resolvidos else None for p, valores in percentis.items()},
+        'dentro_sla': float((duracoes <= sla_dias).mean() * 100) if tem_resolvidos else None,
+        'abertos': int(idades.size),
+        'abertos_acima_sla': int((idades > sla_dias).sum()),
+    }
+
+@em_cache
+def envelhecimento(data_fim=None, categoria=None, responsaveis=None):
+    """Chamados abertos em data_fim (padrão: hoje) por faixa de idade (FAIXAS_IDADE), em ordem"""
+    tempos = carregar_chamados()
+    _, abertos, referencia = _selecao(tempos, None, data_fim, categoria, responsaveis)
+    idades = referencia - tempos['abertura'].to_numpy()[abertos]
+    limites = [limite for limite, _ in FAIXAS_IDADE if limite is not None]
+    contagem = np.bincount(np.searchsorted(limites, idades, side='left'), minlength=len(FAIXAS_IDADE))
+    return pd.DataFrame({'faixa': [rotulo for _, rotulo in FAIXAS_IDADE], 'abertos': contagem})
+
+@em_cache
+def sla_por(grupo, data_inicio=None, data_fim=None, categoria=None, responsaveis=None, sla_dias=SLA_DIAS):
+    """
+    resumo_sla quebrado por 'categoria', 'cliente' ou 'responsavel': um DataFrame com o grupo,
+    resolvidos, media_dias, p50...p95, dentro_sla, abertos e abertos_acima_sla, só com os
+    grupos que têm resolvidos ou abertos, piores primeiro (mais abertos acima do prazo, maior p90).
+    """
+    if grupo not in GRUPOS_SLA:
+        raise ValueError(f"Grupo desconhecido: {grupo} (use {', '.join(GRUPOS_SLA)})")
+    tempos = carregar_chamados()
+    resolvidos, abertos, referencia = _selecao(tempos, data_inicio, data_fim, categoria, responsaveis)
+    codigos = tempos[grupo].cat.codes.to_numpy().astype(np.int64)
+    nomes = tempos[grupo].cat.categories
+    resolvidos &= codigos >= 0   # chamado de cliente apagado não entra na quebra por cliente
+    abertos &= codigos >= 0
+
+    dias = _duracoes(tempos)[resolvidos]
+    codigos_resolvidos = codigos[resolvidos]
+    percentis, n_resolvidos = _percentis_por_grupo(codigos_resolvidos, dias, len(nomes))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.bincount(codigos_resolvidos, weights=dias, minlength=len(nomes)) / n_resolvidos
+        dentro_sla = np.bincount(codigos_resolvidos[dias <= sla_dias], minlength=len(nomes)) / n_resolvidos * 100
+    idades = referencia - tempos['abertura'].to_numpy()[abertos]
+    codigos_abertos = codigos[abertos]
+    n_abertos = np.bincount(codigos_abertos, minlength=len(nomes))
+
+    tabela = pd.DataFrame({
+        grupo: nomes,
+        'resolvidos': n_resolvidos,
+        'media_dias': media,
+        **{f'p{p}': valores for p, valores in percentis.items()},
+        'dentro_sla': dentro_sla,
+        'abertos': n_abertos,
+        'abertos_acima_sla': np.bincount(codigos_abertos[idades > sla_dias], minlength=len(nomes)),
+    })
+    tabela = tabela[(n_resolvidos > 0) | (n_abertos > 0)]
+    tabela = tabela.sort_values(['abertos_acima_sla', 'p90'], ascending=False, na_position='last')
+    return tabela.reset_index(drop=True)
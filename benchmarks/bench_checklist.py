@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""benchmarks/bench_checklist.py
+
+Compara o atualizar_cliente_checklist() antigo (apaga e recria todos os chamados de checklist
+do cliente a cada gravação) com o atual (grava só a diferença) em N gravações seguidas.
+
+Mede gravações por segundo e o crescimento da tabela: ids consumidos do AUTOINCREMENT,
+linhas de chamados e tamanho do arquivo. A maior parte das gravações repete o estado
+atual (o usuário clica em salvar sem mudar nada); as demais mudam uma categoria.
+
+Uso:
+  python benchmarks/bench_checklist.py                      # 10.000 gravações
+  python benchmarks/bench_checklist.py --gravacoes 2000 --chamados 20000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import database  # noqa: E402
+from gerador import gerar_base  # noqa: E402
+
+
+def checklist_antigo(cliente_id, status_geral, categorias):
+    """Algoritmo original (apaga tudo e recria), mantido como referência"""
+    with database.get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            DELETE FROM chamados
+            WHERE cliente_id = ?
+            AND data_resolucao IS NULL
+            AND status_id IN (SELECT id FROM status_chamado WHERE checklist = 1)
+        """, (cliente_id,))
+        hoje = datetime.now().date().isoformat()
+        status_geral_id = database._id_status(cursor, status_geral)
+        cursor.execute("""
+            INSERT INTO chamados (cliente_id, status_id, categoria_id, observacao, data_abertura)
+            VALUES (?, ?, ?, ?, ?)
+        """, (cliente_id, status_geral_id, database._id_categoria(cursor, "Geral"), "Status geral do cliente", hoje))
+        for categoria, estado in categorias.items():
+            if estado == "✓ OK":
+                continue
+            if estado == "N/A":
+                status_id, observacao = status_geral_id, "N/A"
+            elif "🛠" in estado or "Em Construção" in estado:
+                status_id, observacao = database._id_status(cursor, database.STATUS_CONSTRUCAO), f"Atualizado via checklist: {estado}"
+            else:
+                status_id, observacao = status_geral_id, f"Atualizado via checklist: {estado}"
+            cursor.execute("""
+                INSERT INTO chamados (cliente_id, status_id, categoria_id, observacao, data_abertura)
+                VALUES (?, ?, ?, ?, ?)
+            """, (cliente_id, status_id, database._id_categoria(cursor, categoria), observacao, hoje))
+
+
+def gerar_gravacoes(db_path, n_gravacoes, n_clientes_editados, seed=7):
+    """Sequência de gravações [(cliente_id, status_geral, categorias)] a partir do estado atual da base"""
+    database.DB_PATH = db_path
+    rnd = random.Random(seed)
+    clientes = rnd.sample(range(1, n_clientes_editados * 4 + 1), n_clientes_editados)
+    estados = {
+        cliente_id: (status_geral, dict(categorias))
+        for cliente_id, (status_geral, categorias) in database.obter_estados_checklist.__wrapped__(clientes).items()
+    }
+    database.fechar_conexoes()
+    gravacoes = []
+    for _ in range(n_gravacoes):
+        cliente_id = rnd.choice(clientes)
+        status_geral, categorias = estados[cliente_id]
+        if rnd.random() < 0.3:
+            categorias[rnd.choice(list(categorias))] = rnd.choice(database.ESTADOS_CHECKLIST)
+        gravacoes.append((cliente_id, status_geral, dict(categorias)))
+    return gravacoes
+
+
+def medir(db_path, funcao, gravacoes):
+    """Aplica as gravações (uma transação cada) e retorna tempo, ids consumidos, linhas e bytes a mais"""
+    database.DB_PATH = db_path
+    database.fechar_conexoes()
+
+    def contagens():
+        with database.get_db() as conn:
+            seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'chamados'").fetchone()[0]
+            linhas = conn.execute("SELECT COUNT(*) FROM chamados").fetchone()[0]
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return seq, linhas, os.path.getsize(db_path)
+
+    antes = contagens()
+    t0 = time.perf_counter()
+    for cliente_id, status_geral, categorias in gravacoes:
+        funcao(cliente_id, status_geral, categorias)
+    segundos = time.perf_counter() - t0
+    depois = contagens()
+    estados = database.obter_estados_checklist.__wrapped__(sorted({g[0] for g in gravacoes}))
+    database.fechar_conexoes()
+    return segundos, [d - a for a, d in zip(antes, depois)], estados
+
+
+def copiar_banco(origem, destino):
+    src = sqlite3.connect(origem)
+    dst = sqlite3.connect(destino)
+    with dst:
+        src.backup(dst)
+    src.close()
+    dst.close()
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description='Benchmark de atualizar_cliente_checklist')
+    p.add_argument('--clientes', type=int, default=2000)
+    p.add_argument('--chamados', type=int, default=50_000)
+    p.add_argument('--gravacoes', type=int, default=10_000)
+    p.add_argument('--editados', type=int, default=200, help='Clientes distintos que recebem as gravações')
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, 'base.db')
+        gerar_base(base, args.clientes, args.chamados)
+        database.fechar_conexoes()
+        gravacoes = gerar_gravacoes(base, args.gravacoes, min(args.editados, args.clientes // 4))
+
+        resultados = {}
+        for nome, funcao in (('antigo', checklist_antigo), ('atual', database.atualizar_cliente_checklist)):
+            db_path = os.path.join(tmp, f'{nome}.db')
+            copiar_banco(base, db_path)
+            resultados[nome] = medir(db_path, funcao, gravacoes)
+
+    if resultados['antigo'][2] != resultados['atual'][2]:
+        print('❌ Checklists diferentes entre as implementações!', file=sys.stderr)
+        sys.exit(1)
+    print(f"{args.gravacoes} gravações em {len({g[0] for g in gravacoes})} clientes")
+    print(f"{'':22}{'gravações/s':>12}{'ids usados':>12}{'linhas':>10}{'KB':>10}")
+    for nome, rotulo in (('antigo', 'Antigo (recria tudo)'), ('atual', 'Atual  (diferença)')):
+        segundos, (ids, linhas, tamanho), _ = resultados[nome]
+        print(f"{rotulo:22}{args.gravacoes / segundos:12.0f}{ids:12d}{linhas:10d}{tamanho / 1024:10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""benchmarks/bench_estatisticas.py
+
+Compara o obter_estatisticas() antigo (seis consultas separadas) com o atual
+(leitura das tabelas de resumo mantidas por triggers) numa base gerada por gerador.py.
+
+Uso:
+  python benchmarks/bench_estatisticas.py                  # 1.000.000 chamados
+  python benchmarks/bench_estatisticas.py --chamados 100000 --repeticoes 3
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import database  # noqa: E402
+from gerador import gerar_base  # noqa: E402
+
+
+def estatisticas_antigas(conn):
+    """Algoritmo original (uma consulta por métrica), mantido como referência"""
+    cursor = conn.cursor()
+    criticos = "(SELECT id FROM status_chamado WHERE critico = 1)"
+    checklist = "(SELECT id FROM status_chamado WHERE checklist = 1)"
+    normal = "(SELECT id FROM status_chamado WHERE normal = 1)"
+    geral = "(SELECT id FROM categorias WHERE geral = 1)"
+    cursor.execute("SELECT COUNT(*) as total FROM clientes WHERE ativo = 1")
+    total_clientes = cursor.fetchone()['total']
+    cursor.execute(f"""
+        SELECT COUNT(*) as total FROM chamados
+        WHERE status_id NOT IN {normal}
+            AND status_id NOT IN {checklist}
+            AND categoria_id NOT IN {geral}
+            AND observacao != 'N/A'
+    """)
+    chamados_abertos = cursor.fetchone()['total']
+    cursor.execute(f"SELECT COUNT(*) as total FROM chamados WHERE data_resolucao IS NOT NULL AND categoria_id NOT IN {geral} AND observacao != 'N/A'")
+    chamados_resolvidos = cursor.fetchone()['total']
+    cursor.execute(f"SELECT COUNT(DISTINCT cliente_id) as total FROM chamados WHERE status_id IN {checklist}")
+    sem_integracao = cursor.fetchone()['total']
+    cursor.execute(f"""
+        SELECT s.nome as status, COUNT(*) as total
+        FROM chamados ch JOIN status_chamado s ON s.id = ch.status_id
+        WHERE ch.status_id NOT IN {normal}
+            AND ch.categoria_id NOT IN {geral}
+            AND ch.observacao != 'N/A'
+        GROUP BY s.nome
+    """)
+    por_status = {row['status']: row['total'] for row in cursor.fetchall()}
+    cursor.execute(f"""
+          SELECT cat.nome as categoria,
+                SUM(CASE
+                      WHEN ch.status_id IN {criticos}
+                          AND ch.data_resolucao IS NULL
+                          AND ch.observacao != 'N/A' THEN 1
+                      ELSE 0 END) as abertos,
+                SUM(CASE
+                      WHEN ch.data_resolucao IS NOT NULL
+                          AND COALESCE(ch.status_original_id, ch.status_id) IN {criticos}
+                          AND ch.observacao != 'N/A' THEN 1
+                      ELSE 0 END) as resolvidos
+          FROM chamados ch JOIN categorias cat ON cat.id = ch.categoria_id
+          WHERE (ch.status_id IN {criticos} OR COALESCE(ch.status_original_id, ch.status_id) IN {criticos})
+            AND ch.categoria_id NOT IN {geral}
+            AND ch.observacao != 'N/A'
+          GROUP BY cat.nome
+       """)
+    por_categoria = [dict(row) for row in cursor.fetchall()]
+    return {
+        'total_clientes': total_clientes,
+        'chamados_abertos': chamados_abertos,
+        'chamados_resolvidos': chamados_resolvidos,
+        'sem_integracao': sem_integracao,
+        'por_status': por_status,
+        'por_categoria': por_categoria
+    }
+
+
+def cronometrar(func, repeticoes):
+    """Retorna (melhor tempo em segundos, último resultado)"""
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        resultado = func()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor, resultado
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description='Benchmark de obter_estatisticas')
+    p.add_argument('--clientes', type=int, default=5000)
+    p.add_argument('--chamados', type=int, default=1_000_000)
+    p.add_argument('--repeticoes', type=int, default=5)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        t0 = time.perf_counter()
+        gerar_base(db_path, args.clientes, args.chamados)
+        print(f"Base gerada: {args.chamados} chamados em {time.perf_counter() - t0:.1f}s")
+
+        def antigo():
+            with database.get_db() as conn:
+                return estatisticas_antigas(conn)
+
+        t_antigo, r_antigo = cronometrar(antigo, args.repeticoes)
+        t_novo, r_novo = cronometrar(database.obter_estatisticas.__wrapped__, args.repeticoes)  # sem o cache
+        database.fechar_conexoes()
+
+    if r_antigo != r_novo:
+        print('❌ Resultados diferentes entre as implementações!', file=sys.stderr)
+        sys.exit(1)
+    print(f"Antigo (6 consultas): {t_antigo * 1000:8.1f} ms")
+    print(f"Atual  (resumo):      {t_novo * 1000:8.1f} ms")
+    print(f"Ganho: {t_antigo / t_novo:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
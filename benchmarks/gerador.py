@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""benchmarks/gerador.py
+
+Gera um integracoes.db sintético e determinístico (mesma semente = mesmo banco) para os
+benchmarks, com distribuições parecidas com as da base real:
+
+- responsáveis: Guilherme 45%, Eduardo 35%, Marcelo 20%
+- ~30% dos clientes com checklist de integração aberto (chamado Geral + categorias pendentes)
+- demais chamados com problema (status 1/2), ~75% já resolvidos em ~7 dias em média
+- categorias com pesos diferentes (Batida é a mais comum, SSO a mais rara) e ~3% de N/A
+- aberturas espalhadas pelos 2 anos anteriores a DATA_BASE
+
+Uso:
+  python benchmarks/gerador.py bench.db                          # 5.000 clientes, 200.000 chamados
+  python benchmarks/gerador.py bench.db --clientes 20000 --chamados 1000000 --seed 7
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import database  # noqa: E402
+
+DATA_BASE = date(2026, 1, 1)   # fixa, para o banco não depender do dia em que foi gerado
+DIAS_HISTORICO = 730
+
+RESPONSAVEIS = [("Guilherme", 45), ("Eduardo", 35), ("Marcelo", 20)]
+CATEGORIAS = [("Batida", 25), ("Escala", 15), ("Feriados", 10), ("Funcionários", 15),
+              ("PDV", 15), ("Venda", 12), ("SSO", 8)]
+STATUS_PROBLEMA = [("1. Implantado com problema", 70), ("2. Implantado refazendo", 30)]
+STATUS_CHECKLIST = [("3. Novo cliente sem integração", 40), ("5. Implantado sem integração", 25),
+                    ("6. Integração Parcial", 20), ("8. Integração em construção", 15)]
+
+TIPOS_CLIENTE = ["Supermercado", "Farmácia", "Atacado", "Loja", "Posto", "Padaria", "Hospital", "Rede"]
+NOMES_CLIENTE = ["Alfa", "Bela Vista", "Central", "São João", "Santa Luzia", "Horizonte", "Nova Era",
+                 "Boa Esperança", "Primavera", "Estrela", "União", "Progresso"]
+PROBLEMAS = ["Marcações não chegam", "Arquivo rejeitado pela API", "Token expirado", "Escala duplicada",
+             "Funcionário sem matrícula", "Feriado municipal ausente", "Venda com valor zerado",
+             "Timeout na sincronização", "Login SSO redireciona em loop", "PDV sem comunicação"]
+RESOLUCOES = ["Reprocessado o arquivo", "Token renovado", "Cadastro corrigido pelo cliente",
+              "Ajuste no mapeamento de campos", "Reenviado pelo suporte", "Corrigido na versão nova"]
+PROPORCAO_CHECKLIST = 0.30
+PROPORCAO_RESOLVIDOS = 0.75
+PROPORCAO_NA = 0.03
+
+
+def _escolher(rnd, pesos):
+    """Escolhe um valor de [(valor, peso)]"""
+    return rnd.choices([valor for valor, _ in pesos], [peso for _, peso in pesos])[0]
+
+
+def gerar_base(db_path, n_clientes=5000, n_chamados=200_000, seed=42):
+    """
+    Cria (ou recria) db_path com n_clientes e ~n_chamados chamados e deixa database.DB_PATH
+    apontando para ele. Os triggers de resumo/série/FTS ficam desligados durante a carga e os índices
+    derivados são reconstruídos no fim, como na importação em lote.
+    """
+    for sufixo in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + sufixo):
+            os.remove(db_path + sufixo)
+    database.DB_PATH = db_path
+    database.fechar_conexoes()
+    database.invalidar_cache()
+    database.init_db()
+    rnd = random.Random(seed)
+
+    with database.get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        for trigger in ('trg_resumo_insert', 'trg_serie_insert', 'trg_fts_chamados_insert', 'trg_fts_clientes_insert'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        status_ids = {nome: database._id_status(cursor, nome) for nome, _ in STATUS_PROBLEMA + STATUS_CHECKLIST}
+        categoria_ids = {nome: database._id_categoria(cursor, nome) for nome, _ in CATEGORIAS}
+        geral_id = database._id_categoria(cursor, "Geral")
+        normal_id = database._id_status(cursor, database.STATUS_NORMAL)
+
+        def dia(dias_atras):
+            return (DATA_BASE - timedelta(days=dias_atras)).isoformat()
+
+        # criado_em/atualizado_em também fixos, para o arquivo sair idêntico a cada geração
+        cadastro = dia(DIAS_HISTORICO) + " 00:00:00"
+        cursor.executemany("""
+            INSERT INTO clientes (nome, classificacao, criado_em, atualizado_em) VALUES (?, ?, ?, ?)
+        """, [
+            (f"{rnd.choice(TIPOS_CLIENTE)} {rnd.choice(NOMES_CLIENTE)} {i:05d}", _escolher(rnd, RESPONSAVEIS),
+             cadastro, cadastro)
+            for i in range(n_clientes)
+        ])
+
+        def chamados():
+            gerados = 0
+            # Checklist aberto: Geral com o status do cliente + 1 a 4 categorias pendentes
+            for cliente_id in range(1, n_clientes + 1):
+                if rnd.random() >= PROPORCAO_CHECKLIST:
+                    continue
+                status = _escolher(rnd, STATUS_CHECKLIST)
+                abertura = dia(rnd.randrange(DIAS_HISTORICO))
+                yield (cliente_id, status_ids[status], geral_id, database.OBSERVACAO_GERAL, abertura, None, None, None)
+                for categoria, _ in rnd.sample(CATEGORIAS, rnd.randint(1, 4)):
+                    estado = rnd.choice([database.ESTADO_PROBLEMA, database.ESTADO_CONSTRUCAO, database.ESTADO_NA])
+                    if estado == database.ESTADO_NA:
+                        status_id, observacao = status_ids[status], "N/A"
+                    elif estado == database.ESTADO_CONSTRUCAO:
+                        status_id, observacao = status_ids[database.STATUS_CONSTRUCAO], f"Atualizado via checklist: {estado}"
+                    else:
+                        status_id, observacao = status_ids[status], f"Atualizado via checklist: {estado}"
+                    yield (cliente_id, status_id, categoria_ids[categoria], observacao, abertura, None, None, None)
+                    gerados += 1
+                gerados += 1
+            # Chamados de problema, a maioria já resolvida
+            for _ in range(max(n_chamados - gerados, 0)):
+                dias_atras = rnd.randrange(DIAS_HISTORICO)
+                status_id = status_ids[_escolher(rnd, STATUS_PROBLEMA)]
+                observacao = "N/A" if rnd.random() < PROPORCAO_NA else rnd.choice(PROBLEMAS)
+                resolucao = data_resolucao = status_original_id = None
+                if rnd.random() < PROPORCAO_RESOLVIDOS:
+                    duracao = min(int(rnd.expovariate(1 / 7)), dias_atras)
+                    data_resolucao = dia(dias_atras - duracao)
+                    resolucao = rnd.choice(RESOLUCOES)
+                    status_original_id, status_id = status_id, normal_id
+                yield (rnd.randint(1, n_clientes), status_id, categoria_ids[_escolher(rnd, CATEGORIAS)],
+                       observacao, dia(dias_atras), data_resolucao, resolucao, status_original_id)
+
+        cursor.executemany("""
+            INSERT INTO chamados (cliente_id, status_id, categoria_id, observacao, data_abertura,
+                                  data_resolucao, resolucao, status_original_id, criado_em, atualizado_em)
+            VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?5 || ' 00:00:00', COALESCE(?6, ?5) || ' 00:00:00')
+        """, chamados())
+
+        database._popular_resumos(cursor)
+        database._popular_series(cursor)
+        database._popular_busca_texto(cursor)
+        database._criar_resumos(cursor)       # recria os triggers removidos acima
+        database._criar_series(cursor)
+        database._criar_busca_texto(cursor)
+    conn.execute("ANALYZE")
+    database.invalidar_cache()
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description='Gera um integracoes.db sintético e determinístico')
+    p.add_argument('saida', help='Arquivo .db a criar (é sobrescrito)')
+    p.add_argument('--clientes', type=int, default=5000)
+    p.add_argument('--chamados', type=int, default=200_000)
+    p.add_argument('--seed', type=int, default=42)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    t0 = time.perf_counter()
+    gerar_base(args.saida, args.clientes, args.chamados, args.seed)
+    database.fechar_conexoes()
+    print(f"{args.saida}: {args.clientes} clientes, {args.chamados} chamados em {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
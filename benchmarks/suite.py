@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""benchmarks/suite.py
+
+Cronometra todas as funções públicas do database.py e do analise.py e a sequência de consultas
+de uma renderização completa do bi_v2.py, numa base gerada por gerador.py, e grava o resultado em
+JSON para comparar commits.
+
+- leituras rodam sem o cache (func.__wrapped__), para medir a consulta de verdade
+- escritas rodam dentro de uma transação que é desfeita no fim, então cada repetição vê a
+  mesma base (o tempo inclui o rollback)
+- "render.frio" é a primeira renderização depois de uma escrita (cache vazio) e
+  "render.quente" um rerun que só mexe em widgets (tudo vem do cache)
+- funções que não faz sentido cronometrar ficam em IGNORADAS com o motivo; uma função
+  pública nova que não esteja em nenhum dos dois aparece como aviso
+
+Uso:
+  python benchmarks/suite.py --saida antes.json                      # gera a base padrão em um diretório temporário
+  python benchmarks/suite.py --db bench.db --saida depois.json       # usa uma base já gerada (não é alterada)
+  python benchmarks/suite.py --filtro render --repeticoes 20
+  python benchmarks/suite.py --comparar antes.json depois.json        # lista o que ficou >20% (e >1 ms) mais lento
+"""
+import argparse
+import inspect
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import analise  # noqa: E402
+import database  # noqa: E402
+from gerador import DATA_BASE, gerar_base  # noqa: E402
+
+# Funções públicas fora da suíte, com o motivo
+IGNORADAS = {
+    'com_retry': 'decorador',
+    'em_cache': 'decorador',
+    'get_db': 'infraestrutura (usada por todas as outras)',
+    'fechar_conexoes': 'infraestrutura do pool',
+    'versao_dados': 'só lê um contador',
+    'invalidar_cache': 'só limpa um dicionário',
+    'configurar_armazenamento': 'PRAGMA de inicialização',
+    'init_db': 'roda uma vez por processo; as migrações já são medidas ao gerar a base',
+    'aplicar_migracoes': 'idem init_db',
+    'restaurar_backup': 'substitui o banco inteiro',
+    'iniciar_backups_periodicos': 'só agenda uma thread',
+    'parar_backups_periodicos': 'só para a thread do agendador',
+    'iniciar_perfil': 'custo do perfil medido em render.perfil',
+    'marcar_trecho': 'idem iniciar_perfil',
+    'encerrar_perfil': 'idem iniciar_perfil',
+    'arquivo_consultas_lentas': 'só monta um caminho',
+}
+
+# Benchmarks que levam segundos na base padrão: menos repetições
+PESADOS = {'recalcular_resumos', 'recriar_busca_texto', 'deletar_chamados_por_status',
+           'renomear_em_lote.responsavel', 'exportar_csv', 'exportar_parquet', 'copiar_banco',
+           'verificar_backup', 'criar_backup', 'listar_chamados_resolvidos', 'filtrar_chamados.resolvidos'}
+
+LIMITE_REGRESSAO = 1.2  # --comparar: mais lento que isso (mediana) é regressão...
+DIFERENCA_MINIMA_MS = 1.0  # ...desde que a diferença passe disto (abaixo de 1 ms é ruído)
+
+
+def desfazendo(func):
+    """Roda func numa transação desfeita no fim (a base não muda entre as repetições)"""
+    def rodar():
+        with database.get_db() as conn:
+            resultado = func()
+            conn.rollback()
+        return resultado
+    return rodar
+
+
+def amostra_da_base():
+    """Ids e nomes reais da base para usar como argumentos"""
+    with database.get_db() as conn:
+        def um(sql):
+            return conn.execute(sql).fetchone()[0]
+        checklist = [row[0] for row in conn.execute("""
+            SELECT DISTINCT cliente_id FROM chamados
+            WHERE data_resolucao IS NULL AND status_id IN (SELECT id FROM status_chamado WHERE checklist = 1)
+            ORDER BY cliente_id LIMIT 25
+        """)]
+        return {
+            'cliente_id': checklist[0],
+            'clientes_pagina': checklist,
+            'cliente_nome': um(f"SELECT nome FROM clientes WHERE id = {checklist[0]}"),
+            'nome_meio': um("SELECT nome FROM clientes ORDER BY nome LIMIT 1 OFFSET (SELECT COUNT(*) / 2 FROM clientes)"),
+            'aberto_id': um("SELECT MAX(id) FROM chamados WHERE data_resolucao IS NULL"),
+            'resolvido_id': um("SELECT MAX(id) FROM chamados WHERE data_resolucao IS NOT NULL"),
+            'cursor_historico': tuple(conn.execute("""
+                SELECT data_resolucao, id FROM chamados WHERE data_resolucao IS NOT NULL
+                ORDER BY data_resolucao DESC, id DESC LIMIT 1 OFFSET 500
+            """).fetchone()),
+            'status_problema': [row[0] for row in conn.execute(
+                "SELECT nome FROM status_chamado WHERE critico = 1 ORDER BY nome")],
+        }
+
+
+def linhas_importacao(n, seed=0):
+    """n linhas no formato de importar_chamados (clientes novos e existentes)"""
+    rnd = random.Random(seed)
+    for i in range(n):
+        resolvido = rnd.random() < 0.5
+        yield {
+            'cliente': f"Importado {i % (n // 10 or 1):05d}",
+            'status': database.STATUS_PROBLEMA,
+            'categoria': rnd.choice(["Batida", "Escala", "PDV", "Venda"]),
+            'observacao': "Carga de teste",
+            'data_abertura': "01/06/2025",
+            'data_resolucao': "2025-06-10" if resolvido else None,
+            'resolucao': "Resolvido na carga" if resolvido else None,
+        }
+
+
+def csv_importacao(n):
+    """As mesmas linhas de linhas_importacao num CSV em memória (para ler_arquivo_importacao)"""
+    texto = io.StringIO()
+    texto.write(",".join(database.COLUNAS_IMPORTACAO[:7]) + "\n")
+    for linha in linhas_importacao(n):
+        texto.write(",".join(linha[c] or '' for c in database.COLUNAS_IMPORTACAO[:7]) + "\n")
+    return texto.getvalue().encode('utf-8')
+
+
+def montar_benchmarks(a, tmp):
+    """{nome: função sem argumentos}; o nome começa pela função do database.py medida"""
+    sem_cache = {nome: getattr(database, nome).__wrapped__ for nome in (
+        'listar_clientes', 'listar_clientes_pagina', 'contar_clientes', 'buscar_cliente_por_nome',
+        'filtrar_chamados', 'listar_opcoes_filtro', 'listar_chamados_abertos', 'listar_chamados_abertos_completos',
+        'listar_chamados_problemas', 'listar_chamados_resolvidos', 'listar_chamados_resolvidos_pagina',
+        'listar_categorias', 'listar_totais_por_cliente', 'obter_checklist_por_cliente',
+        'obter_matriz_checklist', 'obter_estatisticas', 'buscar_chamados', 'buscar_clientes',
+        'obter_estados_checklist', 'obter_serie_chamados', 'listar_responsaveis',
+    )}
+    f = SimpleNamespace(**sem_cache)
+    inicio_mes, fim_mes = date(DATA_BASE.year - 1, 6, 1), date(DATA_BASE.year - 1, 6, 30)
+    estados = database.obter_estados_checklist.__wrapped__(a['clientes_pagina'])
+    alteracoes = {
+        cliente_id: (status_geral, {**categorias, 'PDV': database.ESTADO_PROBLEMA})
+        for cliente_id, (status_geral, categorias) in estados.items()
+    }
+    status_geral, categorias = alteracoes[a['cliente_id']]
+    arquivo_csv = csv_importacao(10_000)
+    backups = os.path.join(tmp, 'backups')
+    copia = os.path.join(tmp, 'copia.db')
+
+    return {
+        # ---- clientes
+        'listar_clientes': f.listar_clientes,
+        'listar_clientes_pagina.primeira': lambda: f.listar_clientes_pagina(None, 25, None),
+        'listar_clientes_pagina.meio': lambda: f.listar_clientes_pagina(a['nome_meio'], 25, None),
+        'listar_clientes_pagina.busca': lambda: f.listar_clientes_pagina(None, 25, 'farm'),
+        'contar_clientes': lambda: f.contar_clientes(None),
+        'contar_clientes.busca': lambda: f.contar_clientes('farm'),
+        'buscar_cliente_por_nome': lambda: f.buscar_cliente_por_nome(a['cliente_nome']),
+        'buscar_clientes': lambda: f.buscar_clientes('farmacia alfa'),
+        'adicionar_cliente': desfazendo(lambda: database.adicionar_cliente('Cliente Benchmark', 'Eduardo')),
+        'atualizar_classificacao': desfazendo(lambda: database.atualizar_classificacao(a['cliente_id'], 'Marcelo')),
+        'excluir_cliente': desfazendo(lambda: database.excluir_cliente(a['cliente_id'])),
+        # ---- chamados
+        'filtrar_chamados.abertos': lambda: f.filtrar_chamados('abertos'),
+        'filtrar_chamados.problemas': lambda: f.filtrar_chamados('problemas', status=a['status_problema']),
+        'filtrar_chamados.problemas_busca': lambda: f.filtrar_chamados('problemas', busca='farm'),
+        'filtrar_chamados.resolvidos': lambda: f.filtrar_chamados('resolvidos'),
+        'filtrar_chamados.resolvidos_mes': lambda: f.filtrar_chamados('resolvidos', data_inicio=inicio_mes, data_fim=fim_mes),
+        'filtrar_chamados.texto': lambda: f.filtrar_chamados('abertos', texto='token'),
+        'listar_opcoes_filtro.abertos': lambda: f.listar_opcoes_filtro('abertos'),
+        'listar_opcoes_filtro.problemas': lambda: f.listar_opcoes_filtro('problemas'),
+        'listar_chamados_abertos': f.listar_chamados_abertos,
+        'listar_chamados_abertos_completos': f.listar_chamados_abertos_completos,
+        'listar_chamados_problemas': f.listar_chamados_problemas,
+        'listar_chamados_resolvidos': f.listar_chamados_resolvidos,
+        'listar_chamados_resolvidos_pagina.primeira': lambda: f.listar_chamados_resolvidos_pagina(None, 25),
+        'listar_chamados_resolvidos_pagina.pagina_20': lambda: f.listar_chamados_resolvidos_pagina(a['cursor_historico'], 25),
+        'listar_chamados_resolvidos_pagina.texto': lambda: f.listar_chamados_resolvidos_pagina(None, 25, texto='token'),
+        'listar_chamados_resolvidos_pagina.periodo': lambda: f.listar_chamados_resolvidos_pagina(
+            None, 25, data_inicio=inicio_mes, data_fim=fim_mes, categoria='PDV'),
+        'buscar_chamados': lambda: f.buscar_chamados('token expirado'),
+        'adicionar_chamado': desfazendo(lambda: database.adicionar_chamado(
+            a['cliente_id'], database.STATUS_PROBLEMA, 'Batida', 'Benchmark')),
+        'resolver_chamado': desfazendo(lambda: database.resolver_chamado(a['aberto_id'], resolucao='Benchmark')),
+        'reabrir_chamado': desfazendo(lambda: database.reabrir_chamado(a['resolvido_id'])),
+        'excluir_chamado': desfazendo(lambda: database.excluir_chamado(a['aberto_id'])),
+        'deletar_chamados_por_cliente': desfazendo(lambda: database.deletar_chamados_por_cliente(a['cliente_id'])),
+        'deletar_chamados_por_status': desfazendo(lambda: database.deletar_chamados_por_status(database.STATUS_PROBLEMA)),
+        # ---- dashboard e checklist
+        'listar_categorias': f.listar_categorias,
+        'listar_totais_por_cliente': f.listar_totais_por_cliente,
+        'obter_estatisticas': f.obter_estatisticas,
+        'listar_responsaveis': f.listar_responsaveis,
+        'obter_serie_chamados.dia': lambda: f.obter_serie_chamados(),
+        'obter_serie_chamados.semana_180d': lambda: f.obter_serie_chamados(
+            DATA_BASE - timedelta(days=180), DATA_BASE, agrupamento='semana'),
+        'obter_serie_chamados.mes_filtros': lambda: f.obter_serie_chamados(
+            categoria='PDV', responsaveis=['Eduardo'], agrupamento='mes'),
+        'obter_matriz_checklist': lambda: f.obter_matriz_checklist(),
+        'obter_matriz_checklist.busca': lambda: f.obter_matriz_checklist(busca='farm'),
+        'obter_checklist_por_cliente': lambda: f.obter_checklist_por_cliente(a['cliente_id']),
+        'obter_checklist_por_cliente.todos': lambda: f.obter_checklist_por_cliente(None),
+        'obter_estados_checklist': lambda: f.obter_estados_checklist(a['clientes_pagina']),
+        'atualizar_cliente_checklist': desfazendo(lambda: database.atualizar_cliente_checklist(
+            a['cliente_id'], status_geral, categorias)),
+        'atualizar_checklists': desfazendo(lambda: database.atualizar_checklists(alteracoes)),
+        'limpar_checklist_cliente': desfazendo(lambda: database.limpar_checklist_cliente(a['cliente_id'])),
+        # ---- snapshot colunar (analise.py): carga e agrupamentos/SLA com ele já carregado
+        'carregar_chamados': analise.carregar_chamados.__wrapped__,
+        'totais_por_status': lambda: analise.totais_por_status.__wrapped__(),
+        'totais_por_categoria': lambda: analise.totais_por_categoria.__wrapped__(),
+        'totais_por_cliente': lambda: analise.totais_por_cliente.__wrapped__(),
+        'totais_por_cliente.filtros': lambda: analise.totais_por_cliente.__wrapped__(['Eduardo'], 'farm'),
+        'resumo_sla': lambda: analise.resumo_sla.__wrapped__(),
+        'resumo_sla.filtros': lambda: analise.resumo_sla.__wrapped__(
+            DATA_BASE - timedelta(days=180), DATA_BASE, 'Batida', ['Eduardo']),
+        'envelhecimento': lambda: analise.envelhecimento.__wrapped__(DATA_BASE),
+        'sla_por.categoria': lambda: analise.sla_por.__wrapped__('categoria', DATA_BASE - timedelta(days=180), DATA_BASE),
+        'sla_por.cliente': lambda: analise.sla_por.__wrapped__('cliente', DATA_BASE - timedelta(days=180), DATA_BASE),
+        # ---- renomeações
+        'renomear_status': desfazendo(lambda: database.renomear_status('6. Integração Parcial', '6. Integração Nova')),
+        'renomear_categoria': desfazendo(lambda: database.renomear_categoria('Feriados', 'Calendário')),
+        'renomear_em_lote.simular': lambda: database.renomear_em_lote(
+            {'status': {'6. Integração Parcial': '6. Integração Nova'}, 'classificacao': {'Marcelo': 'Ana'}}, simular=True),
+        'renomear_em_lote.responsavel': desfazendo(lambda: database.renomear_em_lote({'classificacao': {'Marcelo': 'Ana'}})),
+        # ---- manutenção
+        'recalcular_resumos': desfazendo(database.recalcular_resumos),
+        'recriar_busca_texto': desfazendo(database.recriar_busca_texto),
+        # ---- importação
+        'ler_arquivo_importacao': lambda: sum(1 for _ in database.ler_arquivo_importacao(io.BytesIO(arquivo_csv), 'x.csv')),
+        'importar_chamados.simular': lambda: database.importar_chamados(linhas_importacao(10_000), simular=True),
+        'importar_chamados': desfazendo(lambda: database.importar_chamados(linhas_importacao(10_000))),
+        # ---- exportação e backup
+        'exportar_csv': lambda: database.exportar_csv(io.BytesIO(), 'historico'),
+        'exportar_parquet': lambda: database.exportar_parquet(io.BytesIO(), 'historico'),
+        'copiar_banco': lambda: database.copiar_banco(copia, pausa=0),
+        'verificar_backup': lambda: database.verificar_backup(copia),
+        'criar_backup': lambda: database.criar_backup(backups, manter=3),
+        'listar_backups': lambda: database.listar_backups(backups),
+        'rotacionar_backups': lambda: database.rotacionar_backups(backups, manter=3),
+        # ---- bi_v2.py
+        'render.frio': lambda: simular_render(frio=True),
+        'render.quente': lambda: simular_render(frio=False),
+        'render.perfil': render_com_perfil,
+    }
+
+
+def simular_render(frio):
+    """
+    Consultas de uma renderização do bi_v2.py com os filtros padrão (dashboard, admin,
+    checklist, chamados, histórico e backups), na ordem em que a página as faz.
+    """
+    if frio:
+        database.invalidar_cache()
+    database.obter_estatisticas()
+    analise.totais_por_status()
+    analise.totais_por_categoria()
+    database.listar_categorias()
+    database.listar_responsaveis()
+    database.obter_serie_chamados(data_inicio=DATA_BASE - timedelta(days=180), data_fim=DATA_BASE,
+                                  categoria=None, responsaveis=None, agrupamento='semana')
+    filtros_sla = {'data_inicio': DATA_BASE - timedelta(days=180), 'data_fim': DATA_BASE,
+                   'categoria': None, 'responsaveis': None}
+    analise.resumo_sla(**filtros_sla)
+    analise.envelhecimento(DATA_BASE, None, None)
+    analise.sla_por('categoria', **filtros_sla)
+    analise.sla_por('cliente', **filtros_sla)
+    opcoes = database.listar_opcoes_filtro('abertos')
+    filtros_dash = {'status': opcoes['status'], 'responsaveis': opcoes['responsaveis'] or None, 'busca': None}
+    database.filtrar_chamados('problemas', **filtros_dash)
+    database.obter_matriz_checklist(**filtros_dash)
+    analise.totais_por_cliente(None, None)
+    database.listar_clientes()
+    database.listar_clientes_pagina(None, 25, None)
+    database.contar_clientes(None)
+    database.listar_clientes()
+    status_problemas = database.listar_opcoes_filtro('problemas')['status']
+    database.filtrar_chamados('problemas', status=status_problemas, busca=None)
+    database.listar_categorias()
+    database.listar_chamados_resolvidos_pagina(None, 25, texto=None, data_inicio=None, data_fim=None, categoria=None)
+    database.listar_backups()
+
+
+def render_com_perfil():
+    """render.frio com o perfil do bi_v2.py ligado (a diferença é o custo da instrumentação)"""
+    database.iniciar_perfil()
+    try:
+        simular_render(frio=True)
+    finally:
+        database.encerrar_perfil()
+
+
+def cronometrar(func, repeticoes):
+    """Tempos (ms) de cada repetição, depois de uma execução de aquecimento"""
+    func()
+    tempos = []
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - t0) * 1000)
+    return tempos
+
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def nao_cobertas(benchmarks):
+    """Funções públicas do database.py e do analise.py sem benchmark e fora de IGNORADAS"""
+    medidas = {nome.split('.')[0] for nome in benchmarks}
+    publicas = {nome for modulo in (database, analise)
+                for nome, obj in inspect.getmembers(modulo, inspect.isfunction)
+                if obj.__module__ == modulo.__name__ and not nome.startswith('_')}
+    return sorted(publicas - medidas - set(IGNORADAS))
+
+
+def rodar(args):
+    tmp = tempfile.mkdtemp(prefix='bench_')
+    try:
+        db_path = os.path.join(tmp, 'bench.db')
+        t0 = time.perf_counter()
+        if args.db:
+            shutil.copyfile(args.db, db_path)  # as escritas são desfeitas, mas backup/cópia usam a pasta temporária
+            database.DB_PATH = db_path
+            database.init_db()
+        else:
+            gerar_base(db_path, args.clientes, args.chamados, args.seed)
+        print(f"Base pronta em {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+        with database.get_db() as conn:
+            clientes = conn.execute("SELECT COUNT(*) FROM clientes").fetchone()[0]
+            chamados = conn.execute("SELECT COUNT(*) FROM chamados").fetchone()[0]
+        benchmarks = montar_benchmarks(amostra_da_base(), tmp)
+        for nome in nao_cobertas(benchmarks):
+            print(f"⚠️ {nome} não tem benchmark (inclua em montar_benchmarks ou IGNORADAS)", file=sys.stderr)
+
+        resultados = {}
+        for nome, func in benchmarks.items():
+            if args.filtro and args.filtro not in nome:
+                continue
+            repeticoes = max(1, args.repeticoes // 5) if nome.split('.')[0] in PESADOS or nome in PESADOS else args.repeticoes
+            tempos = cronometrar(func, repeticoes)
+            resultados[nome] = {
+                'mediana_ms': round(statistics.median(tempos), 3),
+                'min_ms': round(min(tempos), 3),
+                'max_ms': round(max(tempos), 3),
+                'repeticoes': repeticoes,
+            }
+            print(f"{nome:48}{resultados[nome]['mediana_ms']:12.2f} ms", file=sys.stderr)
+    finally:
+        database.parar_backups_periodicos()
+        database.fechar_conexoes()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return {
+        'commit': commit_atual(),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'base': {'origem': args.db, 'clientes': clientes, 'chamados': chamados,
+                 'seed': None if args.db else args.seed},
+        'resultados': resultados,
+    }
+
+
+def comparar(antes_path, depois_path, limite, minimo_ms=DIFERENCA_MINIMA_MS):
+    """Imprime a razão depois/antes das medianas; retorna True se houve regressão"""
+    with open(antes_path, encoding='utf-8') as f:
+        antes = json.load(f)
+    with open(depois_path, encoding='utf-8') as f:
+        depois = json.load(f)
+    if antes['base'] != depois['base']:
+        print(f"⚠️ Bases diferentes: {antes['base']} x {depois['base']}")
+    print(f"{antes['commit']} → {depois['commit']}")
+    regressoes = []
+    for nome in sorted(set(antes['resultados']) | set(depois['resultados'])):
+        a, d = antes['resultados'].get(nome), depois['resultados'].get(nome)
+        if a is None or d is None:
+            print(f"{nome:48}{'(só antes)' if d is None else '(só depois)':>36}")
+            continue
+        razao = d['mediana_ms'] / a['mediana_ms'] if a['mediana_ms'] else float('inf')
+        relevante = abs(d['mediana_ms'] - a['mediana_ms']) >= minimo_ms
+        marca = '  '
+        if relevante and razao > limite:
+            marca = '❌'
+            regressoes.append(nome)
+        elif relevante and razao < 1 / limite:
+            marca = '✅'
+        print(f"{nome:48}{a['mediana_ms']:12.2f}{d['mediana_ms']:12.2f} ms {razao:8.2f}x {marca}")
+    if regressoes:
+        print(f"{len(regressoes)} regressão(ões) acima de {limite:.2f}x: {', '.join(regressoes)}")
+    return bool(regressoes)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description='Benchmarks do database.py e da renderização do bi_v2.py')
+    p.add_argument('--db', help='Base já gerada (é copiada; padrão: gera uma com gerador.py)')
+    p.add_argument('--clientes', type=int, default=5000)
+    p.add_argument('--chamados', type=int, default=200_000)
+    p.add_argument('--seed', type=int, default=42)
+    p.add_argument('--repeticoes', type=int, default=10)
+    p.add_argument('--filtro', help='Só os benchmarks cujo nome contém este texto')
+    p.add_argument('--saida', help='Arquivo JSON com os resultados (padrão: imprime na saída)')
+    p.add_argument('--comparar', nargs=2, metavar=('ANTES', 'DEPOIS'), help='Compara dois JSONs da suíte')
+    p.add_argument('--limite', type=float, default=LIMITE_REGRESSAO, help='Razão de tempo considerada regressão')
+    p.add_argument('--minimo-ms', type=float, default=DIFERENCA_MINIMA_MS, help='Diferença mínima (ms) para contar')
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.comparar:
+        sys.exit(1 if comparar(*args.comparar, args.limite, args.minimo_ms) else 0)
+    with redirect_stdout(sys.stderr):  # mensagens do init_db não vão para o JSON
+        relatorio = rodar(args)
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            f.write(texto + "\n")
+        print(f"Resultados gravados em {args.saida}", file=sys.stderr)
+    else:
+        print(texto)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,15 +5,31 @@ Sistema de gestão de integrações com SQLite
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from datetime import date
+from datetime import date, timedelta
+import io
 import os
+import tempfile
 from database import (
     init_db, adicionar_cliente, adicionar_chamado, resolver_chamado, 
-    reabrir_chamado, listar_clientes, listar_chamados_abertos, 
-    listar_chamados_resolvidos, obter_estatisticas, buscar_cliente_por_nome,
+    reabrir_chamado, listar_clientes, filtrar_chamados, listar_opcoes_filtro,
+    obter_estatisticas, obter_serie_chamados, listar_responsaveis, buscar_cliente_por_nome,
     excluir_chamado, excluir_cliente, atualizar_classificacao, 
-    atualizar_cliente_checklist, limpar_checklist_cliente, listar_chamados_problemas,
-    deletar_chamados_por_status, deletar_chamados_por_cliente
+    atualizar_cliente_checklist, limpar_checklist_cliente, 
+    deletar_chamados_por_status, deletar_chamados_por_cliente,
+    obter_checklist_por_cliente,
+    listar_clientes_pagina, contar_clientes,
+    listar_chamados_resolvidos_pagina, listar_categorias,
+    obter_matriz_checklist, COLUNAS_CHECKLIST,
+    obter_estados_checklist, atualizar_checklists,
+    ESTADOS_CHECKLIST, ESTADO_OK, STATUS_CHECKLIST,
+    importar_chamados, ler_arquivo_importacao,
+    exportar_csv, exportar_parquet, copiar_banco, EXPORTACOES,
+    criar_backup, listar_backups, iniciar_backups_periodicos,
+    iniciar_perfil, marcar_trecho, encerrar_perfil, PERFIL_ARQUIVO
+)
+from analise import (
+    totais_por_status, totais_por_categoria, totais_por_cliente,
+    resumo_sla, envelhecimento, sla_por, SLA_DIAS
 )
 
 
@@ -41,9 +57,20 @@ if not st.session_state['autenticado']:
 # ==================== CONFIGURAÇÃO ====================
 st.set_page_config(page_title="BI Integrações", layout="wide", page_icon="📊")
 
+# Perfil do rerun (opcional): BI_PERFIL=1 ou ?perfil=1 na URL mostra o painel no fim da página
+PERFIL_ATIVO = os.environ.get('BI_PERFIL') == '1' or st.query_params.get('perfil') == '1'
+if PERFIL_ATIVO:
+    iniciar_perfil()
+    marcar_trecho("inicializacao")
+else:
+    encerrar_perfil()  # descarta o perfil de um rerun interrompido por st.rerun()/st.stop()
+
 # Inicializa o banco na primeira execução
 init_db()
 
+# Backups automáticos (uma thread por processo; BACKUP_INTERVALO_HORAS=0 desativa)
+iniciar_backups_periodicos(float(os.environ.get('BACKUP_INTERVALO_HORAS', '24')))
+
 
 # ==================== CONSTANTES ====================
 STATUS_OPTIONS = [
@@ -76,6 +103,19 @@ STATUS_LABELS = {
     "8. Integração em construção": "Em construção"
 }
 
+# Colunas das tabelas de tempo de resolução (analise.sla_por) -> títulos na tela
+COLUNAS_SLA = {
+    'resolvidos': 'Resolvidos', 'media_dias': 'Média (dias)', 'p50': 'Mediana', 'p90': 'P90',
+    'dentro_sla': 'No prazo (%)', 'abertos': 'Abertos', 'abertos_acima_sla': 'Abertos fora do prazo',
+}
+
+# Agrupamentos das tendências: rótulo -> (agrupamento do banco, frequência do pandas)
+AGRUPAMENTOS_TENDENCIA = {
+    "Dia": ('dia', 'D'),
+    "Semana": ('semana', 'W-MON'),
+    "Mês": ('mes', 'MS'),
+}
+
 # ==================== ESTILOS ====================
 st.markdown("""
 <style>
@@ -139,6 +179,7 @@ tab_dashboard, tab_checklist, tab_chamados, tab_historico = st.tabs([
 # ==================== ABA DASHBOARD ====================
 with tab_dashboard:
     # KPIs
+    marcar_trecho("kpis")
     stats = obter_estatisticas()
     
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -167,16 +208,17 @@ with tab_dashboard:
     col_g1, col_g2 = st.columns(2)
     
     with col_g1:
+        marcar_trecho("grafico_status")
         st.subheader(" Distribuição por Status")
-        if stats['por_status']:
-            df_status = pd.DataFrame([
-                {'Status': k, 'Quantidade': v}
-                for k, v in stats['por_status'].items()
-            ])
+        # Agrupado sobre o snapshot colunar dos chamados (analise.py), compartilhado entre sessões
+        df_status = totais_por_status()
+        if not df_status.empty:
             # Mapeia os rótulos longos para nomes amigáveis usados na legenda
-            df_status['Label'] = df_status['Status'].map(lambda s: STATUS_LABELS.get(s, s))
+            # (assign devolve uma cópia: o DataFrame do cache não é alterado)
+            df_status = df_status.assign(Label=df_status['Status'].map(lambda s: STATUS_LABELS.get(s, s)))
             # Gera mapa de cores baseado nos labels (mantendo cores originais)
             label_color_map = {STATUS_LABELS.get(k, k): v for k, v in CORES_STATUS.items()}
+            marcar_trecho("grafico_status.figura")
             fig_status = px.pie(
                 df_status,
                 values='Quantidade',
@@ -189,20 +231,23 @@ with tab_dashboard:
                 font=dict(size=18),
                 legend=dict(font=dict(size=16))
             )
+            marcar_trecho("grafico_status.envio")
             st.plotly_chart(fig_status, use_container_width=True)
         else:
             st.info("Nenhum chamado aberto no momento")
     
     with col_g2:
+        marcar_trecho("grafico_categoria")
         st.subheader(" Chamados por Categoria")
-        if stats['por_categoria']:
-            df_cat = pd.DataFrame(stats['por_categoria'])
+        df_cat = totais_por_categoria()
+        if not df_cat.empty:
             df_cat_melted = df_cat.melt(
                 id_vars='categoria',
                 value_vars=['abertos', 'resolvidos'],
                 var_name='Status',
                 value_name='Quantidade'
             )
+            marcar_trecho("grafico_categoria.figura")
             fig_cat = px.bar(
                 df_cat_melted,
                 x='categoria',
@@ -220,21 +265,146 @@ with tab_dashboard:
             fig_cat.update_xaxes(showline=False, showgrid=False, zeroline=False, ticks='')
             fig_cat.update_yaxes(showline=False, showgrid=False, zeroline=False, ticks='', showticklabels=False, title='')
             fig_cat.update_traces(texttemplate='%{text}', textposition='inside', textfont=dict(size=16, color='white'))
+            marcar_trecho("grafico_categoria.envio")
             st.plotly_chart(fig_cat, use_container_width=True)
         else:
             st.info("Nenhum dado disponível")
     
     st.divider()
     
+    # ==================== TENDÊNCIAS ====================
+    # Lidas só das séries diárias (serie_chamados/serie_resolucao), sem varrer os chamados
+    marcar_trecho("tendencias")
+    st.subheader(" Tendências")
+    col_t1, col_t2, col_t3, col_t4 = st.columns([2, 1, 1, 1])
+    with col_t1:
+        periodo_tend = st.date_input(
+            "Período",
+            value=(date.today() - timedelta(days=180), date.today()),
+            format="DD/MM/YYYY",
+            key="tend_periodo"
+        )
+    with col_t2:
+        agrupamento_tend = st.selectbox("Agrupar por", list(AGRUPAMENTOS_TENDENCIA), index=1, key="tend_agrupamento")
+    with col_t3:
+        categoria_tend = st.selectbox("Categoria", ["Todas"] + listar_categorias(), key="tend_categoria")
+    with col_t4:
+        responsavel_tend = st.selectbox("Responsável", ["Todos"] + listar_responsaveis(), key="tend_responsavel")
+    
+    inicio_tend = periodo_tend[0] if periodo_tend else None
+    fim_tend = periodo_tend[1] if len(periodo_tend) > 1 else None
+    freq_tend = AGRUPAMENTOS_TENDENCIA[agrupamento_tend]
+    serie = obter_serie_chamados(
+        data_inicio=inicio_tend,
+        data_fim=fim_tend,
+        categoria=None if categoria_tend == "Todas" else categoria_tend,
+        responsaveis=None if responsavel_tend == "Todos" else [responsavel_tend],
+        agrupamento=freq_tend[0]
+    )
+    if serie:
+        df_tend = pd.DataFrame(serie)
+        df_tend['periodo'] = pd.to_datetime(df_tend['periodo'])
+        # Períodos sem movimento não vêm do banco: completa com zero e repete o backlog anterior
+        backlog_inicial = df_tend['backlog'].iloc[0] - df_tend['abertos'].iloc[0] + df_tend['resolvidos'].iloc[0]
+        inicio_eixo = pd.Timestamp(inicio_tend) if inicio_tend else df_tend['periodo'].min()
+        fim_eixo = pd.Timestamp(fim_tend) if fim_tend else df_tend['periodo'].max()
+        eixo = pd.date_range(inicio_eixo, fim_eixo, freq=freq_tend[1])
+        eixo = eixo.union(df_tend['periodo'])
+        df_tend = df_tend.set_index('periodo').reindex(eixo)
+        df_tend[['abertos', 'resolvidos']] = df_tend[['abertos', 'resolvidos']].fillna(0).astype(int)
+        df_tend['backlog'] = df_tend['backlog'].ffill().fillna(backlog_inicial).astype(int)
+        df_tend = df_tend.rename_axis('periodo').reset_index()
+        
+        marcar_trecho("tendencias.figura")
+        layout_tend = dict(font=dict(size=14), margin=dict(t=30, r=10, l=10, b=30), legend=dict(title=''))
+        fig_backlog = px.area(df_tend, x='periodo', y='backlog', labels={'periodo': '', 'backlog': 'Chamados abertos'},
+                              color_discrete_sequence=['#9CA3AF'], title="Backlog")
+        fig_backlog.update_layout(**layout_tend)
+        fig_fluxo = px.bar(df_tend, x='periodo', y=['abertos', 'resolvidos'], barmode='group',
+                           labels={'periodo': '', 'value': 'Chamados', 'variable': ''},
+                           color_discrete_map={'abertos': '#9CA3AF', 'resolvidos': '#006ED2'},
+                           title="Abertos x Resolvidos")
+        fig_fluxo.update_layout(**layout_tend)
+        fig_mediana = px.line(df_tend, x='periodo', y='mediana_dias', markers=True,
+                              labels={'periodo': '', 'mediana_dias': 'Dias'},
+                              color_discrete_sequence=['#006ED2'], title="Mediana do tempo de resolução")
+        fig_mediana.update_layout(**layout_tend)
+        
+        marcar_trecho("tendencias.envio")
+        col_tg1, col_tg2, col_tg3 = st.columns(3)
+        with col_tg1:
+            st.plotly_chart(fig_backlog, use_container_width=True)
+        with col_tg2:
+            st.plotly_chart(fig_fluxo, use_container_width=True)
+        with col_tg3:
+            st.plotly_chart(fig_mediana, use_container_width=True)
+    else:
+        st.info("Nenhum chamado no período")
+    
+    # ==================== TEMPO DE RESOLUÇÃO (SLA) ====================
+    # Mesmos filtros das tendências; calculado em memória (analise.py), sem consultar o banco
+    marcar_trecho("sla")
+    st.subheader(f" Tempo de Resolução (prazo: {SLA_DIAS} dias)")
+    filtros_sla = {
+        'data_inicio': inicio_tend,
+        'data_fim': fim_tend,
+        'categoria': None if categoria_tend == "Todas" else categoria_tend,
+        'responsaveis': None if responsavel_tend == "Todos" else [responsavel_tend],
+    }
+    sla = resumo_sla(**filtros_sla)
+    col_s1, col_s2, col_s3, col_s4, col_s5 = st.columns(5)
+    with col_s1:
+        st.metric("Resolvidos no período", sla['resolvidos'])
+    with col_s2:
+        st.metric("Mediana (dias)", sla['percentis'][50] if sla['resolvidos'] else "-")
+    with col_s3:
+        st.metric("P90 (dias)", sla['percentis'][90] if sla['resolvidos'] else "-")
+    with col_s4:
+        st.metric("Resolvidos no prazo", f"{sla['dentro_sla']:.1f}%" if sla['resolvidos'] else "-")
+    with col_s5:
+        st.metric("Abertos fora do prazo", sla['abertos_acima_sla'], delta=None, delta_color="inverse")
+    
+    col_sg1, col_sg2 = st.columns([1, 1.5])
+    with col_sg1:
+        df_idade = envelhecimento(filtros_sla['data_fim'], filtros_sla['categoria'], filtros_sla['responsaveis'])
+        fig_idade = px.bar(df_idade, x='faixa', y='abertos', text='abertos',
+                           labels={'faixa': '', 'abertos': 'Chamados abertos'},
+                           color_discrete_sequence=['#143D6B'], title="Idade dos chamados abertos")
+        fig_idade.update_layout(font=dict(size=14), margin=dict(t=30, r=10, l=10, b=30))
+        fig_idade.update_traces(textposition='outside')
+        st.plotly_chart(fig_idade, use_container_width=True)
+    with col_sg2:
+        df_sla_cat = sla_por('categoria', **filtros_sla)
+        st.markdown("**Por categoria**")
+        st.dataframe(
+            df_sla_cat.rename(columns={'categoria': 'Categoria', **COLUNAS_SLA})[['Categoria', *COLUNAS_SLA.values()]],
+            hide_index=True,
+            use_container_width=True,
+            column_config={'Média (dias)': st.column_config.NumberColumn(format="%.1f"),
+                           'No prazo (%)': st.column_config.NumberColumn(format="%.1f")},
+        )
+    with st.expander("Clientes com mais chamados fora do prazo"):
+        df_sla_cli = sla_por('cliente', **filtros_sla).head(20)
+        st.dataframe(
+            df_sla_cli.rename(columns={'cliente': 'Cliente', **COLUNAS_SLA})[['Cliente', *COLUNAS_SLA.values()]],
+            hide_index=True,
+            use_container_width=True,
+            column_config={'Média (dias)': st.column_config.NumberColumn(format="%.1f"),
+                           'No prazo (%)': st.column_config.NumberColumn(format="%.1f")},
+        )
+    
+    st.divider()
+    
     # ==================== FILTROS PARA AS TABELAS ====================
+    marcar_trecho("filtros")
     st.subheader(" Filtrar Tabelas")
     col_filtro1, col_filtro2, col_filtro3 = st.columns(3)
     
-    # Busca todos os chamados abertos para os filtros
-    todos_chamados = listar_chamados_abertos()
+    # Opções dos filtros: status e responsáveis presentes nos chamados abertos
+    opcoes_filtro_dash = listar_opcoes_filtro('abertos')
     
     with col_filtro1:
-        status_unicos = list(set([c['status'] for c in todos_chamados]))
+        status_unicos = opcoes_filtro_dash['status']
         status_filtro_dash = st.multiselect(
             "Filtrar por Status",
             options=status_unicos,
@@ -246,7 +416,7 @@ with tab_dashboard:
         busca_cliente_dash = st.text_input("🔍 Buscar por cliente", placeholder="Digite o nome...", key="busca_dash")
 
     with col_filtro3:
-        classificacoes_unicas = sorted(list(set([c.get('classificacao','Guilherme') for c in todos_chamados])))
+        classificacoes_unicas = opcoes_filtro_dash['responsaveis']
         if not classificacoes_unicas:
             classificacoes_unicas = ['Guilherme', 'Eduardo', 'Marcelo']
         class_filtro_dash = st.multiselect(
@@ -256,27 +426,24 @@ with tab_dashboard:
             key="filtro_class_dash"
         )
     
+    # Filtros executados no banco pelas consultas das duas tabelas
+    filtros_dash = {
+        'status': status_filtro_dash,
+        'responsaveis': class_filtro_dash or None,
+        'busca': busca_cliente_dash or None,
+    }
+    
     st.divider()
     
     # ==================== TABELAS DE STATUS ====================
     col_tab1, col_tab2 = st.columns([1, 1.5])
     
     with col_tab1:
+        marcar_trecho("tabela_problemas")
         st.subheader(" Status de Implantação")
         
-        # Busca chamados com problemas (status 1 e 2)
-        chamados_problema = [
-            c for c in todos_chamados 
-            if c['status'] in ['1. Implantado com problema', '2. Implantado refazendo']
-        ]
-        
-        # Aplica filtros
-        chamados_filtrados = [
-            c for c in chamados_problema 
-            if c['status'] in status_filtro_dash and (
-                not busca_cliente_dash or busca_cliente_dash.lower() in c['cliente'].lower()
-            ) and (not class_filtro_dash or c.get('classificacao','Guilherme') in class_filtro_dash)
-        ]
+        # Chamados com problemas (status 1 e 2) já filtrados no banco
+        chamados_filtrados = filtrar_chamados('problemas', **filtros_dash)
         
         if chamados_filtrados:
             # Exibe a tabela
@@ -303,131 +470,21 @@ with tab_dashboard:
             st.info("Nenhum cliente com problemas")
     
     with col_tab2:
+        marcar_trecho("matriz_checklist")
         st.subheader(" Checklist de Integração")
         
-        # Busca clientes sem integração (status 3 e 4) e também chamados "Em construção" (status 6)
-        chamados_sem_int = [
-            c for c in todos_chamados
-            if ('sem integração' in (c.get('status') or '').lower()) or ('parcial' in (c.get('status') or '').lower()) or ('constru' in (c.get('status') or '').lower())
-        ]
-        
-        # Primeiro agrupa TODOS os chamados por cliente (sem filtro de status ainda)
-        # Usar chamados completos (inclui 'Geral') para respeitar o status geral salvo
-        from database import listar_chamados_abertos_completos
-        chamados_completos = listar_chamados_abertos_completos()
-        clientes_checklist_completo = {}
-        for chamado in chamados_completos:
-            cliente = chamado['cliente']
-            categoria = chamado.get('categoria', '')
-            
-            if cliente not in clientes_checklist_completo:
-                clientes_checklist_completo[cliente] = {
-                    'status_original': chamado['status'],  # Guarda o status original
-                    'id': chamado['id'],
-                    'batida': False,
-                    'batida_construcao': False,
-                    'escala': False,
-                    'escala_construcao': False,
-                    'feriados': False,
-                    'feriados_construcao': False,
-                    'funcionarios': False,
-                    'funcionarios_construcao': False,
-                    'funcionarios_na': False,
-                    'pdv': False,
-                    'pdv_construcao': False,
-                    'pdv_na': False,
-                    'venda': False,
-                    'venda_construcao': False,
-                    'venda_na': False,
-                    'sso': False,
-                    'sso_construcao': False,
-                    'sso_na': False,
-                    'batida': False,
-                    'batida_construcao': False,
-                    'batida_na': False,
-                    'escala': False,
-                    'escala_construcao': False,
-                    'escala_na': False,
-                    'feriados': False,
-                    'feriados_construcao': False,
-                    'feriados_na': False
-                }
-            
-            # Se é categoria "Geral", sempre usa esse status (prioridade máxima)
-            if categoria == "Geral":
-                clientes_checklist_completo[cliente]['status_original'] = chamado['status']
-            
-            # Marca a categoria como concluída, em construção ou N/A
-            cat = (chamado.get('categoria') or '').lower()
-            status_lower = (chamado.get('status') or '').lower()
-            observacao = (chamado.get('observacao') or '').strip()
-            is_construcao = 'constru' in status_lower or status_lower.startswith('6')
-            is_na = observacao == 'N/A'
-
-            if 'batida' in cat:
-                if is_na:
-                    clientes_checklist_completo[cliente]['batida_na'] = True
-                elif is_construcao:
-                    clientes_checklist_completo[cliente]['batida_construcao'] = True
-                else:
-                    clientes_checklist_completo[cliente]['batida'] = True
-            elif 'escala' in cat:
-                if is_na:
-                    clientes_checklist_completo[cliente]['escala_na'] = True
-                elif is_construcao:
-                    clientes_checklist_completo[cliente]['escala_construcao'] = True
-                else:
-                    clientes_checklist_completo[cliente]['escala'] = True
-            elif 'feriado' in cat:
-                if is_na:
-                    clientes_checklist_completo[cliente]['feriados_na'] = True
-                elif is_construcao:
-                    clientes_checklist_completo[cliente]['feriados_construcao'] = True
-                else:
-                    clientes_checklist_completo[cliente]['feriados'] = True
-            elif 'funcionario' in cat or 'funcionário' in cat:
-                if is_na:
-                    clientes_checklist_completo[cliente]['funcionarios_na'] = True
-                elif is_construcao:
-                    clientes_checklist_completo[cliente]['funcionarios_construcao'] = True
-                else:
-                    clientes_checklist_completo[cliente]['funcionarios'] = True
-            elif 'pdv' in cat:
-                if is_na:
-                    clientes_checklist_completo[cliente]['pdv_na'] = True
-                elif is_construcao:
-                    clientes_checklist_completo[cliente]['pdv_construcao'] = True
-                else:
-                    clientes_checklist_completo[cliente]['pdv'] = True
-            elif 'venda' in cat:
-                if is_na:
-                    clientes_checklist_completo[cliente]['venda_na'] = True
-                elif is_construcao:
-                    clientes_checklist_completo[cliente]['venda_construcao'] = True
-                else:
-                    clientes_checklist_completo[cliente]['venda'] = True
-            elif 'sso' in cat:
-                if is_na:
-                    clientes_checklist_completo[cliente]['sso_na'] = True
-                elif is_construcao:
-                    clientes_checklist_completo[cliente]['sso_construcao'] = True
-                else:
-                    clientes_checklist_completo[cliente]['sso'] = True
-        
-        # AGORA aplica os filtros (remove clientes cujo status não está no filtro)
-        clientes_checklist = {}
-        for cliente, dados in clientes_checklist_completo.items():
-            # Pega o chamado para verificar classificação
-            chamado_cliente = next((c for c in chamados_sem_int if c['cliente'] == cliente), None)
-            
-            # Aplica filtros
-            if dados['status_original'] in status_filtro_dash and (
-                not busca_cliente_dash or busca_cliente_dash.lower() in cliente.lower()
-            ) and (chamado_cliente and (not class_filtro_dash or chamado_cliente.get('classificacao','Guilherme') in class_filtro_dash)):
-                dados['status'] = dados['status_original']  # Mantém o status original
-                clientes_checklist[cliente] = dados
+        # Matriz calculada no banco (um pivot por cliente), com os mesmos filtros
+        clientes_checklist = obter_matriz_checklist(**filtros_dash)
         
         if clientes_checklist:
+            # Ícone e cor de cada estado da célula
+            icones_checklist = {
+                'na': ('N/A', '#8FA9BF'),
+                'construcao': ('🛠️', '#2E6FB2'),
+                'problema': ('✗', "#E91616"),
+                'ok': ('✓', "#045F2D"),
+            }
+            
             # Exibe a tabela
             table_html = '<div style="background: #f5f5f5; border-radius: 10px; padding: 15px; border: 1px solid #e0e0e0;">'
             table_html += '<table style="width: 100%; border-collapse: collapse;">'
@@ -443,40 +500,13 @@ with tab_dashboard:
             table_html += '<th style="padding: 10px; text-align: center; color: #888; font-size: 11px;">SSO</th>'
             table_html += '</tr></thead><tbody>'
 
-            for cliente, dados in clientes_checklist.items():
-                # Função para escolher ícone baseado nos estados
-                def pick_icon(has_chamado, construcao, na):
-                    # Ordem de prioridade:
-                    # 1) N/A -> mostrar 'N/A'
-                    # 2) Em construção -> mostrar 🛠️
-                    # 3) Existe chamado (qualquer) -> mostrar ✗ (problema pendente)
-                    # 4) Sem chamado -> mostrar ✓ (ok)
-                    if na:
-                        return ('N/A', '#8FA9BF')
-                    if construcao:
-                        return ('🛠️', '#2E6FB2')
-                    if has_chamado:
-                        return ('✗', "#E91616")
-                    return ('✓', "#045F2D")
-
-                batida_icon, batida_color = pick_icon(dados.get('batida'), dados.get('batida_construcao'), dados.get('batida_na'))
-                escala_icon, escala_color = pick_icon(dados.get('escala'), dados.get('escala_construcao'), dados.get('escala_na'))
-                feriados_icon, feriados_color = pick_icon(dados.get('feriados'), dados.get('feriados_construcao'), dados.get('feriados_na'))
-                funcionarios_icon, funcionarios_color = pick_icon(dados.get('funcionarios'), dados.get('funcionarios_construcao'), dados.get('funcionarios_na'))
-                pdv_icon, pdv_color = pick_icon(dados.get('pdv'), dados.get('pdv_construcao'), dados.get('pdv_na'))
-                venda_icon, venda_color = pick_icon(dados.get('venda'), dados.get('venda_construcao'), dados.get('venda_na'))
-                sso_icon, sso_color = pick_icon(dados.get('sso'), dados.get('sso_construcao'), dados.get('sso_na'))
-
+            for dados in clientes_checklist:
                 table_html += '<tr style="border-bottom: 1px solid #e0e0e0;">'
-                table_html += f'<td style="padding: 10px; color: #111;">{cliente}</td>'
+                table_html += f'<td style="padding: 10px; color: #111;">{dados["cliente"]}</td>'
                 table_html += f'<td style="padding: 10px; text-align: center;">{status_badge(dados["status"])}</td>'
-                table_html += f'<td style="padding: 10px; text-align: center; color: {batida_color}; font-size: 20px;">{batida_icon}</td>'
-                table_html += f'<td style="padding: 10px; text-align: center; color: {escala_color}; font-size: 20px;">{escala_icon}</td>'
-                table_html += f'<td style="padding: 10px; text-align: center; color: {feriados_color}; font-size: 20px;">{feriados_icon}</td>'
-                table_html += f'<td style="padding: 10px; text-align: center; color: {funcionarios_color}; font-size: 20px;">{funcionarios_icon}</td>'
-                table_html += f'<td style="padding: 10px; text-align: center; color: {pdv_color}; font-size: 20px;">{pdv_icon}</td>'
-                table_html += f'<td style="padding: 10px; text-align: center; color: {venda_color}; font-size: 20px;">{venda_icon}</td>'
-                table_html += f'<td style="padding: 10px; text-align: center; color: {sso_color}; font-size: 20px;">{sso_icon}</td>'
+                for coluna, _ in COLUNAS_CHECKLIST:
+                    icone, cor = icones_checklist[dados[coluna]]
+                    table_html += f'<td style="padding: 10px; text-align: center; color: {cor}; font-size: 20px;">{icone}</td>'
                 table_html += '</tr>'
 
             table_html += '</tbody></table></div>'
@@ -487,38 +517,16 @@ with tab_dashboard:
     st.divider()
     
     # ==================== GRÁFICO DE CHAMADOS POR CLIENTE ====================
+    marcar_trecho("grafico_cliente")
     st.subheader(" Chamados por Cliente (Totalizado)")
     
-    # Busca todos os chamados (abertos e resolvidos) e agrupa por cliente
-    from database import get_db
-    
-    status_criticos = STATUS_OPTIONS[:2]  # 1 e 2
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT c.nome as cliente,
-                   COALESCE(SUM(CASE 
-                           WHEN (ch.data_resolucao IS NULL OR ch.data_resolucao = '') 
-                                AND ch.status IN (?, ?) THEN 1 
-                           ELSE 0 END
-                   ), 0) as abertos,
-                   COALESCE(SUM(CASE 
-                           WHEN (ch.data_resolucao IS NOT NULL AND ch.data_resolucao != '') 
-                                AND COALESCE(ch.status_original, ch.status) IN (?, ?) THEN 1 
-                           ELSE 0 END
-                   ), 0) as resolvidos
-            FROM chamados ch
-            JOIN clientes c ON ch.cliente_id = c.id
-            WHERE ch.status IN (?, ?) OR COALESCE(ch.status_original, ch.status) IN (?, ?)
-            GROUP BY c.nome
-            HAVING abertos > 0 OR resolvidos > 0
-            ORDER BY c.nome
-        """, status_criticos * 4)
-        dados_cliente = [dict(row) for row in cursor.fetchall()]
-    
-    if dados_cliente:
-        # Converte para DataFrame e formata para o gráfico
-        df_clientes = pd.DataFrame(dados_cliente)
+    # Chamados (abertos e resolvidos) agrupados por cliente no snapshot, com a busca e o
+    # responsável dos filtros acima (sem restringir enquanto todos estão marcados)
+    responsaveis_grafico = class_filtro_dash if set(class_filtro_dash) != set(classificacoes_unicas) else None
+    df_clientes = totais_por_cliente(responsaveis_grafico or None, busca_cliente_dash or None)
+    
+    if not df_clientes.empty:
+        # Formata para o gráfico
         df_clientes_melted = df_clientes.melt(
             id_vars='cliente',
             value_vars=['abertos', 'resolvidos'],
@@ -527,6 +535,7 @@ with tab_dashboard:
         )
         
         # Cria o gráfico de barras
+        marcar_trecho("grafico_cliente.figura")
         fig_clientes = px.bar(
             df_clientes_melted,
             x='cliente',
@@ -549,19 +558,18 @@ with tab_dashboard:
         fig_clientes.update_yaxes(showline=False, showgrid=False, zeroline=False, ticks='', showticklabels=False, title='')
         fig_clientes.update_traces(texttemplate='%{y}', textposition='inside', textfont=dict(size=16, color='white'))
 
+        marcar_trecho("grafico_cliente.envio")
         st.plotly_chart(fig_clientes, use_container_width=True)
     else:
         st.info("Nenhum chamado registrado ainda.")
 
 # ==================== ABA CHECKLIST ====================
 with tab_checklist:
+    marcar_trecho("aba_checklist")
     st.subheader("⏳ Gerenciar Checklist de Integração")
     st.markdown("""Use esta aba para gerenciar clientes **sem integração completa** (novos, parciais ou em construção).
     Para problemas em clientes já implantados, use a aba **Chamados Ativos**.""")
     
-    # Buscar todos os clientes
-    todos_clientes = listar_clientes()
-    
     # Filtro de busca
     col_search, col_add = st.columns([3, 1])
     with col_search:
@@ -595,6 +603,40 @@ with tab_checklist:
                     st.session_state['show_add_modal'] = False
                     st.rerun()
     
+    # Importação em lote
+    with st.expander("📥 Importar Clientes e Chamados (CSV/XLSX)"):
+        st.caption("Colunas: cliente, status, categoria (obrigatórias), observacao, data_abertura, "
+                   "data_resolucao, resolucao, classificacao. Datas em AAAA-MM-DD ou DD/MM/AAAA.")
+        arquivo_importacao = st.file_uploader("Arquivo", type=["csv", "xlsx"], key="arquivo_importacao")
+        apenas_validar = st.checkbox("Apenas validar (não grava)", value=True, key="importacao_validar")
+        if arquivo_importacao and st.button("📥 Importar", key="btn_importar", use_container_width=True):
+            barra = st.progress(0.0, text="Importando...")
+            tamanho = max(arquivo_importacao.size, 1)
+            try:
+                relatorio = importar_chamados(
+                    ler_arquivo_importacao(arquivo_importacao, arquivo_importacao.name),
+                    simular=apenas_validar,
+                    # Progresso aproximado pela posição no arquivo (CSV); XLSX só ao final
+                    ao_progresso=lambda linhas: barra.progress(
+                        min(arquivo_importacao.tell() / tamanho, 1.0), text=f"{linhas} linhas lidas..."
+                    ),
+                )
+                barra.progress(1.0, text="Concluído")
+                acao = "válidos" if apenas_validar else "importados"
+                st.success(
+                    f"✅ {relatorio['importados']} chamados {acao} de {relatorio['linhas']} linhas "
+                    f"• {relatorio['clientes_novos']} clientes novos "
+                    f"• {relatorio['linhas_por_segundo']:.0f} linhas/s"
+                )
+                if relatorio['total_erros']:
+                    st.warning(f"⚠️ {relatorio['total_erros']} linhas com erro foram puladas")
+                    st.dataframe(
+                        pd.DataFrame(relatorio['erros'], columns=["Linha", "Erro"]),
+                        hide_index=True, use_container_width=True
+                    )
+            except Exception as e:
+                st.error(f"❌ Erro ao importar (nada foi gravado): {e}")
+    
     # Seção de Administração
     with st.expander("⚙️ Administração - Apagar Chamados"):
         st.warning("⚠️ Cuidado! Esta ação não pode ser desfeita.")
@@ -647,159 +689,204 @@ with tab_checklist:
     
     st.divider()
     
-    # Filtrar clientes
-    if busca_checklist:
-        clientes_filtrados = [c for c in todos_clientes if busca_checklist.lower() in c['nome'].lower()]
-    else:
-        clientes_filtrados = todos_clientes
+    # Paginação por nome (keyset): guarda o nome a partir do qual cada página visitada começa
+    tamanho_pagina = st.selectbox("Clientes por página", [25, 50, 100], key="checklist_tamanho_pagina")
+    filtro_atual = (busca_checklist, tamanho_pagina)
+    if st.session_state.get('checklist_filtro') != filtro_atual:
+        st.session_state['checklist_filtro'] = filtro_atual
+        st.session_state['checklist_cursores'] = [None]
+    cursores = st.session_state['checklist_cursores']
+    
+    clientes_pagina, ha_mais = listar_clientes_pagina(cursores[-1], tamanho_pagina, busca_checklist)
     
     st.divider()
-    st.markdown(f"**{len(clientes_filtrados)} clientes encontrados**")
-    
-    # Buscar chamados existentes para cada cliente
-    from database import get_db
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT cliente_id, status, categoria, id as chamado_id
-            FROM chamados
-            WHERE data_resolucao IS NULL OR data_resolucao = ''
-        """)
-        chamados_por_cliente = {}
-        for row in cursor.fetchall():
-            cid = row['cliente_id']
-            if cid not in chamados_por_cliente:
-                chamados_por_cliente[cid] = {'status': None, 'categorias': {}, 'status_source': None}
-            # Se for chamado 'Geral', sempre define o status geral do cliente (autoridade)
-            if row['categoria'] == 'Geral':
-                chamados_por_cliente[cid]['status'] = row['status']
-                chamados_por_cliente[cid]['status_source'] = 'Geral'
-            else:
-                # Define status de categoria apenas se ainda não houver um status geral definido
-                if chamados_por_cliente[cid]['status'] is None:
-                    if row['status'] in ['3. Novo cliente sem integração', '5. Implantado sem integração', '6. Integração Parcial', '8. Integração em construção']:
-                        chamados_por_cliente[cid]['status'] = row['status']
-            # Guarda categoria e seu chamado_id
-            chamados_por_cliente[cid]['categorias'][row['categoria']] = {
-                'status': row['status'],
-                'chamado_id': row['chamado_id']
-            }
+    st.markdown(f"**{contar_clientes(busca_checklist)} clientes encontrados** • página {len(cursores)}")
     
-    # Exibir cada cliente em um card expansível
-    for cliente in clientes_filtrados:
-        cliente_id = cliente['id']
-        cliente_nome = cliente['nome']
-        cliente_class = cliente.get('classificacao', 'Guilherme')
+    edicao_lote = st.toggle("✏️ Editar a página em lote", key="checklist_edicao_lote",
+                            help="Edita o checklist de todos os clientes da página numa tabela e salva tudo de uma vez")
+    if edicao_lote:
+        # Uma linha por cliente; ao salvar, só os clientes com alguma célula alterada são gravados
+        categorias_lote = listar_categorias()
+        estados_pagina = obter_estados_checklist([cliente['id'] for cliente in clientes_pagina])
+        df_original = pd.DataFrame([
+            {
+                'id': cliente['id'],
+                'Cliente': cliente['nome'],
+                'Status Geral': estados_pagina[cliente['id']][0],
+                **{categoria: estados_pagina[cliente['id']][1].get(categoria, ESTADO_OK) for categoria in categorias_lote},
+            }
+            for cliente in clientes_pagina
+        ], columns=['id', 'Cliente', 'Status Geral', *categorias_lote]).set_index('id')
         
-        # Pegar dados existentes
-        dados_cliente = chamados_por_cliente.get(cliente_id, {'status': None, 'categorias': {}})
-        status_atual = dados_cliente['status'] or '3. Novo cliente sem integração'
+        df_editado = st.data_editor(
+            df_original,
+            key=f"checklist_lote_{len(cursores)}",
+            hide_index=True,
+            use_container_width=True,
+            disabled=['Cliente'],
+            column_config={
+                'Status Geral': st.column_config.SelectboxColumn(options=STATUS_CHECKLIST, required=True),
+                **{
+                    categoria: st.column_config.SelectboxColumn(options=ESTADOS_CHECKLIST, required=True)
+                    for categoria in categorias_lote
+                },
+            },
+        )
         
-        with st.expander(f"👤 {cliente_nome} • {cliente_class}", expanded=False):
-            col_status, col_class = st.columns([2, 1])
-            
-            with col_status:
-                novo_status = st.selectbox(
-                    "Status Geral do Cliente",
-                    ["3. Novo cliente sem integração", "5. Implantado sem integração", "6. Integração Parcial", "8. Integração em construção"],
-                    index=["3. Novo cliente sem integração", "5. Implantado sem integração", "6. Integração Parcial", "8. Integração em construção"].index(status_atual),
-                    key=f"status_{cliente_id}"
+        alterados = df_editado.index[(df_editado != df_original).any(axis=1)]
+        st.caption(f"{len(alterados)} cliente(s) alterado(s)")
+        if st.button("💾 Salvar checklist da página", key="checklist_salvar_lote", type="primary", disabled=len(alterados) == 0):
+            try:
+                resultado = atualizar_checklists({
+                    int(cliente_id): (
+                        df_editado.at[cliente_id, 'Status Geral'],
+                        {categoria: df_editado.at[cliente_id, categoria] for categoria in categorias_lote},
+                    )
+                    for cliente_id in alterados
+                })
+                st.session_state.setdefault('saved_messages', []).append(
+                    f"✅ Checklist de {len(alterados)} cliente(s) atualizado! "
+                    f"({resultado['inseridos']} chamados criados, {resultado['atualizados']} alterados, {resultado['removidos']} removidos)"
                 )
+                st.rerun()
+            except Exception as e:
+                st.error(f"❌ Erro ao salvar (nada foi gravado): {e}")
+    else:
+        # Lista a página; só o cliente aberto cria os widgets de edição
+        cliente_aberto = st.session_state.get('checklist_cliente_aberto')
+        for cliente in clientes_pagina:
+            cliente_id = cliente['id']
+            cliente_nome = cliente['nome']
+            cliente_class = cliente.get('classificacao', 'Guilherme')
+            aberto = cliente_id == cliente_aberto
+        
+            if st.button(f"{'▼' if aberto else '▶'} 👤 {cliente_nome} • {cliente_class}", key=f"abrir_{cliente_id}", use_container_width=True):
+                st.session_state['checklist_cliente_aberto'] = None if aberto else cliente_id
+                st.rerun()
+            if not aberto:
+                continue
+        
+            # Pegar dados existentes
+            dados_cliente = obter_checklist_por_cliente(cliente_id).get(cliente_id, {'status': None, 'categorias': {}})
+            status_atual = dados_cliente['status'] or '3. Novo cliente sem integração'
+        
+            with st.container(border=True):
+                col_status, col_class = st.columns([2, 1])
             
-            with col_class:
-                nova_class = st.selectbox(
-                    "Responsável",
-                    ["Guilherme", "Eduardo", "Marcelo"],
-                    index=["Guilherme", "Eduardo", "Marcelo"].index(cliente_class) if cliente_class in ["Guilherme", "Eduardo", "Marcelo"] else 0,
-                    key=f"class_check_{cliente_id}"
-                )
-                if nova_class != cliente_class:
-                    if st.button("💾", key=f"save_class_{cliente_id}"):
-                        if atualizar_classificacao(cliente_id, nova_class):
-                            st.success("Responsável atualizado!")
-                            st.rerun()
+                with col_status:
+                    novo_status = st.selectbox(
+                        "Status Geral do Cliente",
+                        ["3. Novo cliente sem integração", "5. Implantado sem integração", "6. Integração Parcial", "8. Integração em construção"],
+                        index=["3. Novo cliente sem integração", "5. Implantado sem integração", "6. Integração Parcial", "8. Integração em construção"].index(status_atual),
+                        key=f"status_{cliente_id}"
+                    )
+            
+                with col_class:
+                    nova_class = st.selectbox(
+                        "Responsável",
+                        ["Guilherme", "Eduardo", "Marcelo"],
+                        index=["Guilherme", "Eduardo", "Marcelo"].index(cliente_class) if cliente_class in ["Guilherme", "Eduardo", "Marcelo"] else 0,
+                        key=f"class_check_{cliente_id}"
+                    )
+                    if nova_class != cliente_class:
+                        if st.button("💾", key=f"save_class_{cliente_id}"):
+                            if atualizar_classificacao(cliente_id, nova_class):
+                                st.success("Responsável atualizado!")
+                                st.rerun()
             
-            st.markdown("####  Categorias de Integração")
-            st.caption("Selecione o status de cada categoria de integração:")
+                st.markdown("####  Categorias de Integração")
+                st.caption("Selecione o status de cada categoria de integração:")
             
-            # Grid de categorias
-            categorias_integracoes = ["Batida", "Escala", "Feriados", "Funcionários", "PDV", "Venda", "SSO"]
+                # Grid de categorias
+                categorias_integracoes = ["Batida", "Escala", "Feriados", "Funcionários", "PDV", "Venda", "SSO"]
             
-            # Organizar em 4 colunas
-            cols = st.columns(4)
-            categorias_atualizadas = {}
+                # Organizar em 4 colunas
+                cols = st.columns(4)
+                categorias_atualizadas = {}
             
-            for idx, categoria in enumerate(categorias_integracoes):
-                col_idx = idx % 4
-                with cols[col_idx]:
-                    # Determinar estado atual da categoria
-                    cat_info = dados_cliente['categorias'].get(categoria, {})
-                    cat_status = cat_info.get('status', '')
+                for idx, categoria in enumerate(categorias_integracoes):
+                    col_idx = idx % 4
+                    with cols[col_idx]:
+                        # Determinar estado atual da categoria
+                        cat_info = dados_cliente['categorias'].get(categoria, {})
+                        cat_status = cat_info.get('status', '')
                     
-                    # Mapear para opção do selectbox
-                    opcoes = ["✓ OK", "✗ Problema", "🛠️ Em Construção", "N/A"]
+                        # Mapear para opção do selectbox
+                        opcoes = ["✓ OK", "✗ Problema", "🛠️ Em Construção", "N/A"]
                     
-                    if 'constru' in cat_status.lower() or cat_status == '8. Integração em construção':
-                        idx_atual = 2
-                    elif cat_status in ['3. Novo cliente sem integração', '5. Implantado sem integração', '6. Integração Parcial']:
-                        idx_atual = 1
-                    elif not cat_status or cat_status == '7. Status Normal':
-                        idx_atual = 0  # OK
-                    else:
-                        idx_atual = 0
+                        if 'constru' in cat_status.lower() or cat_status == '8. Integração em construção':
+                            idx_atual = 2
+                        elif cat_status in ['3. Novo cliente sem integração', '5. Implantado sem integração', '6. Integração Parcial']:
+                            idx_atual = 1
+                        elif not cat_status or cat_status == '7. Status Normal':
+                            idx_atual = 0  # OK
+                        else:
+                            idx_atual = 0
                     
-                    categorias_atualizadas[categoria] = st.selectbox(
-                        categoria,
-                        opcoes,
-                        index=idx_atual,
-                        key=f"cat_{cliente_id}_{categoria}"
-                    )
+                        categorias_atualizadas[categoria] = st.selectbox(
+                            categoria,
+                            opcoes,
+                            index=idx_atual,
+                            key=f"cat_{cliente_id}_{categoria}"
+                        )
             
-            st.divider()
+                st.divider()
             
-            # Botão para salvar todas as alterações
-            col_save, col_del = st.columns([3, 1])
-            with col_save:
-                if st.button("💾 Salvar Alterações", key=f"save_{cliente_id}", type="primary", use_container_width=True):
-                    try:
-                        from database import atualizar_cliente_checklist
-                        # Atualizar status e categorias
-                        atualizar_cliente_checklist(
-                            cliente_id=cliente_id,
-                            status_geral=novo_status,
-                            categorias=categorias_atualizadas
-                        )
-                        st.session_state.setdefault('saved_messages', []).append(f"✅ Checklist de {cliente_nome} atualizado!")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"❌ Erro ao salvar: {e}")
+                # Botão para salvar todas as alterações
+                col_save, col_del = st.columns([3, 1])
+                with col_save:
+                    if st.button("💾 Salvar Alterações", key=f"save_{cliente_id}", type="primary", use_container_width=True):
+                        try:
+                            from database import atualizar_cliente_checklist
+                            # Atualizar status e categorias
+                            atualizar_cliente_checklist(
+                                cliente_id=cliente_id,
+                                status_geral=novo_status,
+                                categorias=categorias_atualizadas
+                            )
+                            st.session_state.setdefault('saved_messages', []).append(f"✅ Checklist de {cliente_nome} atualizado!")
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"❌ Erro ao salvar: {e}")
             
-            with col_del:
-                if st.button("🗑️ Limpar Tudo", key=f"clear_{cliente_id}", type="secondary", use_container_width=True):
-                    try:
-                        from database import limpar_checklist_cliente
-                        limpar_checklist_cliente(cliente_id)
-                        st.session_state.setdefault('saved_messages', []).append(f"✅ Checklist de {cliente_nome} limpo!")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"❌ Erro: {e}")
-                st.markdown("<br>", unsafe_allow_html=True)
-                confirm = st.checkbox("Confirmar exclusão permanente deste cliente", key=f"confirm_excluir_{cliente_id}")
-                if confirm:
-                    if st.button("🗑️ Excluir Cliente", key=f"btn_excluir_cliente_{cliente_id}", type="secondary", use_container_width=True):
+                with col_del:
+                    if st.button("🗑️ Limpar Tudo", key=f"clear_{cliente_id}", type="secondary", use_container_width=True):
                         try:
-                            from database import excluir_cliente
-                            deleted = excluir_cliente(cliente_id)
-                            if deleted:
-                                st.session_state.setdefault('saved_messages', []).append(f"✅ Cliente '{cliente_nome}' e todos os registros vinculados foram excluídos!")
-                                st.rerun()
-                            else:
-                                st.warning("Nenhum registro excluído. Verifique se o cliente ainda existe.")
+                            from database import limpar_checklist_cliente
+                            limpar_checklist_cliente(cliente_id)
+                            st.session_state.setdefault('saved_messages', []).append(f"✅ Checklist de {cliente_nome} limpo!")
+                            st.rerun()
                         except Exception as e:
-                            st.error(f"❌ Erro ao excluir cliente: {e}")
+                            st.error(f"❌ Erro: {e}")
+                    st.markdown("<br>", unsafe_allow_html=True)
+                    confirm = st.checkbox("Confirmar exclusão permanente deste cliente", key=f"confirm_excluir_{cliente_id}")
+                    if confirm:
+                        if st.button("🗑️ Excluir Cliente", key=f"btn_excluir_cliente_{cliente_id}", type="secondary", use_container_width=True):
+                            try:
+                                from database import excluir_cliente
+                                deleted = excluir_cliente(cliente_id)
+                                if deleted:
+                                    st.session_state.setdefault('saved_messages', []).append(f"✅ Cliente '{cliente_nome}' e todos os registros vinculados foram excluídos!")
+                                    st.rerun()
+                                else:
+                                    st.warning("Nenhum registro excluído. Verifique se o cliente ainda existe.")
+                            except Exception as e:
+                                st.error(f"❌ Erro ao excluir cliente: {e}")
+    
+    # Navegação entre páginas
+    col_anterior, col_proxima = st.columns(2)
+    with col_anterior:
+        if st.button("◀ Anterior", key="checklist_anterior", disabled=len(cursores) == 1, use_container_width=True):
+            cursores.pop()
+            st.rerun()
+    with col_proxima:
+        if st.button("Próxima ▶", key="checklist_proxima", disabled=not ha_mais, use_container_width=True):
+            cursores.append(clientes_pagina[-1]['nome'])
+            st.rerun()
 
 # ==================== ABA CHAMADOS ATIVOS ====================
 with tab_chamados:
+    marcar_trecho("aba_chamados")
     st.subheader("🎫 Gerenciar Chamados Ativos")
     
     # Formulário para novo chamado
@@ -858,10 +945,10 @@ with tab_chamados:
     
     st.divider()
     
-    # Lista de chamados abertos (apenas status 1 e 2)
-    chamados = listar_chamados_problemas()
+    # Status presentes nos chamados abertos com problema (status 1 e 2)
+    status_problemas = listar_opcoes_filtro('problemas')['status']
     
-    if not chamados:
+    if not status_problemas:
         st.info("🎉 Nenhum chamado aberto! Tudo funcionando perfeitamente.")
     else:
         # Filtros
@@ -870,20 +957,15 @@ with tab_chamados:
         with col_filtro1:
             status_filtro = st.multiselect(
                 "Filtrar por Status",
-                options=list(set([c['status'] for c in chamados])),
-                default=list(set([c['status'] for c in chamados]))
+                options=status_problemas,
+                default=status_problemas
             )
         
         with col_filtro2:
             busca_nome = st.text_input("🔍 Buscar por cliente", placeholder="Digite o nome...")
         
-        # Aplica filtros
-        chamados_filtrados = [
-            c for c in chamados 
-            if c['status'] in status_filtro and (
-                not busca_nome or busca_nome.lower() in c['cliente'].lower()
-            )
-        ]
+        # Filtros aplicados no banco
+        chamados_filtrados = filtrar_chamados('problemas', status=status_filtro, busca=busca_nome or None)
         
         st.markdown(f"**{len(chamados_filtrados)} chamados encontrados**")
         
@@ -908,12 +990,7 @@ with tab_chamados:
                                 st.warning("Descreva o que foi resolvido!")
                                 st.stop()
                             # Atualiza o chamado com a resolução
-                            from database import get_db
-                            with get_db() as conn:
-                                cursor = conn.cursor()
-                                cursor.execute("""
-                                    UPDATE chamados SET resolucao = ?, status_original = COALESCE(status_original, status), status = '7. Status Normal', data_resolucao = CURRENT_DATE, atualizado_em = CURRENT_TIMESTAMP WHERE id = ?
-                                """, (resolucao_txt, chamado['chamado_id']))
+                            resolver_chamado(chamado['chamado_id'], resolucao=resolucao_txt)
                             st.success("Resolvido!")
                             st.rerun()
                     if st.button("🗑️ Excluir", key=f"excluir_ch_{chamado['chamado_id']}", type="secondary"):
@@ -925,23 +1002,44 @@ with tab_chamados:
 
 # ==================== ABA HISTÓRICO ====================
 with tab_historico:
+    marcar_trecho("aba_historico")
     st.subheader("✅ Histórico de Chamados Resolvidos")
     
-    historico = listar_chamados_resolvidos()
+    # Filtros aplicados no banco; a tela só recebe uma página por vez
+    col_busca_hist, col_cat_hist, col_ini_hist, col_fim_hist, col_tam_hist = st.columns([3, 2, 2, 2, 1])
+    with col_busca_hist:
+        busca_hist = st.text_input("🔍 Buscar no histórico", placeholder="Cliente, categoria, observação ou resolução...")
+    with col_cat_hist:
+        categoria_hist = st.selectbox("Categoria", ["Todas"] + listar_categorias(), key="hist_categoria")
+    with col_ini_hist:
+        inicio_hist = st.date_input("Resolvido de", value=None, format="DD/MM/YYYY", key="hist_inicio")
+    with col_fim_hist:
+        fim_hist = st.date_input("Resolvido até", value=None, format="DD/MM/YYYY", key="hist_fim")
+    with col_tam_hist:
+        tamanho_hist = st.selectbox("Por página", [25, 50, 100], key="hist_tamanho_pagina")
+    
+    filtros_hist = {
+        'texto': busca_hist or None,
+        'data_inicio': inicio_hist,
+        'data_fim': fim_hist,
+        'categoria': None if categoria_hist == "Todas" else categoria_hist,
+    }
+    
+    # Paginação por keyset: guarda o (data_resolucao, chamado_id) de onde cada página visitada começa
+    filtro_hist_atual = (tuple(filtros_hist.values()), tamanho_hist)
+    if st.session_state.get('hist_filtro') != filtro_hist_atual:
+        st.session_state['hist_filtro'] = filtro_hist_atual
+        st.session_state['hist_cursores'] = [None]
+    cursores_hist = st.session_state['hist_cursores']
+    
+    historico, ha_mais_hist = listar_chamados_resolvidos_pagina(cursores_hist[-1], tamanho_hist, **filtros_hist)
     
     if not historico:
-        st.info("Nenhum chamado resolvido ainda.")
+        st.info("Nenhum chamado resolvido encontrado.")
     else:
-        # Busca
-        busca_hist = st.text_input("🔍 Buscar no histórico", placeholder="Digite o nome do cliente...")
-        
-        # Filtra
-        if busca_hist:
-            historico = [h for h in historico if busca_hist.lower() in h['cliente'].lower()]
-        
-        st.markdown(f"**{len(historico)} chamados resolvidos**")
+        st.markdown(f"**{len(historico)} chamados resolvidos** • página {len(cursores_hist)}")
         
-        # Exibe os chamados diretamente da lista
+        # Exibe os chamados da página
         for chamado in historico:
             col_tab, col_btn1, col_btn2 = st.columns([4, 1, 1])
             
@@ -966,21 +1064,122 @@ with tab_historico:
                         st.rerun()
             
             st.divider()
+    
+    # Navegação entre páginas
+    col_anterior_hist, col_proxima_hist = st.columns(2)
+    with col_anterior_hist:
+        if st.button("◀ Anterior", key="hist_anterior", disabled=len(cursores_hist) == 1, use_container_width=True):
+            cursores_hist.pop()
+            st.rerun()
+    with col_proxima_hist:
+        if st.button("Próxima ▶", key="hist_proxima", disabled=not ha_mais_hist, use_container_width=True):
+            ultimo = historico[-1]
+            cursores_hist.append((ultimo['data_resolucao'], ultimo['chamado_id']))
+            st.rerun()
 
 
 
 # ==================== RODAPÉ ====================
+marcar_trecho("rodape")
 st.divider()
 st.caption("BI Integrações v2.0 | Moavi © 2026")
 
-# ==================== BOTÃO DE DOWNLOAD DO BANCO ====================
-with st.expander(''):
-    db_path = os.path.join(os.path.dirname(__file__), "integracoes.db")
-    if os.path.exists(db_path):
-        with open(db_path, "rb") as f:
-            st.download_button(
-                label="",
-                data=f,
-                file_name="integracoes.db",
-                mime="application/octet-stream"
+# ==================== EXPORTAÇÃO ====================
+# Os arquivos só são gerados ao clicar em baixar (data como função), direto do cursor em blocos
+def _gerar_exportacao(conjunto, formato):
+    def gerar():
+        arquivo = io.BytesIO()
+        if formato == 'Parquet':
+            exportar_parquet(arquivo, conjunto)
+        else:
+            exportar_csv(arquivo, conjunto)
+        return arquivo
+    return gerar
+
+def _gerar_copia_banco():
+    # Cópia consistente pela API de backup do SQLite (não lê o arquivo em uso)
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "integracoes.db")
+        copiar_banco(caminho)
+        with open(caminho, "rb") as f:
+            return f.read()
+
+with st.expander("📤 Exportar dados"):
+    col_conjunto, col_formato = st.columns([2, 1])
+    with col_conjunto:
+        conjunto_exportacao = st.selectbox(
+            "Dados", list(EXPORTACOES), format_func=EXPORTACOES.get, key="exportar_conjunto"
+        )
+    with col_formato:
+        formato_exportacao = st.radio("Formato", ["CSV", "Parquet"], horizontal=True, key="exportar_formato")
+    
+    col_arquivo, col_banco = st.columns(2)
+    with col_arquivo:
+        extensao = formato_exportacao.lower()
+        st.download_button(
+            label=f"⬇️ Baixar {EXPORTACOES[conjunto_exportacao].lower()} ({formato_exportacao})",
+            data=_gerar_exportacao(conjunto_exportacao, formato_exportacao),
+            file_name=f"{conjunto_exportacao}_{date.today().isoformat()}.{extensao}",
+            mime="text/csv" if extensao == "csv" else "application/octet-stream",
+            use_container_width=True,
+            key="exportar_baixar",
+        )
+    with col_banco:
+        st.download_button(
+            label="💾 Baixar cópia do banco (.db)",
+            data=_gerar_copia_banco,
+            file_name=f"integracoes_{date.today().isoformat()}.db",
+            mime="application/octet-stream",
+            use_container_width=True,
+            key="exportar_banco",
+        )
+
+with st.expander("🗄️ Backups"):
+    st.caption("Cópias verificadas (integrity_check) feitas com o app em uso; as mais antigas são apagadas automaticamente.")
+    if st.button("🗄️ Fazer backup agora", key="backup_agora"):
+        try:
+            with st.spinner("Copiando o banco..."):
+                resultado = criar_backup(comprimir=True)
+            st.success(f"✅ Backup criado: {os.path.basename(resultado['arquivo'])} "
+                       f"({resultado['bytes'] / 1024 / 1024:.1f} MB em {resultado['segundos']:.1f}s)")
+        except Exception as e:
+            st.error(f"❌ Erro no backup: {e}")
+    backups = listar_backups()
+    if backups:
+        st.dataframe(
+            pd.DataFrame([
+                {'Arquivo': os.path.basename(b['arquivo']), 'Data': b['data'], 'Tamanho (MB)': round(b['bytes'] / 1024 / 1024, 1)}
+                for b in backups
+            ]),
+            hide_index=True,
+            use_container_width=True,
+        )
+    else:
+        st.info("Nenhum backup ainda.")
+
+# ==================== PERFIL DO RERUN ====================
+if PERFIL_ATIVO:
+    perfil = encerrar_perfil(PERFIL_ARQUIVO)
+    with st.expander(f"🐢 Perfil deste rerun: {perfil['total_ms']:.0f} ms, {perfil['sql_ms']:.0f} ms em SQL"):
+        st.caption(f"Cada rerun também é gravado em {PERFIL_ARQUIVO} (uma linha JSON). "
+                   "\"Outros\" é o tempo fora do SQL: pandas, Plotly, montagem de HTML e envio ao navegador.")
+        st.dataframe(
+            pd.DataFrame([
+                {'Trecho': t['nome'], 'Total (ms)': round(t['ms'], 1), 'SQL (ms)': round(t['sql_ms'], 1),
+                 'Outros (ms)': round(t['ms'] - t['sql_ms'], 1), 'Consultas': t['consultas']}
+                for t in perfil['trechos']
+            ]),
+            hide_index=True,
+            use_container_width=True,
+        )
+        if perfil['consultas']:
+            st.dataframe(
+                pd.DataFrame([
+                    {'ms': round(c['ms'], 2), 'Linhas': c['linhas'], 'Trecho': c['trecho'], 'SQL': c['sql']}
+                    for c in sorted(perfil['consultas'], key=lambda c: -c['ms'])
+                ]),
+                hide_index=True,
+                use_container_width=True,
             )
+        do_cache = sum(leitura['cache'] for leitura in perfil['cache'])
+        st.caption(f"Leituras: {do_cache} servidas do cache, {len(perfil['cache']) - do_cache} no banco.")
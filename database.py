@@ -2,71 +2,1159 @@
 Sistema de Banco de Dados SQLite para BI de Integrações
 Versão simplificada e robusta
 """
+import csv
+import gzip
+import io
+import json
 import sqlite3
 import os
-from datetime import datetime
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from functools import lru_cache, wraps
+from datetime import date, datetime
 from contextlib import contextmanager
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "integracoes.db")
 
+# ==================== POOL DE CONEXÕES ====================
+# Cada thread do Streamlit pega uma conexão livre do pool e a devolve ao final,
+# então os reruns reaproveitam conexões já abertas em vez de reconectar a cada consulta.
+POOL_MAX_CONEXOES = 8          # conexões ociosas mantidas abertas
+POOL_VERIFICAR_APOS = 30.0     # segundos ociosa antes de testar a conexão novamente
+
+_pool_lock = threading.Lock()
+_pool_livres = []              # [(conn, db_path, ultimo_uso)]
+_local = threading.local()
+
+# ==================== CONFIGURAÇÃO DE ARMAZENAMENTO ====================
+# Podem ser ajustados por variáveis de ambiente sem alterar o código
+DB_BUSY_TIMEOUT = float(os.environ.get('BI_DB_BUSY_TIMEOUT', '5'))      # segundos esperando um lock
+DB_RETRY_TENTATIVAS = int(os.environ.get('BI_DB_RETRY_TENTATIVAS', '5'))
+DB_RETRY_ESPERA = float(os.environ.get('BI_DB_RETRY_ESPERA', '0.05'))   # espera inicial do backoff
+
+PRAGMAS_CONEXAO = {
+    'synchronous': 'NORMAL',    # seguro com WAL e bem mais rápido que FULL
+    'cache_size': -16000,       # ~16 MB de cache de páginas
+    'mmap_size': 67108864,      # 64 MB lidos via mmap
+    'temp_store': 'MEMORY',
+}
+
+def _nova_conexao():
+    """Abre uma conexão nova pronta para ser compartilhada pelo pool"""
+    conn = sqlite3.connect(DB_PATH, timeout=DB_BUSY_TIMEOUT, check_same_thread=False, factory=_ConexaoPerfilada)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT * 1000)}")
+    for pragma, valor in PRAGMAS_CONEXAO.items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+    return conn
+
+def _banco_ocupado(erro):
+    """Indica se o erro é de lock/ocupado (vale a pena tentar de novo)"""
+    msg = str(erro).lower()
+    return isinstance(erro, sqlite3.OperationalError) and ('locked' in msg or 'busy' in msg)
+
+def _esperar_backoff(tentativa):
+    """Espera exponencial com jitter entre tentativas"""
+    time.sleep(DB_RETRY_ESPERA * (2 ** tentativa) * (0.5 + random.random()))
+
+def com_retry(func):
+    """Repete a transação inteira quando o banco está ocupado por outra sessão"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        # Dentro de uma transação já aberta quem decide é o get_db externo
+        if getattr(_local, 'conn', None) is not None:
+            return func(*args, **kwargs)
+        for tentativa in range(DB_RETRY_TENTATIVAS):
+            try:
+                return func(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not _banco_ocupado(e) or tentativa == DB_RETRY_TENTATIVAS - 1:
+                    raise
+                _esperar_backoff(tentativa)
+    return wrapper
+
+def _commit_com_retry(conn):
+    """Faz o commit repetindo com backoff se o banco estiver ocupado"""
+    for tentativa in range(DB_RETRY_TENTATIVAS):
+        try:
+            conn.commit()
+            return
+        except sqlite3.OperationalError as e:
+            if not _banco_ocupado(e) or tentativa == DB_RETRY_TENTATIVAS - 1:
+                raise
+            _esperar_backoff(tentativa)
+
+def _conexao_saudavel(conn):
+    """Verifica se a conexão ainda responde"""
+    try:
+        conn.execute("SELECT 1").fetchone()
+        return True
+    except sqlite3.Error:
+        return False
+
+def _retirar_conexao():
+    """Retira uma conexão do pool (ou abre uma nova se não houver livres)"""
+    agora = time.monotonic()
+    while True:
+        with _pool_lock:
+            if not _pool_livres:
+                break
+            conn, path, ultimo_uso = _pool_livres.pop()
+        # Conexões de outro arquivo (DB_PATH alterado) ou quebradas são descartadas
+        if path != DB_PATH or (agora - ultimo_uso > POOL_VERIFICAR_APOS and not _conexao_saudavel(conn)):
+            conn.close()
+            continue
+        return conn
+    return _nova_conexao()
+
+def _devolver_conexao(conn):
+    """Devolve a conexão ao pool; fecha se o pool já estiver cheio"""
+    if conn.in_transaction:
+        conn.rollback()
+    with _pool_lock:
+        if len(_pool_livres) < POOL_MAX_CONEXOES:
+            _pool_livres.append((conn, DB_PATH, time.monotonic()))
+            return
+    conn.close()
+
+def fechar_conexoes():
+    """Fecha todas as conexões ociosas do pool"""
+    with _pool_lock:
+        livres = list(_pool_livres)
+        _pool_livres.clear()
+    for conn, _, _ in livres:
+        conn.close()
+
 @contextmanager
 def get_db():
-    """Context manager para conexões seguras"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    """Context manager para conexões seguras (reaproveita conexões do pool)"""
+    # Chamadas aninhadas na mesma thread usam a mesma conexão/transação
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        yield conn
+        return
+
+    conn = _retirar_conexao()
+    _local.conn = conn
+    _local.transacao = [] if CONSULTA_LENTA_MS > 0 else None
+    alteracoes_antes = conn.total_changes
     try:
         yield conn
-        conn.commit()
+        _commit_com_retry(conn)
+        # Qualquer escrita confirmada invalida o cache uma única vez por transação
+        if conn.total_changes != alteracoes_antes:
+            invalidar_cache()
     except Exception:
         conn.rollback()
         raise
     finally:
-        conn.close()
+        _local.conn = None
+        transacao, _local.transacao = _local.transacao, None
+        if transacao:
+            _registrar_lentas(conn, transacao)
+        _devolver_conexao(conn)
+
+# ==================== CACHE DE LEITURAS ====================
+# As funções de leitura guardam o resultado junto com a versão dos dados; toda transação
+# que altera linhas incrementa a versão, então um rerun que só mexe em filtros é servido
+# da memória. Os resultados são compartilhados entre sessões: não devem ser modificados.
+# (Escritas feitas por outros processos, como os scripts, só aparecem após invalidar_cache().)
+CACHE_MAX_ENTRADAS = 256
+
+_cache_lock = threading.Lock()
+_cache = OrderedDict()         # chave -> (versao, resultado)
+_versao_dados = 0
+
+def versao_dados():
+    """Versão atual dos dados (muda a cada escrita confirmada)"""
+    return _versao_dados
+
+def invalidar_cache():
+    """Incrementa a versão dos dados e descarta os resultados em cache"""
+    global _versao_dados
+    with _cache_lock:
+        _versao_dados += 1
+        _cache.clear()
+
+def _congelar(valor):
+    """Converte listas/sets/dicts em tuplas para usar como chave do cache"""
+    if isinstance(valor, dict):
+        return tuple(sorted((k, _congelar(v)) for k, v in valor.items()))
+    if isinstance(valor, (set, frozenset)):
+        return frozenset(_congelar(v) for v in valor)
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    return valor
+
+def em_cache(func):
+    """Guarda o resultado da leitura até a próxima escrita no banco"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        chave = (DB_PATH, func.__name__, _congelar(args), _congelar(kwargs))
+        with _cache_lock:
+            versao = _versao_dados
+            item = _cache.get(chave)
+            if item is not None and item[0] == versao:
+                _cache.move_to_end(chave)
+                _registrar_leitura(func.__name__, True)
+                return item[1]
+        _registrar_leitura(func.__name__, False)
+        resultado = func(*args, **kwargs)
+        with _cache_lock:
+            # Só guarda se nenhuma escrita aconteceu durante a consulta
+            if versao == _versao_dados:
+                _cache[chave] = (versao, resultado)
+                if len(_cache) > CACHE_MAX_ENTRADAS:
+                    _cache.popitem(last=False)
+        return resultado
+    return wrapper
+
+# ==================== PERFIL DOS RERUNS E CONSULTAS LENTAS ====================
+# Os cursores das conexões do pool medem cada comando SQL (duração somando execute e fetch,
+# linhas) quando há algo a registrar:
+# - perfil ativo na thread (cada rerun do Streamlit roda inteiro numa thread): o comando entra
+#   no perfil com o trecho da página em que rodou, e as leituras registram se vieram do cache;
+# - log de consultas lentas (CONSULTA_LENTA_MS > 0): ao fim de cada transação do get_db, os
+#   comandos acima do limite são gravados em consultas_lentas.jsonl ao lado do banco (ou em
+#   BI_CONSULTAS_LENTAS_ARQUIVO), uma linha JSON cada,
+#   com os parâmetros e o EXPLAIN QUERY PLAN. O relatório é o scripts/consultas_lentas.py.
+PERFIL_ARQUIVO = os.environ.get('BI_PERFIL_ARQUIVO') or os.path.join(os.path.dirname(DB_PATH), "perfil_reruns.jsonl")
+CONSULTA_LENTA_MS = float(os.environ.get('BI_CONSULTA_LENTA_MS', '250'))   # 0 desliga o log
+CONSULTAS_LENTAS_ARQUIVO = os.environ.get('BI_CONSULTAS_LENTAS_ARQUIVO')  # None = ao lado do banco atual
+CONSULTAS_LENTAS_MAX_PARAMETROS = 50   # listas maiores (ex.: IN com muitos ids) são cortadas no log
+
+_lentas_lock = threading.Lock()
+
+def arquivo_consultas_lentas():
+    """Caminho do log de consultas lentas (padrão: consultas_lentas.jsonl ao lado do banco atual)"""
+    return CONSULTAS_LENTAS_ARQUIVO or os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), "consultas_lentas.jsonl")
+
+def _perfil_ativo():
+    return getattr(_local, 'perfil', None)
+
+def _medindo():
+    """Indica se os comandos desta thread precisam ser medidos"""
+    return CONSULTA_LENTA_MS > 0 or _perfil_ativo() is not None
+
+class _CursorPerfilado(sqlite3.Cursor):
+    """Cursor que registra cada comando executado e as linhas lidas no perfil e na transação da thread"""
+    _consulta = None
+
+    def _medir(self, metodo, sql, parametros, muitos=False):
+        perfil = _perfil_ativo()
+        transacao = getattr(_local, 'transacao', None)
+        inicio = time.perf_counter()
+        try:
+            return metodo(sql, parametros)
+        finally:
+            if perfil is not None or transacao is not None:
+                self._consulta = {
+                    'sql': ' '.join(sql.split()),
+                    'ms': (time.perf_counter() - inicio) * 1000,
+                    'linhas': max(self.rowcount, 0),
+                    'trecho': perfil['trecho'] if perfil is not None else None,
+                }
+                if perfil is not None:
+                    perfil['consultas'].append(self._consulta)
+                if transacao is not None:
+                    # executemany pode receber um gerador (já consumido): parâmetros não são guardados
+                    transacao.append((self._consulta, sql, None if muitos else parametros))
+
+    def _ler(self, metodo, *args):
+        inicio = time.perf_counter()
+        linhas = metodo(*args)
+        if self._consulta is not None:
+            self._consulta['ms'] += (time.perf_counter() - inicio) * 1000
+            self._consulta['linhas'] += len(linhas) if isinstance(linhas, list) else linhas is not None
+        return linhas
+
+    def execute(self, sql, parametros=()):
+        return self._medir(super().execute, sql, parametros)
+
+    def executemany(self, sql, parametros):
+        return self._medir(super().executemany, sql, parametros, muitos=True)
+
+    def fetchone(self):
+        return self._ler(super().fetchone)
+
+    def fetchmany(self, *args):
+        return self._ler(super().fetchmany, *args)
+
+    def fetchall(self):
+        return self._ler(super().fetchall)
+
+    def __next__(self):
+        inicio = time.perf_counter()
+        linha = super().__next__()
+        if self._consulta is not None:
+            self._consulta['ms'] += (time.perf_counter() - inicio) * 1000
+            self._consulta['linhas'] += 1
+        return linha
+
+class _ConexaoPerfilada(sqlite3.Connection):
+    """Conexão do pool: entrega cursores que medem os comandos quando há perfil ou log de lentas"""
+    def cursor(self, factory=None):
+        if factory is None:
+            factory = _CursorPerfilado if _medindo() else sqlite3.Cursor
+        return super().cursor(factory)
+
+    # Connection.execute não passa por self.cursor(); só desvia quando há o que medir
+    def execute(self, sql, parametros=()):
+        if not _medindo():
+            return super().execute(sql, parametros)
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        if not _medindo():
+            return super().executemany(sql, parametros)
+        return self.cursor().executemany(sql, parametros)
+
+def _plano_consulta(conn, sql, parametros):
+    """Linhas do EXPLAIN QUERY PLAN, indentadas como a árvore do sqlite3 (None se não há plano)"""
+    try:
+        # cursor comum: o próprio EXPLAIN não é medido
+        cursor = conn.cursor(sqlite3.Cursor)
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, parametros or ())
+        profundidade = {0: -1}
+        plano = []
+        for no, pai, _, detalhe in cursor.fetchall():
+            profundidade[no] = profundidade.get(pai, -1) + 1
+            plano.append("  " * profundidade[no] + detalhe)
+        return plano or None
+    except sqlite3.Error:
+        # BEGIN/PRAGMA/DDL não têm plano; executemany não guarda os parâmetros
+        return None
+
+def _parametros_log(parametros):
+    """Parâmetros do comando em forma gravável em JSON (listas longas são cortadas)"""
+    if parametros is None or isinstance(parametros, dict):
+        return parametros
+    parametros = list(parametros)
+    if len(parametros) > CONSULTAS_LENTAS_MAX_PARAMETROS:
+        excedentes = len(parametros) - CONSULTAS_LENTAS_MAX_PARAMETROS
+        parametros = parametros[:CONSULTAS_LENTAS_MAX_PARAMETROS] + [f"... (+{excedentes})"]
+    return parametros
+
+def _registrar_lentas(conn, transacao):
+    """Grava no log os comandos da transação que passaram de CONSULTA_LENTA_MS"""
+    lentas = [item for item in transacao if item[0]['ms'] >= CONSULTA_LENTA_MS]
+    if not lentas:
+        return
+    agora = datetime.now().isoformat(timespec='seconds')
+    linhas = [
+        json.dumps({
+            'data': agora,
+            'ms': round(consulta['ms'], 3),
+            'linhas': consulta['linhas'],
+            'sql': consulta['sql'],
+            'parametros': _parametros_log(parametros),
+            'plano': _plano_consulta(conn, sql, parametros),
+        }, ensure_ascii=False, default=str)
+        for consulta, sql, parametros in lentas
+    ]
+    try:
+        with _lentas_lock, open(arquivo_consultas_lentas(), 'a', encoding='utf-8') as f:
+            f.write("\n".join(linhas) + "\n")
+    except OSError as e:
+        print(f"⚠️ Não foi possível gravar o log de consultas lentas: {e}")
+
+def iniciar_perfil():
+    """Começa a registrar os comandos SQL e trechos desta thread (substitui um perfil anterior)"""
+    _local.perfil = {
+        'inicio': time.perf_counter(),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'trecho': None,
+        'inicio_trecho': None,
+        'trechos': [],
+        'consultas': [],
+        'cache': [],
+    }
+    return _local.perfil
+
+def marcar_trecho(nome):
+    """Fecha o trecho atual do perfil e abre o próximo (sem perfil ativo não faz nada)"""
+    perfil = _perfil_ativo()
+    if perfil is None:
+        return
+    agora = time.perf_counter()
+    if perfil['trecho'] is not None:
+        perfil['trechos'].append({'nome': perfil['trecho'], 'ms': (agora - perfil['inicio_trecho']) * 1000})
+    perfil['trecho'], perfil['inicio_trecho'] = nome, agora
+
+def _registrar_leitura(nome, do_cache):
+    perfil = _perfil_ativo()
+    if perfil is not None:
+        perfil['cache'].append({'funcao': nome, 'cache': do_cache, 'trecho': perfil['trecho']})
+
+def encerrar_perfil(arquivo=None):
+    """
+    Encerra o perfil da thread e devolve o resumo (None se não havia perfil):
+    total_ms, sql_ms, trechos [{nome, ms, sql_ms, consultas}], consultas
+    [{sql, ms, linhas, trecho}] e cache [{funcao, cache, trecho}].
+    Com arquivo, acrescenta o resumo como uma linha JSON (para análise offline).
+    """
+    marcar_trecho(None)
+    perfil = _perfil_ativo()
+    _local.perfil = None
+    if perfil is None:
+        return None
+    for trecho in perfil['trechos']:
+        consultas = [c for c in perfil['consultas'] if c['trecho'] == trecho['nome']]
+        trecho['sql_ms'] = sum(c['ms'] for c in consultas)
+        trecho['consultas'] = len(consultas)
+    resumo = {
+        'data': perfil['data'],
+        'total_ms': (time.perf_counter() - perfil['inicio']) * 1000,
+        'sql_ms': sum(c['ms'] for c in perfil['consultas']),
+        'trechos': perfil['trechos'],
+        'consultas': perfil['consultas'],
+        'cache': perfil['cache'],
+    }
+    if arquivo:
+        with open(arquivo, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(resumo, ensure_ascii=False) + "\n")
+    return resumo
+
+def configurar_armazenamento(conn):
+    """Ativa o modo WAL para leituras não bloquearem durante as gravações"""
+    modo = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+    if modo.lower() != 'wal':
+        print(f"⚠️ Não foi possível ativar WAL (modo atual: {modo})")
+    return modo
+
+def _criar_schema_inicial(cursor):
+    """Schema original (versão 0); as migrações levam o banco até a versão atual"""
+    # Tabela de clientes
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS clientes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT UNIQUE NOT NULL,
+            ativo BOOLEAN DEFAULT 1,
+            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            classificacao TEXT DEFAULT 'Guilherme',
+            atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Tabela de chamados/integrações
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS chamados (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cliente_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            categoria TEXT NOT NULL,
+            observacao TEXT,
+            resolucao TEXT,
+            data_abertura DATE NOT NULL,
+            data_resolucao DATE,
+            status_original TEXT,
+            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (cliente_id) REFERENCES clientes(id)
+        )
+    """)
 
 def init_db():
     """Inicializa o banco de dados com as tabelas necessárias"""
     with get_db() as conn:
+        configurar_armazenamento(conn)
         cursor = conn.cursor()
         
-        # Tabela de clientes
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS clientes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nome TEXT UNIQUE NOT NULL,
-                ativo BOOLEAN DEFAULT 1,
-                criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                classificacao TEXT DEFAULT 'Guilherme',
-                atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Tabela de chamados/integrações
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS chamados (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                cliente_id INTEGER NOT NULL,
-                status TEXT NOT NULL,
-                categoria TEXT NOT NULL,
-                observacao TEXT,
-                resolucao TEXT,
-                data_abertura DATE NOT NULL,
-                data_resolucao DATE,
-                status_original TEXT,
-                criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (cliente_id) REFERENCES clientes(id)
-            )
-        """)
+        # Banco novo: cria o schema original e deixa as migrações atualizarem
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chamados'")
+        if cursor.fetchone() is None:
+            _criar_schema_inicial(cursor)
         
-        # Índices para performance
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_chamados_cliente ON chamados(cliente_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_chamados_status ON chamados(status)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_chamados_categoria ON chamados(categoria)")
+        aplicar_migracoes(conn)
         
         print("✅ Banco de dados inicializado!")
 
+# ==================== CÓDIGOS DE STATUS E CATEGORIA ====================
+# Status e categorias ficam em tabelas pequenas; chamados guarda só o ID inteiro.
+# As flags substituem as listas de textos e os LIKE espalhados pelas consultas.
+STATUS_NORMAL = "7. Status Normal"
+STATUS_PROBLEMA = "1. Implantado com problema"
+STATUS_CONSTRUCAO = "8. Integração em construção"
+
+# (nome, critico, checklist, construcao, normal)
+STATUS_PADRAO = [
+    ("1. Implantado com problema", 1, 0, 0, 0),
+    ("2. Implantado refazendo", 1, 0, 0, 0),
+    ("3. Novo cliente sem integração", 0, 1, 0, 0),
+    ("5. Implantado sem integração", 0, 1, 0, 0),
+    ("6. Integração Parcial", 0, 1, 0, 0),
+    ("7. Status Normal", 0, 0, 0, 1),
+    ("8. Integração em construção", 0, 1, 1, 0),
+]
+
+# (nome, geral)
+CATEGORIAS_PADRAO = [
+    ("Batida", 0), ("Escala", 0), ("Feriados", 0), ("Funcionários", 0),
+    ("PDV", 0), ("Venda", 0), ("SSO", 0), ("Geral", 1),
+]
+
+def _flags_status(nome):
+    """Deduz as flags de um status novo pelo texto (mesmas regras usadas antes nas consultas)"""
+    texto = nome.lower()
+    construcao = int('constru' in texto)
+    checklist = int('sem integração' in texto or 'parcial' in texto or bool(construcao))
+    normal = int('status normal' in texto)
+    critico = int(not (checklist or normal) and ('problema' in texto or 'refazendo' in texto))
+    return critico, checklist, construcao, normal
+
+def _criar_tabelas_de_codigos(cursor):
+    """Cria e popula as tabelas status_chamado e categorias"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS status_chamado (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT UNIQUE NOT NULL,
+            critico INTEGER NOT NULL DEFAULT 0,
+            checklist INTEGER NOT NULL DEFAULT 0,
+            construcao INTEGER NOT NULL DEFAULT 0,
+            normal INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS categorias (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT UNIQUE NOT NULL,
+            geral INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.executemany("""
+        INSERT OR IGNORE INTO status_chamado (nome, critico, checklist, construcao, normal)
+        VALUES (?, ?, ?, ?, ?)
+    """, STATUS_PADRAO)
+    cursor.executemany("INSERT OR IGNORE INTO categorias (nome, geral) VALUES (?, ?)", CATEGORIAS_PADRAO)
+
+def _id_status(cursor, nome):
+    """Retorna o ID do status, cadastrando-o se ainda não existir"""
+    cursor.execute("SELECT id FROM status_chamado WHERE nome = ?", (nome,))
+    row = cursor.fetchone()
+    if row:
+        return row[0]
+    cursor.execute("""
+        INSERT INTO status_chamado (nome, critico, checklist, construcao, normal)
+        VALUES (?, ?, ?, ?, ?)
+    """, (nome, *_flags_status(nome)))
+    return cursor.lastrowid
+
+def _id_categoria(cursor, nome):
+    """Retorna o ID da categoria, cadastrando-a se ainda não existir"""
+    cursor.execute("SELECT id FROM categorias WHERE nome = ?", (nome,))
+    row = cursor.fetchone()
+    if row:
+        return row[0]
+    cursor.execute("INSERT INTO categorias (nome, geral) VALUES (?, ?)", (nome, int(nome == 'Geral')))
+    return cursor.lastrowid
+
+def _criar_indices_chamados(cursor):
+    """Índices e triggers da tabela chamados (versão com códigos inteiros)"""
+    # Cobertura para obter_estatisticas (agrupa sem ordenar e sem ler a tabela)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chamados_estatisticas
+        ON chamados(status_id, categoria_id, status_original_id, observacao, data_resolucao, cliente_id)
+    """)
+    # Parcial e de cobertura para os chamados abertos, na ordem de data_abertura
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chamados_abertos
+        ON chamados(data_abertura, cliente_id, status_id, categoria_id, observacao, data_resolucao)
+        WHERE data_resolucao IS NULL
+    """)
+    # Operações do checklist por cliente (cliente_id + abertos + status)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chamados_cliente_aberto
+        ON chamados(cliente_id, data_resolucao, status_id)
+    """)
+    # Histórico ordenado por data de resolução (parcial: só resolvidos)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chamados_resolvidos
+        ON chamados(data_resolucao)
+        WHERE data_resolucao IS NOT NULL
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_chamados_categoria ON chamados(categoria_id)")
+    # Chamado aberto é sempre data_resolucao NULL, mesmo para gravações fora do database.py
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_chamados_aberto_nulo_insert
+        AFTER INSERT ON chamados WHEN NEW.data_resolucao = ''
+        BEGIN
+            UPDATE chamados SET data_resolucao = NULL WHERE id = NEW.id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_chamados_aberto_nulo_update
+        AFTER UPDATE OF data_resolucao ON chamados WHEN NEW.data_resolucao = ''
+        BEGIN
+            UPDATE chamados SET data_resolucao = NULL WHERE id = NEW.id;
+        END
+    """)
+
+# ==================== MIGRAÇÕES ====================
+# Cada migração roda uma única vez por arquivo de banco; a versão aplicada fica em
+# PRAGMA user_version. Para evoluir o schema, adicione uma função e uma entrada em MIGRACOES.
+
+def _migracao_indices_chamados_abertos(cursor):
+    """Índices casados com as consultas de chamados abertos/resolvidos"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_chamados_categoria ON chamados(categoria)")
+    # Parcial e de cobertura para os chamados abertos: atende o filtro e o ORDER BY data_abertura
+    # de listar_chamados_abertos/_completos/_problemas sem ler a tabela nem ordenar
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chamados_abertos
+        ON chamados(data_abertura, cliente_id, status, categoria, observacao, data_resolucao)
+        WHERE data_resolucao IS NULL OR data_resolucao = ''
+    """)
+    # Operações do checklist por cliente (cliente_id + abertos + status)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chamados_cliente_aberto
+        ON chamados(cliente_id, data_resolucao, status)
+    """)
+    # Histórico ordenado por data de resolução (parcial: só resolvidos)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chamados_resolvidos
+        ON chamados(data_resolucao)
+        WHERE data_resolucao IS NOT NULL
+    """)
+    # Substituídos pelos índices acima (mesmo prefixo ou versão parcial)
+    cursor.execute("DROP INDEX IF EXISTS idx_chamados_data_resolucao")
+    cursor.execute("DROP INDEX IF EXISTS idx_chamados_cliente")
+    cursor.execute("DROP INDEX IF EXISTS idx_chamados_status")
+
+def _migracao_aberto_nulo(cursor):
+    """Chamado aberto passa a ser sempre data_resolucao NULL (nunca string vazia)"""
+    cursor.execute("UPDATE chamados SET data_resolucao = NULL WHERE data_resolucao = ''")
+    # Garante a regra também para gravações feitas fora do database.py
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_chamados_aberto_nulo_insert
+        AFTER INSERT ON chamados WHEN NEW.data_resolucao = ''
+        BEGIN
+            UPDATE chamados SET data_resolucao = NULL WHERE id = NEW.id;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_chamados_aberto_nulo_update
+        AFTER UPDATE OF data_resolucao ON chamados WHEN NEW.data_resolucao = ''
+        BEGIN
+            UPDATE chamados SET data_resolucao = NULL WHERE id = NEW.id;
+        END
+    """)
+    # Recria o índice parcial com o predicado único "data_resolucao IS NULL"
+    cursor.execute("DROP INDEX IF EXISTS idx_chamados_abertos")
+    cursor.execute("""
+        CREATE INDEX idx_chamados_abertos
+        ON chamados(data_abertura, cliente_id, status, categoria, observacao, data_resolucao)
+        WHERE data_resolucao IS NULL
+    """)
+
+def _migracao_tabelas_de_codigos(cursor):
+    """Status e categoria passam a ser IDs inteiros das tabelas status_chamado/categorias"""
+    _criar_tabelas_de_codigos(cursor)
+    # Cadastra os textos já gravados (inclusive status_original) que não estão no padrão
+    cursor.execute("""
+        SELECT status FROM chamados
+        UNION SELECT status_original FROM chamados WHERE status_original IS NOT NULL
+    """)
+    for row in cursor.fetchall():
+        _id_status(cursor, row[0])
+    cursor.execute("SELECT DISTINCT categoria FROM chamados")
+    for row in cursor.fetchall():
+        _id_categoria(cursor, row[0])
+    
+    # Reconstrói chamados com as colunas inteiras (linhas menores, comparações mais rápidas)
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'chamados'")
+    sequencia = cursor.fetchone()
+    cursor.execute("""
+        CREATE TABLE chamados_novo (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cliente_id INTEGER NOT NULL,
+            status_id INTEGER NOT NULL,
+            categoria_id INTEGER NOT NULL,
+            observacao TEXT,
+            resolucao TEXT,
+            data_abertura DATE NOT NULL,
+            data_resolucao DATE,
+            status_original_id INTEGER,
+            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (cliente_id) REFERENCES clientes(id),
+            FOREIGN KEY (status_id) REFERENCES status_chamado(id),
+            FOREIGN KEY (categoria_id) REFERENCES categorias(id),
+            FOREIGN KEY (status_original_id) REFERENCES status_chamado(id)
+        )
+    """)
+    cursor.execute("""
+        INSERT INTO chamados_novo (id, cliente_id, status_id, categoria_id, observacao, resolucao,
+                                   data_abertura, data_resolucao, status_original_id, criado_em, atualizado_em)
+        SELECT ch.id, ch.cliente_id, s.id, cat.id, ch.observacao, ch.resolucao,
+               ch.data_abertura, ch.data_resolucao, so.id, ch.criado_em, ch.atualizado_em
+        FROM chamados ch
+        JOIN status_chamado s ON s.nome = ch.status
+        JOIN categorias cat ON cat.nome = ch.categoria
+        LEFT JOIN status_chamado so ON so.nome = ch.status_original
+    """)
+    cursor.execute("DROP TABLE chamados")  # leva junto os índices e triggers antigos
+    cursor.execute("ALTER TABLE chamados_novo RENAME TO chamados")
+    if sequencia:
+        cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'chamados'", (sequencia[0],))
+    _criar_indices_chamados(cursor)
+
+def _criar_resumos(cursor):
+    """Tabelas de resumo mantidas por triggers a cada INSERT/UPDATE/DELETE em chamados"""
+    # status_original_id 0 = sem status original (NULL não serve em chave primária)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS resumo_chamados (
+            status_id INTEGER NOT NULL,
+            categoria_id INTEGER NOT NULL,
+            status_original_id INTEGER NOT NULL,
+            obs_valida INTEGER NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            resolvidos INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (status_id, categoria_id, status_original_id, obs_valida)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS resumo_clientes (
+            cliente_id INTEGER NOT NULL,
+            status_id INTEGER NOT NULL,
+            status_original_id INTEGER NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            resolvidos INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (cliente_id, status_id, status_original_id)
+        ) WITHOUT ROWID
+    """)
+    
+    # Mesmo cálculo para NEW e OLD; data_resolucao '' conta como aberto (o trigger de
+    # normalização transforma em NULL logo depois, em qualquer ordem de disparo)
+    def chave_chamados(r):
+        return (f"{r}.status_id, {r}.categoria_id, IFNULL({r}.status_original_id, 0), "
+                f"IFNULL({r}.observacao != 'N/A', 0)")
+    
+    def somar(r):
+        return f"""
+            INSERT INTO resumo_chamados (status_id, categoria_id, status_original_id, obs_valida, total, resolvidos)
+            VALUES ({chave_chamados(r)}, 1, NULLIF({r}.data_resolucao, '') IS NOT NULL)
+            ON CONFLICT (status_id, categoria_id, status_original_id, obs_valida)
+            DO UPDATE SET total = total + 1, resolvidos = resolvidos + excluded.resolvidos;
+            INSERT INTO resumo_clientes (cliente_id, status_id, status_original_id, total, resolvidos)
+            VALUES ({r}.cliente_id, {r}.status_id, IFNULL({r}.status_original_id, 0), 1, NULLIF({r}.data_resolucao, '') IS NOT NULL)
+            ON CONFLICT (cliente_id, status_id, status_original_id)
+            DO UPDATE SET total = total + 1, resolvidos = resolvidos + excluded.resolvidos;
+        """
+    
+    def subtrair(r):
+        onde_chamados = (f"status_id = {r}.status_id AND categoria_id = {r}.categoria_id "
+                         f"AND status_original_id = IFNULL({r}.status_original_id, 0) "
+                         f"AND obs_valida = IFNULL({r}.observacao != 'N/A', 0)")
+        onde_clientes = (f"cliente_id = {r}.cliente_id AND status_id = {r}.status_id "
+                         f"AND status_original_id = IFNULL({r}.status_original_id, 0)")
+        return f"""
+            UPDATE resumo_chamados
+            SET total = total - 1, resolvidos = resolvidos - (NULLIF({r}.data_resolucao, '') IS NOT NULL)
+            WHERE {onde_chamados};
+            DELETE FROM resumo_chamados WHERE {onde_chamados} AND total <= 0;
+            UPDATE resumo_clientes
+            SET total = total - 1, resolvidos = resolvidos - (NULLIF({r}.data_resolucao, '') IS NOT NULL)
+            WHERE {onde_clientes};
+            DELETE FROM resumo_clientes WHERE {onde_clientes} AND total <= 0;
+        """
+    
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_resumo_insert AFTER INSERT ON chamados
+        BEGIN {somar('NEW')} END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_resumo_delete AFTER DELETE ON chamados
+        BEGIN {subtrair('OLD')} END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_resumo_update
+        AFTER UPDATE OF cliente_id, status_id, categoria_id, status_original_id, observacao, data_resolucao ON chamados
+        BEGIN {subtrair('OLD')} {somar('NEW')} END
+    """)
+
+def _popular_resumos(cursor):
+    """Recalcula as tabelas de resumo a partir de chamados"""
+    cursor.execute("DELETE FROM resumo_chamados")
+    cursor.execute("DELETE FROM resumo_clientes")
+    cursor.execute("""
+        INSERT INTO resumo_chamados (status_id, categoria_id, status_original_id, obs_valida, total, resolvidos)
+        SELECT status_id, categoria_id, IFNULL(status_original_id, 0), IFNULL(observacao != 'N/A', 0),
+               COUNT(*), COUNT(NULLIF(data_resolucao, ''))
+        FROM chamados
+        GROUP BY 1, 2, 3, 4
+    """)
+    cursor.execute("""
+        INSERT INTO resumo_clientes (cliente_id, status_id, status_original_id, total, resolvidos)
+        SELECT cliente_id, status_id, IFNULL(status_original_id, 0), COUNT(*), COUNT(NULLIF(data_resolucao, ''))
+        FROM chamados
+        GROUP BY 1, 2, 3
+    """)
+
+def _migracao_resumos(cursor):
+    """KPIs do dashboard passam a ler tabelas de resumo em vez de varrer chamados"""
+    _criar_resumos(cursor)
+    _popular_resumos(cursor)
+    # O índice largo de estatísticas deixa de ser necessário; basta status + abertos
+    cursor.execute("DROP INDEX IF EXISTS idx_chamados_estatisticas")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_chamados_status ON chamados(status_id, data_resolucao)")
+
+def _migracao_indice_historico(cursor):
+    """Histórico paginado filtrado por categoria sai do índice já na ordem de data_resolucao"""
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chamados_resolvidos_categoria
+        ON chamados(categoria_id, data_resolucao)
+        WHERE data_resolucao IS NOT NULL
+    """)
+
+def _criar_busca_texto(cursor):
+    """Tabelas FTS5 de busca textual, mantidas por triggers em clientes, chamados e categorias"""
+    # unicode61 remove_diacritics: "funcionario" casa com "Funcionários"; prefix acelera "termo*"
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS fts_chamados USING fts5(
+            cliente, categoria, observacao, resolucao,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3 4'
+        )
+    """)
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS fts_clientes USING fts5(
+            nome,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3 4'
+        )
+    """)
+    # Relevância: nome do cliente pesa mais que categoria, observação e resolução
+    cursor.execute("INSERT INTO fts_chamados(fts_chamados, rank) VALUES ('rank', 'bm25(10.0, 4.0, 1.0, 1.0)')")
+    
+    inserir_chamado = """
+        INSERT INTO fts_chamados (rowid, cliente, categoria, observacao, resolucao)
+        VALUES (NEW.id,
+                (SELECT nome FROM clientes WHERE id = NEW.cliente_id),
+                (SELECT nome FROM categorias WHERE id = NEW.categoria_id),
+                NEW.observacao, NEW.resolucao);
+    """
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_fts_chamados_insert AFTER INSERT ON chamados
+        BEGIN {inserir_chamado} END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_fts_chamados_delete AFTER DELETE ON chamados
+        BEGIN DELETE FROM fts_chamados WHERE rowid = OLD.id; END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_fts_chamados_update
+        AFTER UPDATE OF cliente_id, categoria_id, observacao, resolucao ON chamados
+        BEGIN DELETE FROM fts_chamados WHERE rowid = OLD.id; {inserir_chamado} END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_fts_clientes_insert AFTER INSERT ON clientes
+        BEGIN INSERT INTO fts_clientes (rowid, nome) VALUES (NEW.id, NEW.nome); END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_fts_clientes_delete AFTER DELETE ON clientes
+        BEGIN DELETE FROM fts_clientes WHERE rowid = OLD.id; END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_fts_clientes_update AFTER UPDATE OF nome ON clientes
+        BEGIN
+            UPDATE fts_clientes SET nome = NEW.nome WHERE rowid = OLD.id;
+            UPDATE fts_chamados SET cliente = NEW.nome
+            WHERE rowid IN (SELECT id FROM chamados WHERE cliente_id = NEW.id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_fts_categorias_update AFTER UPDATE OF nome ON categorias
+        BEGIN
+            UPDATE fts_chamados SET categoria = NEW.nome
+            WHERE rowid IN (SELECT id FROM chamados WHERE categoria_id = NEW.id);
+        END
+    """)
+
+def _popular_busca_texto(cursor):
+    """Recarrega as tabelas FTS a partir de clientes e chamados"""
+    cursor.execute("DELETE FROM fts_chamados")
+    cursor.execute("DELETE FROM fts_clientes")
+    cursor.execute("INSERT INTO fts_clientes (rowid, nome) SELECT id, nome FROM clientes")
+    cursor.execute("""
+        INSERT INTO fts_chamados (rowid, cliente, categoria, observacao, resolucao)
+        SELECT ch.id, c.nome, cat.nome, ch.observacao, ch.resolucao
+        FROM chamados ch
+        LEFT JOIN clientes c ON c.id = ch.cliente_id
+        LEFT JOIN categorias cat ON cat.id = ch.categoria_id
+    """)
+    cursor.execute("INSERT INTO fts_chamados(fts_chamados) VALUES ('optimize')")
+    cursor.execute("INSERT INTO fts_clientes(fts_clientes) VALUES ('optimize')")
+
+def _migracao_busca_texto(cursor):
+    """Busca textual (FTS5) em clientes, observações e resoluções"""
+    _criar_busca_texto(cursor)
+    _popular_busca_texto(cursor)
+
+# Chamados de problema que entram nas séries: fora do checklist (pelo status original, para o
+# chamado não mudar de grupo ao ser resolvido), fora da categoria Geral e sem observação N/A
+def _escopo_serie(r):
+    return (f"IFNULL({r}.observacao != 'N/A', 0) "
+            f"AND NOT (SELECT geral FROM categorias WHERE id = {r}.categoria_id) "
+            f"AND NOT (SELECT checklist FROM status_chamado WHERE id = IFNULL({r}.status_original_id, {r}.status_id))")
+
+def _criar_series(cursor):
+    """
+    Séries diárias dos chamados de problema, mantidas por triggers em chamados e clientes:
+    serie_chamados conta, por dia, os chamados abertos e os resolvidos naquele dia, e
+    serie_resolucao guarda, por dia de resolução, quantos levaram N dias (histograma, para
+    a mediana). O backlog de um dia é a soma acumulada de abertos menos resolvidos.
+    O responsável é o atual do cliente.
+    """
+    # dia é DATE como as datas de chamados: com afinidades diferentes, as comparações dos
+    # triggers (dia = NEW.data_abertura) não conseguem usar a chave primária
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS serie_chamados (
+            dia DATE NOT NULL,
+            categoria_id INTEGER NOT NULL,
+            responsavel TEXT NOT NULL,
+            abertos INTEGER NOT NULL DEFAULT 0,
+            resolvidos INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dia, categoria_id, responsavel)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS serie_resolucao (
+            dia DATE NOT NULL,
+            categoria_id INTEGER NOT NULL,
+            responsavel TEXT NOT NULL,
+            dias INTEGER NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dia, categoria_id, responsavel, dias)
+        ) WITHOUT ROWID
+    """)
+
+    # data_resolucao '' conta como aberto, como nos resumos
+    def responsavel(r):
+        return f"IFNULL((SELECT classificacao FROM clientes WHERE id = {r}.cliente_id), '')"
+
+    def dias(r):
+        return f"MAX(CAST(julianday({r}.data_resolucao) - julianday({r}.data_abertura) AS INTEGER), 0)"
+
+    def somar(r):
+        resolvido = f"NULLIF({r}.data_resolucao, '') IS NOT NULL AND {_escopo_serie(r)}"
+        return f"""
+            INSERT INTO serie_chamados (dia, categoria_id, responsavel, abertos)
+            SELECT {r}.data_abertura, {r}.categoria_id, {responsavel(r)}, 1
+            WHERE {_escopo_serie(r)}
+            ON CONFLICT (dia, categoria_id, responsavel) DO UPDATE SET abertos = abertos + 1;
+            INSERT INTO serie_chamados (dia, categoria_id, responsavel, resolvidos)
+            SELECT {r}.data_resolucao, {r}.categoria_id, {responsavel(r)}, 1
+            WHERE {resolvido}
+            ON CONFLICT (dia, categoria_id, responsavel) DO UPDATE SET resolvidos = resolvidos + 1;
+            INSERT INTO serie_resolucao (dia, categoria_id, responsavel, dias, total)
+            SELECT {r}.data_resolucao, {r}.categoria_id, {responsavel(r)}, {dias(r)}, 1
+            WHERE {resolvido}
+            ON CONFLICT (dia, categoria_id, responsavel, dias) DO UPDATE SET total = total + 1;
+        """
+
+    def subtrair(r):
+        resolvido = f"NULLIF({r}.data_resolucao, '') IS NOT NULL AND {_escopo_serie(r)}"
+        no_grupo = f"categoria_id = {r}.categoria_id AND responsavel = {responsavel(r)}"
+        return f"""
+            UPDATE serie_chamados SET abertos = abertos - 1
+            WHERE dia = {r}.data_abertura AND {no_grupo} AND {_escopo_serie(r)};
+            UPDATE serie_chamados SET resolvidos = resolvidos - 1
+            WHERE dia = {r}.data_resolucao AND {no_grupo} AND {resolvido};
+            DELETE FROM serie_chamados
+            WHERE dia IN ({r}.data_abertura, {r}.data_resolucao) AND {no_grupo}
+              AND abertos <= 0 AND resolvidos <= 0;
+            UPDATE serie_resolucao SET total = total - 1
+            WHERE dia = {r}.data_resolucao AND {no_grupo} AND dias = {dias(r)} AND {resolvido};
+            DELETE FROM serie_resolucao
+            WHERE dia = {r}.data_resolucao AND {no_grupo} AND dias = {dias(r)} AND total <= 0;
+        """
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_serie_insert AFTER INSERT ON chamados
+        BEGIN {somar('NEW')} END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_serie_delete AFTER DELETE ON chamados
+        BEGIN {subtrair('OLD')} END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_serie_update
+        AFTER UPDATE OF cliente_id, status_id, categoria_id, status_original_id, observacao,
+                        data_abertura, data_resolucao ON chamados
+        BEGIN {subtrair('OLD')} {somar('NEW')} END
+    """)
+    # Troca de responsável: os chamados do cliente passam para o novo responsável, somados
+    # por dia e categoria (um comando por tabela, buscando as linhas pela chave primária)
+    escopo = _escopo_serie('ch')
+    resolvido = f"NULLIF(ch.data_resolucao, '') IS NOT NULL AND {escopo}"
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_serie_responsavel
+        AFTER UPDATE OF classificacao ON clientes
+        WHEN IFNULL(OLD.classificacao, '') != IFNULL(NEW.classificacao, '')
+        BEGIN
+            UPDATE serie_chamados SET abertos = serie_chamados.abertos - g.total
+            FROM (
+                SELECT ch.data_abertura AS dia, ch.categoria_id, COUNT(*) AS total
+                FROM chamados ch WHERE ch.cliente_id = NEW.id AND {escopo}
+                GROUP BY 1, 2
+            ) AS g
+            WHERE serie_chamados.dia = g.dia AND serie_chamados.categoria_id = g.categoria_id
+              AND serie_chamados.responsavel = IFNULL(OLD.classificacao, '');
+            UPDATE serie_chamados SET resolvidos = serie_chamados.resolvidos - g.total
+            FROM (
+                SELECT ch.data_resolucao AS dia, ch.categoria_id, COUNT(*) AS total
+                FROM chamados ch WHERE ch.cliente_id = NEW.id AND {resolvido}
+                GROUP BY 1, 2
+            ) AS g
+            WHERE serie_chamados.dia = g.dia AND serie_chamados.categoria_id = g.categoria_id
+              AND serie_chamados.responsavel = IFNULL(OLD.classificacao, '');
+            DELETE FROM serie_chamados
+            WHERE responsavel = IFNULL(OLD.classificacao, '') AND abertos <= 0 AND resolvidos <= 0
+              AND (dia, categoria_id) IN (
+                  SELECT data_abertura, categoria_id FROM chamados WHERE cliente_id = NEW.id
+                  UNION ALL
+                  SELECT data_resolucao, categoria_id FROM chamados
+                  WHERE cliente_id = NEW.id AND data_resolucao IS NOT NULL
+              );
+            INSERT INTO serie_chamados (dia, categoria_id, responsavel, abertos)
+            SELECT ch.data_abertura, ch.categoria_id, IFNULL(NEW.classificacao, ''), COUNT(*)
+            FROM chamados ch WHERE ch.cliente_id = NEW.id AND {escopo}
+            GROUP BY 1, 2
+            ON CONFLICT (dia, categoria_id, responsavel) DO UPDATE SET abertos = abertos + excluded.abertos;
+            INSERT INTO serie_chamados (dia, categoria_id, responsavel, resolvidos)
+            SELECT ch.data_resolucao, ch.categoria_id, IFNULL(NEW.classificacao, ''), COUNT(*)
+            FROM chamados ch WHERE ch.cliente_id = NEW.id AND {resolvido}
+            GROUP BY 1, 2
+            ON CONFLICT (dia, categoria_id, responsavel) DO UPDATE SET resolvidos = resolvidos + excluded.resolvidos;
+
+            UPDATE serie_resolucao SET total = serie_resolucao.total - g.total
+            FROM (
+                SELECT ch.data_resolucao AS dia, ch.categoria_id, {dias('ch')} AS dias, COUNT(*) AS total
+                FROM chamados ch WHERE ch.cliente_id = NEW.id AND {resolvido}
+                GROUP BY 1, 2, 3
+            ) AS g
+            WHERE serie_resolucao.dia = g.dia AND serie_resolucao.categoria_id = g.categoria_id
+              AND serie_resolucao.responsavel = IFNULL(OLD.classificacao, '') AND serie_resolucao.dias = g.dias;
+            DELETE FROM serie_resolucao
+            WHERE responsavel = IFNULL(OLD.classificacao, '') AND total <= 0
+              AND (dia, categoria_id) IN (
+                  SELECT data_resolucao, categoria_id FROM chamados
+                  WHERE cliente_id = NEW.id AND data_resolucao IS NOT NULL
+              );
+            INSERT INTO serie_resolucao (dia, categoria_id, responsavel, dias, total)
+            SELECT ch.data_resolucao, ch.categoria_id, IFNULL(NEW.classificacao, ''), {dias('ch')}, COUNT(*)
+            FROM chamados ch WHERE ch.cliente_id = NEW.id AND {resolvido}
+            GROUP BY 1, 2, 4
+            ON CONFLICT (dia, categoria_id, responsavel, dias) DO UPDATE SET total = total + excluded.total;
+        END
+    """)
+
+def _popular_series(cursor):
+    """Recalcula as séries diárias a partir de chamados"""
+    cursor.execute("DELETE FROM serie_chamados")
+    cursor.execute("DELETE FROM serie_resolucao")
+    escopo = _escopo_serie('ch')
+    cursor.execute(f"""
+        INSERT INTO serie_chamados (dia, categoria_id, responsavel, abertos, resolvidos)
+        SELECT dia, categoria_id, responsavel, SUM(abertos), SUM(resolvidos)
+        FROM (
+            SELECT ch.data_abertura AS dia, ch.categoria_id, IFNULL(c.classificacao, '') AS responsavel,
+                   1 AS abertos, 0 AS resolvidos
+            FROM chamados ch LEFT JOIN clientes c ON c.id = ch.cliente_id
+            WHERE {escopo}
+            UNION ALL
+            SELECT ch.data_resolucao, ch.categoria_id, IFNULL(c.classificacao, ''), 0, 1
+            FROM chamados ch LEFT JOIN clientes c ON c.id = ch.cliente_id
+            WHERE NULLIF(ch.data_resolucao, '') IS NOT NULL AND {escopo}
+        )
+        GROUP BY 1, 2, 3
+    """)
+    cursor.execute(f"""
+        INSERT INTO serie_resolucao (dia, categoria_id, responsavel, dias, total)
+        SELECT ch.data_resolucao, ch.categoria_id, IFNULL(c.classificacao, ''),
+               MAX(CAST(julianday(ch.data_resolucao) - julianday(ch.data_abertura) AS INTEGER), 0), COUNT(*)
+        FROM chamados ch LEFT JOIN clientes c ON c.id = ch.cliente_id
+        WHERE NULLIF(ch.data_resolucao, '') IS NOT NULL AND {escopo}
+        GROUP BY 1, 2, 3, 4
+    """)
+
+def _renomear_responsavel_series(cursor, mapa):
+    """Passa as linhas das séries de cada responsável antigo para o novo ({antigo: novo}, aplicado de uma vez)"""
+    antigos = list(mapa)
+    caso = "CASE responsavel " + " ".join("WHEN ? THEN ?" for _ in antigos) + " END"
+    params_caso = [valor for par in mapa.items() for valor in par]
+    for tabela, chave, contadores in (('serie_chamados', ['dia', 'categoria_id'], ['abertos', 'resolvidos']),
+                                      ('serie_resolucao', ['dia', 'categoria_id', 'dias'], ['total'])):
+        colunas = chave + ['responsavel'] + contadores
+        cursor.execute(f"""
+            SELECT {', '.join(chave)}, {caso}, {', '.join(f'SUM({c})' for c in contadores)}
+            FROM {tabela} WHERE {_lista_in('responsavel', antigos)}
+            GROUP BY {', '.join(str(i) for i in range(1, len(chave) + 2))}
+        """, params_caso + antigos)
+        linhas = [tuple(row) for row in cursor.fetchall()]
+        cursor.execute(f"DELETE FROM {tabela} WHERE {_lista_in('responsavel', antigos)}", antigos)
+        cursor.executemany(f"""
+            INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})
+            ON CONFLICT ({', '.join(chave)}, responsavel)
+            DO UPDATE SET {', '.join(f'{c} = {c} + excluded.{c}' for c in contadores)}
+        """, linhas)
+
+def _migracao_series(cursor):
+    """Tendências (backlog, aberturas, resoluções e tempo de resolução) a partir de séries diárias"""
+    _criar_series(cursor)
+    _popular_series(cursor)
+
+@com_retry
+def recalcular_resumos():
+    """Reconstrói as tabelas de resumo e as séries diárias (manutenção; os triggers já as mantêm em dia)"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        _popular_resumos(cursor)
+        _popular_series(cursor)
+
+@com_retry
+def recriar_busca_texto():
+    """Reconstrói o índice de busca textual (manutenção; os triggers já o mantêm em dia)"""
+    with get_db() as conn:
+        _popular_busca_texto(conn.cursor())
+
+MIGRACOES = [
+    (1, "Índices compostos e parciais para chamados abertos", _migracao_indices_chamados_abertos),
+    (2, "Chamados abertos com data_resolucao NULL", _migracao_aberto_nulo),
+    (3, "Tabelas de códigos para status e categoria", _migracao_tabelas_de_codigos),
+    (4, "Tabelas de resumo para os KPIs", _migracao_resumos),
+    (5, "Índice do histórico por categoria", _migracao_indice_historico),
+    (6, "Busca textual (FTS5)", _migracao_busca_texto),
+    (7, "Séries diárias para as tendências", _migracao_series),
+]
+
+def aplicar_migracoes(conn):
+    """Aplica, em ordem e cada uma na sua transação, as migrações ainda não aplicadas"""
+    versao = conn.execute("PRAGMA user_version").fetchone()[0]
+    for numero, descricao, migracao in MIGRACOES:
+        if numero <= versao:
+            continue
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN")
+        try:
+            migracao(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {numero}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"✅ Migração {numero} aplicada: {descricao}")
+    return max(versao, MIGRACOES[-1][0]) if MIGRACOES else versao
+
 # ==================== FUNÇÕES DE CLIENTE ====================
 
+@com_retry
 def adicionar_cliente(nome, classificacao='Guilherme'):
     """Adiciona um novo cliente"""
     with get_db() as conn:
@@ -74,6 +1162,7 @@ def adicionar_cliente(nome, classificacao='Guilherme'):
         cursor.execute("INSERT INTO clientes (nome, classificacao) VALUES (?, ?)", (nome.strip().title(), classificacao))
         return cursor.lastrowid
 
+@em_cache
 def listar_clientes():
     """Lista todos os clientes ativos"""
     with get_db() as conn:
@@ -81,6 +1170,58 @@ def listar_clientes():
         cursor.execute("SELECT * FROM clientes WHERE ativo = 1 ORDER BY nome")
         return [dict(row) for row in cursor.fetchall()]
 
+def _padrao_like(texto):
+    """Monta o padrão '%texto%' para LIKE ... ESCAPE '\\' (escapa %, _ e \\ digitados)"""
+    texto = texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{texto}%"
+
+def _filtro_clientes(busca=None):
+    """Condições (WHERE) e parâmetros da listagem de clientes ativos"""
+    condicoes = ["ativo = 1"]
+    params = []
+    if busca:
+        condicoes.append("nome LIKE ? ESCAPE '\\'")
+        params.append(_padrao_like(busca.strip()))
+    return condicoes, params
+
+@em_cache
+def listar_clientes_pagina(apos_nome=None, limite=25, busca=None):
+    """
+    Página de clientes ativos em ordem de nome (paginação por keyset, sem OFFSET).
+    
+    Args:
+        apos_nome: último nome da página anterior (None = primeira página)
+        limite: tamanho da página
+        busca: trecho do nome (case insensitive)
+    
+    Returns:
+        (clientes, ha_mais) - ha_mais indica se existe próxima página
+    """
+    condicoes, params = _filtro_clientes(busca)
+    if apos_nome is not None:
+        condicoes.append("nome > ?")
+        params.append(apos_nome)
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT * FROM clientes
+            WHERE {' AND '.join(condicoes)}
+            ORDER BY nome
+            LIMIT ?
+        """, params + [limite + 1])
+        clientes = [dict(row) for row in cursor.fetchall()]
+        return clientes[:limite], len(clientes) > limite
+
+@em_cache
+def contar_clientes(busca=None):
+    """Conta os clientes ativos (opcionalmente filtrando por trecho do nome)"""
+    condicoes, params = _filtro_clientes(busca)
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM clientes WHERE {' AND '.join(condicoes)}", params)
+        return cursor.fetchone()[0]
+
+@em_cache
 def buscar_cliente_por_nome(nome):
     """Busca cliente por nome (case insensitive)"""
     with get_db() as conn:
@@ -91,6 +1232,139 @@ def buscar_cliente_por_nome(nome):
 
 # ==================== FUNÇÕES DE CHAMADO ====================
 
+# Colunas devolvidas pelas listagens de chamados (nomes de status/categoria via tabelas de códigos)
+_SELECT_CHAMADOS = """
+    SELECT c.id, c.nome as cliente, c.classificacao as classificacao, ch.id as chamado_id, s.nome as status, 
+           cat.nome as categoria, ch.observacao, ch.data_abertura, ch.data_resolucao
+    FROM chamados ch
+    JOIN clientes c ON ch.cliente_id = c.id
+    JOIN status_chamado s ON s.id = ch.status_id
+    JOIN categorias cat ON cat.id = ch.categoria_id
+"""
+
+# Igual a _SELECT_CHAMADOS, incluindo o texto da resolução (histórico)
+_SELECT_RESOLVIDOS = """
+    SELECT c.id, c.nome as cliente, c.classificacao as classificacao, ch.id as chamado_id, s.nome as status, 
+           cat.nome as categoria, ch.observacao, ch.resolucao, ch.data_abertura, ch.data_resolucao
+    FROM chamados ch
+    JOIN clientes c ON ch.cliente_id = c.id
+    JOIN status_chamado s ON s.id = ch.status_id
+    JOIN categorias cat ON cat.id = ch.categoria_id
+"""
+
+# Condições base de cada situação de chamado usada nos filtros (todas excluem Geral e N/A)
+SITUACOES_CHAMADO = {
+    'abertos': ["ch.data_resolucao IS NULL"],
+    'problemas': [
+        "ch.data_resolucao IS NULL",
+        "ch.status_id IN (SELECT id FROM status_chamado WHERE critico = 1)",
+    ],
+    'resolvidos': ["ch.data_resolucao IS NOT NULL"],
+}
+
+def _lista_in(coluna, valores):
+    """'coluna IN (?, ?, ...)' para a lista de valores (lista vazia não casa com nada)"""
+    return f"{coluna} IN ({', '.join('?' * len(valores))})"
+
+def _filtro_chamados(situacao=None, status=None, responsaveis=None, busca=None,
+                     categoria=None, data_inicio=None, data_fim=None, texto=None):
+    """
+    Monta as condições (WHERE) e os parâmetros dos filtros de chamados, sobre os aliases
+    ch (chamados), c (clientes) e s (status_chamado). Filtro None não restringe nada;
+    lista vazia não deixa passar nenhum chamado.
+    
+    Args:
+        situacao: chave de SITUACOES_CHAMADO (None = sem condição base)
+        status: nomes de status aceitos
+        responsaveis: classificações (responsáveis) aceitas
+        busca: trecho do nome do cliente (case insensitive)
+        categoria: nome da categoria
+        data_inicio, data_fim: intervalo inclusivo (date ou 'AAAA-MM-DD') de data_resolucao
+            para resolvidos e de data_abertura para as demais situações
+        texto: busca textual (FTS) em cliente, categoria, observação e resolução
+    """
+    condicoes = []
+    params = []
+    if situacao is not None:
+        condicoes += SITUACOES_CHAMADO[situacao]
+        condicoes += [
+            "ch.categoria_id NOT IN (SELECT id FROM categorias WHERE geral = 1)",
+            "ch.observacao != 'N/A'",
+        ]
+    if status is not None:
+        condicoes.append(f"ch.status_id IN (SELECT id FROM status_chamado WHERE {_lista_in('nome', status)})")
+        params += list(status)
+    if responsaveis is not None:
+        condicoes.append(_lista_in('c.classificacao', responsaveis))
+        params += list(responsaveis)
+    if busca:
+        condicoes.append("c.nome LIKE ? ESCAPE '\\'")
+        params.append(_padrao_like(busca.strip()))
+    if categoria:
+        condicoes.append("ch.categoria_id = (SELECT id FROM categorias WHERE nome = ?)")
+        params.append(categoria)
+    if texto:
+        consulta = _consulta_fts(texto)
+        if consulta is None:
+            condicoes.append("0")  # nenhuma palavra pesquisável: nada casa
+        else:
+            condicoes.append("ch.id IN (SELECT rowid FROM fts_chamados WHERE fts_chamados MATCH ?)")
+            params.append(consulta)
+    coluna_data = "ch.data_resolucao" if situacao == 'resolvidos' else "ch.data_abertura"
+    if data_inicio:
+        condicoes.append(f"{coluna_data} >= ?")
+        params.append(str(data_inicio))
+    if data_fim:
+        condicoes.append(f"{coluna_data} <= ?")
+        params.append(str(data_fim))
+    return condicoes, params
+
+@em_cache
+def filtrar_chamados(situacao='abertos', status=None, responsaveis=None, busca=None,
+                     categoria=None, data_inicio=None, data_fim=None, texto=None):
+    """
+    Lista os chamados de uma situação ('abertos', 'problemas' ou 'resolvidos') com os
+    filtros aplicados no banco (ver _filtro_chamados). Abertos vêm do mais recente para o
+    mais antigo por data_abertura; resolvidos por data_resolucao.
+    """
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(*_consulta_chamados(situacao, status, responsaveis, busca, categoria, data_inicio, data_fim, texto))
+        return [dict(row) for row in cursor.fetchall()]
+
+def _consulta_chamados(situacao='abertos', status=None, responsaveis=None, busca=None,
+                       categoria=None, data_inicio=None, data_fim=None, texto=None):
+    """(sql, params) da listagem de filtrar_chamados (também usada na exportação)"""
+    condicoes, params = _filtro_chamados(situacao, status, responsaveis, busca, categoria, data_inicio, data_fim, texto)
+    if situacao == 'resolvidos':
+        select, ordem = _SELECT_RESOLVIDOS, "ch.data_resolucao DESC, ch.id DESC"
+    else:
+        select, ordem = _SELECT_CHAMADOS, "ch.data_abertura DESC"
+    return select + f"""
+            WHERE {' AND '.join(condicoes) or '1'}
+            ORDER BY {ordem}
+        """, params
+
+@em_cache
+def listar_opcoes_filtro(situacao='abertos'):
+    """Status e responsáveis presentes nos chamados da situação (opções dos filtros da tela)"""
+    condicoes, params = _filtro_chamados(situacao)
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT DISTINCT s.nome as status, c.classificacao as classificacao
+            FROM chamados ch
+            JOIN clientes c ON ch.cliente_id = c.id
+            JOIN status_chamado s ON s.id = ch.status_id
+            WHERE {' AND '.join(condicoes)}
+        """, params)
+        linhas = cursor.fetchall()
+        return {
+            'status': sorted({row['status'] for row in linhas}),
+            'responsaveis': sorted({row['classificacao'] for row in linhas if row['classificacao'] is not None}),
+        }
+
+@com_retry
 def adicionar_chamado(cliente_id, status, categoria, observacao="", data_abertura=None):
     """Adiciona um novo chamado"""
     if data_abertura is None:
@@ -98,115 +1372,300 @@ def adicionar_chamado(cliente_id, status, categoria, observacao="", data_abertur
     
     with get_db() as conn:
         cursor = conn.cursor()
+        status_id = _id_status(cursor, status)
+        categoria_id = _id_categoria(cursor, categoria)
         cursor.execute("""
-            INSERT INTO chamados (cliente_id, status, categoria, observacao, data_abertura)
+            INSERT INTO chamados (cliente_id, status_id, categoria_id, observacao, data_abertura)
             VALUES (?, ?, ?, ?, ?)
-        """, (cliente_id, status, categoria, observacao, data_abertura))
+        """, (cliente_id, status_id, categoria_id, observacao, data_abertura))
         return cursor.lastrowid
 
-def resolver_chamado(chamado_id, data_resolucao=None):
-    """Marca um chamado como resolvido"""
-    if data_resolucao is None:
+@com_retry
+def resolver_chamado(chamado_id, data_resolucao=None, resolucao=None):
+    """Marca um chamado como resolvido (opcionalmente registrando o que foi feito)"""
+    # data vazia não é aceita: chamado aberto é sempre data_resolucao NULL
+    if not data_resolucao:
         data_resolucao = datetime.now().date().isoformat()
     
     with get_db() as conn:
         cursor = conn.cursor()
         # preserva status original antes de marcar como '7. Status Normal'
-        cursor.execute("SELECT status FROM chamados WHERE id = ?", (chamado_id,))
-        row = cursor.fetchone()
-        status_atual = row['status'] if row and 'status' in row.keys() else None
         cursor.execute("""
             UPDATE chamados 
-            SET status_original = COALESCE(status_original, ?),
-                status = '7. Status Normal', 
+            SET status_original_id = COALESCE(status_original_id, status_id),
+                status_id = ?, 
                 data_resolucao = ?,
+                resolucao = COALESCE(?, resolucao),
                 atualizado_em = CURRENT_TIMESTAMP
             WHERE id = ?
-        """, (status_atual, data_resolucao, chamado_id))
+        """, (_id_status(cursor, STATUS_NORMAL), data_resolucao, resolucao, chamado_id))
 
+@com_retry
 def reabrir_chamado(chamado_id, status_original="1. Implantado com problema"):
     """Reabre um chamado resolvido"""
     with get_db() as conn:
         cursor = conn.cursor()
         # Se existe status_original salvo, usa ele; senão usa o argumento
-        cursor.execute("SELECT status_original FROM chamados WHERE id = ?", (chamado_id,))
+        cursor.execute("SELECT status_original_id FROM chamados WHERE id = ?", (chamado_id,))
+        row = cursor.fetchone()
+        target_id = row['status_original_id'] if row and row['status_original_id'] else None
+        if target_id is None and status_original:
+            target_id = _id_status(cursor, status_original)
+        cursor.execute("SELECT normal FROM status_chamado WHERE id = ?", (target_id,))
         row = cursor.fetchone()
-        saved = row['status_original'] if row and 'status_original' in row.keys() else None
-        target_status = saved if saved else status_original
-        if target_status == "7. Status Normal" or not target_status:
-            target_status = "1. Implantado com problema"
+        if row is None or row['normal']:
+            target_id = _id_status(cursor, STATUS_PROBLEMA)
         cursor.execute("""
             UPDATE chamados 
-            SET status = ?, 
+            SET status_id = ?, 
                 data_resolucao = NULL,
-                status_original = NULL,
+                status_original_id = NULL,
                 atualizado_em = CURRENT_TIMESTAMP
             WHERE id = ?
-        """, (target_status, chamado_id))
+        """, (target_id, chamado_id))
 
+@em_cache
 def listar_chamados_abertos():
     """Lista todos os chamados não resolvidos (todos os status, exclui Geral e N/A)"""
     with get_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT c.id, c.nome as cliente, c.classificacao as classificacao, ch.id as chamado_id, ch.status, 
-                   ch.categoria, ch.observacao, ch.data_abertura, ch.data_resolucao
-            FROM chamados ch
-            JOIN clientes c ON ch.cliente_id = c.id
-            WHERE (ch.data_resolucao IS NULL OR ch.data_resolucao = '')
-                AND ch.categoria != 'Geral'
+        cursor.execute(_SELECT_CHAMADOS + """
+            WHERE ch.data_resolucao IS NULL
+                AND ch.categoria_id NOT IN (SELECT id FROM categorias WHERE geral = 1)
                 AND ch.observacao != 'N/A'
             ORDER BY ch.data_abertura DESC
         """)
         return [dict(row) for row in cursor.fetchall()]
 
+@em_cache
 def listar_chamados_abertos_completos():
     """Lista todos os chamados não resolvidos (retorna também chamados 'Geral' e N/A)."""
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT c.id, c.nome as cliente, c.classificacao as classificacao, ch.id as id, ch.status, 
-                   ch.categoria, ch.observacao, ch.data_abertura, ch.data_resolucao
+            SELECT c.id, c.nome as cliente, c.classificacao as classificacao, ch.id as id, s.nome as status, 
+                   cat.nome as categoria, ch.observacao, ch.data_abertura, ch.data_resolucao
             FROM chamados ch
             JOIN clientes c ON ch.cliente_id = c.id
-            WHERE ch.data_resolucao IS NULL OR ch.data_resolucao = ''
+            JOIN status_chamado s ON s.id = ch.status_id
+            JOIN categorias cat ON cat.id = ch.categoria_id
+            WHERE ch.data_resolucao IS NULL
             ORDER BY ch.data_abertura DESC
         """)
         return [dict(row) for row in cursor.fetchall()]
 
+@em_cache
 def listar_chamados_problemas():
     """Lista apenas chamados com problemas (status 1 e 2, exclui Geral e N/A)"""
     with get_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT c.id, c.nome as cliente, c.classificacao as classificacao, ch.id as chamado_id, ch.status, 
-                   ch.categoria, ch.observacao, ch.data_abertura, ch.data_resolucao
-            FROM chamados ch
-            JOIN clientes c ON ch.cliente_id = c.id
-            WHERE (ch.data_resolucao IS NULL OR ch.data_resolucao = '')
-            AND ch.status IN ('1. Implantado com problema', '2. Implantado refazendo')
-            AND ch.categoria != 'Geral'
+        cursor.execute(_SELECT_CHAMADOS + """
+            WHERE ch.data_resolucao IS NULL
+            AND ch.status_id IN (SELECT id FROM status_chamado WHERE critico = 1)
+            AND ch.categoria_id NOT IN (SELECT id FROM categorias WHERE geral = 1)
             AND ch.observacao != 'N/A'
             ORDER BY ch.data_abertura DESC
         """)
         return [dict(row) for row in cursor.fetchall()]
 
+@em_cache
 def listar_chamados_resolvidos():
     """Lista todos os chamados resolvidos (exclui Geral e N/A)"""
     with get_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT c.id, c.nome as cliente, c.classificacao as classificacao, ch.id as chamado_id, ch.status, 
-                   ch.categoria, ch.observacao, ch.resolucao, ch.data_abertura, ch.data_resolucao
-            FROM chamados ch
-            JOIN clientes c ON ch.cliente_id = c.id
+        cursor.execute(_SELECT_RESOLVIDOS + """
             WHERE ch.data_resolucao IS NOT NULL
-                AND ch.categoria != 'Geral'
+                AND ch.categoria_id NOT IN (SELECT id FROM categorias WHERE geral = 1)
                 AND ch.observacao != 'N/A'
             ORDER BY ch.data_resolucao DESC
         """)
         return [dict(row) for row in cursor.fetchall()]
 
+@em_cache
+def listar_chamados_resolvidos_pagina(apos=None, limite=25, busca=None, data_inicio=None, data_fim=None,
+                                      categoria=None, status=None, responsaveis=None, texto=None):
+    """
+    Página do histórico de chamados resolvidos, do mais recente para o mais antigo.
+    Paginação por keyset em (data_resolucao, chamado_id): o custo depende do tamanho
+    da página, não do tamanho do histórico.
+    
+    Args:
+        apos: (data_resolucao, chamado_id) do último chamado da página anterior (None = primeira página)
+        limite: tamanho da página
+        demais: filtros de _filtro_chamados (data_inicio/data_fim sobre data_resolucao)
+    
+    Returns:
+        (chamados, ha_mais) - ha_mais indica se existe próxima página
+    """
+    condicoes, params = _filtro_chamados('resolvidos', status, responsaveis, busca, categoria, data_inicio, data_fim, texto)
+    if apos is not None:
+        condicoes.append("(ch.data_resolucao, ch.id) < (?, ?)")
+        params.extend(apos)
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(_SELECT_RESOLVIDOS + f"""
+            WHERE {' AND '.join(condicoes)}
+            ORDER BY ch.data_resolucao DESC, ch.id DESC
+            LIMIT ?
+        """, params + [limite + 1])
+        chamados = [dict(row) for row in cursor.fetchall()]
+        return chamados[:limite], len(chamados) > limite
+
+@em_cache
+def listar_categorias():
+    """Lista os nomes das categorias de integração (sem a Geral)"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT nome FROM categorias WHERE geral = 0 ORDER BY id")
+        return [row['nome'] for row in cursor.fetchall()]
+
+@em_cache
+def listar_responsaveis():
+    """Lista as classificações (responsáveis) em uso nos clientes"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT classificacao FROM clientes WHERE classificacao IS NOT NULL ORDER BY 1")
+        return [row['classificacao'] for row in cursor.fetchall()]
+
+@em_cache
+def listar_totais_por_cliente():
+    """Totaliza chamados críticos (status 1 e 2) abertos e resolvidos por cliente (via resumo_clientes)"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            WITH criticos AS (SELECT id FROM status_chamado WHERE critico = 1)
+            SELECT c.nome as cliente,
+                   COALESCE(SUM(CASE 
+                           WHEN r.status_id IN criticos THEN r.total - r.resolvidos 
+                           ELSE 0 END
+                   ), 0) as abertos,
+                   COALESCE(SUM(CASE 
+                           WHEN COALESCE(NULLIF(r.status_original_id, 0), r.status_id) IN criticos THEN r.resolvidos 
+                           ELSE 0 END
+                   ), 0) as resolvidos
+            FROM resumo_clientes r
+            JOIN clientes c ON r.cliente_id = c.id
+            WHERE r.status_id IN criticos OR COALESCE(NULLIF(r.status_original_id, 0), r.status_id) IN criticos
+            GROUP BY c.nome
+            HAVING abertos > 0 OR resolvidos > 0
+            ORDER BY c.nome
+        """)
+        return [dict(row) for row in cursor.fetchall()]
+
+@em_cache
+def obter_checklist_por_cliente(cliente_id=None):
+    """
+    Retorna {cliente_id: {'status', 'status_source', 'categorias'}} com os chamados abertos de cada cliente.
+    Com cliente_id, consulta apenas aquele cliente.
+    """
+    filtro_cliente = "AND ch.cliente_id = ?" if cliente_id is not None else ""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT ch.cliente_id, s.nome as status, s.checklist, cat.nome as categoria, cat.geral, ch.id as chamado_id
+            FROM chamados ch
+            JOIN status_chamado s ON s.id = ch.status_id
+            JOIN categorias cat ON cat.id = ch.categoria_id
+            WHERE ch.data_resolucao IS NULL {filtro_cliente}
+        """, () if cliente_id is None else (cliente_id,))
+        chamados_por_cliente = {}
+        for row in cursor.fetchall():
+            cid = row['cliente_id']
+            if cid not in chamados_por_cliente:
+                chamados_por_cliente[cid] = {'status': None, 'categorias': {}, 'status_source': None}
+            # Se for chamado 'Geral', sempre define o status geral do cliente (autoridade)
+            if row['geral']:
+                chamados_por_cliente[cid]['status'] = row['status']
+                chamados_por_cliente[cid]['status_source'] = 'Geral'
+            else:
+                # Define status de categoria apenas se ainda não houver um status geral definido
+                if chamados_por_cliente[cid]['status'] is None and row['checklist']:
+                    chamados_por_cliente[cid]['status'] = row['status']
+            # Guarda categoria e seu chamado_id
+            chamados_por_cliente[cid]['categorias'][row['categoria']] = {
+                'status': row['status'],
+                'chamado_id': row['chamado_id']
+            }
+        return chamados_por_cliente
+
+# Colunas da matriz de checklist e o padrão (LIKE) da categoria correspondente; a primeira que casar vence
+COLUNAS_CHECKLIST = [
+    ('batida', '%batida%'),
+    ('escala', '%escala%'),
+    ('feriados', '%feriado%'),
+    ('funcionarios', '%funcion_rio%'),
+    ('pdv', '%pdv%'),
+    ('venda', '%venda%'),
+    ('sso', '%sso%'),
+]
+
+@em_cache
+def obter_matriz_checklist(status=None, responsaveis=None, busca=None):
+    """
+    Matriz do checklist de integração: uma linha por cliente com o status geral e o estado
+    de cada coluna de COLUNAS_CHECKLIST ('ok', 'problema', 'construcao' ou 'na').
+    
+    Calculada num único pivot (GROUP BY) sobre os chamados abertos. Só entram clientes com
+    algum chamado de checklist (sem integração, parcial ou em construção) fora de Geral e N/A.
+    O status geral é o do chamado 'Geral', se houver; senão o do chamado aberto mais recente.
+    Os filtros seguem _filtro_chamados; status filtra pelo status geral do cliente.
+    """
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(*_consulta_matriz_checklist(status, responsaveis, busca))
+        return [dict(row) for row in cursor.fetchall()]
+
+def _consulta_matriz_checklist(status=None, responsaveis=None, busca=None):
+    """(sql, params) da matriz de obter_matriz_checklist (também usada na exportação)"""
+    filtro_clientes, params_clientes = _filtro_chamados(responsaveis=responsaveis, busca=busca)
+    status_geral = "MAX(CASE WHEN o.prioridade_status = 1 THEN o.status END)"
+    filtro_status, params_status = "", []
+    if status is not None:
+        filtro_status = "AND " + _lista_in(status_geral, status)
+        params_status = list(status)
+    coluna = "CASE " + " ".join(
+        f"WHEN cat.nome LIKE ? THEN '{nome}'" for nome, _ in COLUNAS_CHECKLIST
+    ) + " END"
+    # Prioridade dentro da célula: N/A > em construção > problema (sem chamado = ok)
+    pivot = ",\n".join(
+        f"""CASE MAX(CASE WHEN coluna = '{nome}' THEN estado END)
+                       WHEN 3 THEN 'na' WHEN 2 THEN 'construcao' WHEN 1 THEN 'problema' ELSE 'ok' END as {nome}"""
+        for nome, _ in COLUNAS_CHECKLIST
+    )
+    return f"""
+        WITH abertos AS (
+            SELECT ch.cliente_id, s.nome as status, cat.geral,
+                   {coluna} as coluna,
+                   CASE 
+                       WHEN TRIM(ch.observacao) = 'N/A' THEN 3
+                       WHEN s.construcao = 1 OR s.nome LIKE '6%' THEN 2
+                       ELSE 1 END as estado,
+                   cat.geral = 0 AND ch.observacao != 'N/A' AND s.checklist = 1 as elegivel,
+                   ROW_NUMBER() OVER (ORDER BY ch.data_abertura DESC, ch.id DESC) as pos
+            FROM chamados ch
+            JOIN status_chamado s ON s.id = ch.status_id
+            JOIN categorias cat ON cat.id = ch.categoria_id
+            WHERE ch.data_resolucao IS NULL
+        ),
+        ordenados AS (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY cliente_id
+                ORDER BY geral DESC, CASE WHEN geral = 1 THEN -pos ELSE pos END
+            ) as prioridade_status
+            FROM abertos
+        )
+        SELECT c.id as cliente_id, c.nome as cliente, c.classificacao as classificacao,
+               {status_geral} as status,
+               {pivot}
+        FROM ordenados o
+        JOIN clientes c ON c.id = o.cliente_id
+        WHERE {' AND '.join(filtro_clientes) or '1'}
+        GROUP BY o.cliente_id
+        HAVING MAX(o.elegivel) = 1 {filtro_status}
+        ORDER BY MIN(o.pos)
+    """, [padrao for _, padrao in COLUNAS_CHECKLIST] + params_clientes + params_status
+
+@com_retry
 def atualizar_classificacao(cliente_id, classificacao):
     """Atualiza a classificacao de um cliente"""
     with get_db() as conn:
@@ -214,72 +1673,62 @@ def atualizar_classificacao(cliente_id, classificacao):
         cursor.execute("UPDATE clientes SET classificacao = ?, atualizado_em = CURRENT_TIMESTAMP WHERE id = ?", (classificacao, cliente_id))
         return cursor.rowcount > 0
 
+@em_cache
 def obter_estatisticas():
-    """Retorna estatísticas gerais do sistema"""
+    """Retorna estatísticas gerais do sistema (lidas das tabelas de resumo)"""
     with get_db() as conn:
         cursor = conn.cursor()
-        status_criticos = ["1. Implantado com problema", "2. Implantado refazendo"]
-        
-        # Total de clientes
-        cursor.execute("SELECT COUNT(*) as total FROM clientes WHERE ativo = 1")
-        total_clientes = cursor.fetchone()['total']
         
-        # Chamados abertos (exclui categoria Geral e N/A)
+        # Total de clientes e clientes sem integração (status de checklist: sem integração, parcial ou em construção)
         cursor.execute("""
-            SELECT COUNT(*) as total FROM chamados 
-            WHERE status != '7. Status Normal'
-                AND status NOT IN ('3. Novo cliente sem integração', '5. Implantado sem integração', '6. Integração Parcial', '8. Integração em construção')
-                AND categoria != 'Geral'
-                AND observacao != 'N/A'
+            SELECT (SELECT COUNT(*) FROM clientes WHERE ativo = 1) as total_clientes,
+                   COUNT(DISTINCT cliente_id) as sem_integracao
+            FROM resumo_clientes
+            WHERE status_id IN (SELECT id FROM status_chamado WHERE checklist = 1)
         """)
-        chamados_abertos = cursor.fetchone()['total']
-        
-        # Chamados resolvidos (exclui categoria Geral e N/A)
-        cursor.execute("SELECT COUNT(*) as total FROM chamados WHERE data_resolucao IS NOT NULL AND categoria != 'Geral' AND observacao != 'N/A'")
-        chamados_resolvidos = cursor.fetchone()['total']
+        row = cursor.fetchone()
+        total_clientes = row['total_clientes']
+        sem_integracao = row['sem_integracao']
         
-        # Clientes sem integração (inclui status que contenham 'sem integração', 'parcial' ou 'Em construção')
-        cursor.execute("""
-            SELECT COUNT(DISTINCT cliente_id) as total 
-            FROM chamados 
-            WHERE status LIKE '%sem integração%'
-               OR status LIKE '%parcial%'
-               OR status LIKE '%constru%'
-               OR status = '8. Integração em construção'
-        """)
-        sem_integracao = cursor.fetchone()['total']
+        # Tabelas de códigos (poucas linhas) para traduzir os IDs do resumo
+        cursor.execute("SELECT * FROM status_chamado")
+        status_por_id = {row['id']: dict(row) for row in cursor.fetchall()}
+        cursor.execute("SELECT id, nome FROM categorias")
+        categoria_por_id = {row['id']: row['nome'] for row in cursor.fetchall()}
         
-        # Distribuição por status (exclui categoria Geral e N/A)
+        # Resumo por status/categoria/status_original (exclui Geral e N/A), mantido pelos triggers
         cursor.execute("""
-            SELECT status, COUNT(*) as total 
-            FROM chamados 
-            WHERE status != '7. Status Normal'
-                AND categoria != 'Geral'
-                AND observacao != 'N/A'
-            GROUP BY status
+            SELECT status_id, categoria_id, status_original_id, total, resolvidos
+            FROM resumo_chamados
+            WHERE categoria_id NOT IN (SELECT id FROM categorias WHERE geral = 1)
+                AND obs_valida = 1
         """)
-        por_status = {row['status']: row['total'] for row in cursor.fetchall()}
-        
-        # Distribuição por categoria (exclui Geral e N/A)
-        cursor.execute("""
-              SELECT categoria, 
-                    SUM(CASE 
-                          WHEN status IN (?, ?) 
-                              AND (data_resolucao IS NULL OR data_resolucao = '')
-                              AND observacao != 'N/A' THEN 1 
-                          ELSE 0 END) as abertos,
-                    SUM(CASE 
-                          WHEN data_resolucao IS NOT NULL 
-                              AND COALESCE(status_original, status) IN (?, ?)
-                              AND observacao != 'N/A' THEN 1 
-                          ELSE 0 END) as resolvidos
-              FROM chamados
-              WHERE (status IN (?, ?) OR COALESCE(status_original, status) IN (?, ?))
-                AND categoria != 'Geral'
-                AND observacao != 'N/A'
-              GROUP BY categoria
-           """, status_criticos * 4)
-        por_categoria = [dict(row) for row in cursor.fetchall()]
+        chamados_abertos = 0
+        chamados_resolvidos = 0
+        por_status = {}
+        categorias = {}
+        for row in cursor.fetchall():
+            status = status_por_id[row['status_id']]
+            status_efetivo = status_por_id[row['status_original_id'] or row['status_id']]
+            resolvidos = row['resolvidos']
+            abertos = row['total'] - resolvidos
+            
+            chamados_resolvidos += resolvidos
+            if not status['normal']:
+                por_status[status['nome']] = por_status.get(status['nome'], 0) + row['total']
+                if not status['checklist']:
+                    chamados_abertos += row['total']
+            
+            # Distribuição por categoria considera só os status críticos (1 e 2)
+            if status['critico'] or status_efetivo['critico']:
+                nome_categoria = categoria_por_id[row['categoria_id']]
+                cat = categorias.setdefault(nome_categoria, {'categoria': nome_categoria, 'abertos': 0, 'resolvidos': 0})
+                if status['critico']:
+                    cat['abertos'] += abertos
+                if status_efetivo['critico']:
+                    cat['resolvidos'] += resolvidos
+        por_status = {nome: por_status[nome] for nome in sorted(por_status)}
+        por_categoria = [categorias[c] for c in sorted(categorias)]
         
         return {
             'total_clientes': total_clientes,
@@ -290,8 +1739,284 @@ def obter_estatisticas():
             'por_categoria': por_categoria
         }
 
+# Chave do período de cada dia das séries (semana começa na segunda)
+AGRUPAMENTOS_SERIE = {
+    'dia': "dia",
+    'semana': "date(dia, 'weekday 0', '-6 days')",
+    'mes': "date(dia, 'start of month')",
+}
+
+@em_cache
+def obter_serie_chamados(data_inicio=None, data_fim=None, categoria=None, responsaveis=None, agrupamento='dia'):
+    """
+    Tendência dos chamados de problema por período, lida só das séries diárias.
+
+    Args:
+        data_inicio, data_fim: intervalo inclusivo (date ou 'AAAA-MM-DD'); o backlog
+            considera todo o histórico anterior ao início
+        categoria: nome da categoria (None = todas)
+        responsaveis: classificações aceitas (None = todas; '' = sem responsável)
+        agrupamento: 'dia', 'semana' ou 'mes' (o período é identificado pelo primeiro dia)
+
+    Returns:
+        [{'periodo', 'abertos', 'resolvidos', 'backlog' (abertos no fim do período),
+          'mediana_dias' (tempo de resolução dos resolvidos no período, None se nenhum)}]
+        só com os períodos que tiveram movimento
+    """
+    chave = AGRUPAMENTOS_SERIE[agrupamento]
+    condicoes, params = [], []
+    if categoria:
+        condicoes.append("categoria_id = (SELECT id FROM categorias WHERE nome = ?)")
+        params.append(categoria)
+    if responsaveis is not None:
+        condicoes.append(_lista_in('responsavel', responsaveis))
+        params += list(responsaveis)
+    if data_fim:
+        condicoes.append("dia <= ?")
+        params.append(str(data_fim))
+    onde = ' AND '.join(condicoes) or '1'
+    # Dias antes do início entram num período '' que só conta para o backlog
+    periodo = f"CASE WHEN dia < ? THEN '' ELSE {chave} END" if data_inicio else chave
+    params_periodo = [str(data_inicio)] if data_inicio else []
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            WITH por_periodo AS (
+                SELECT {periodo} AS periodo, SUM(abertos) AS abertos, SUM(resolvidos) AS resolvidos
+                FROM serie_chamados WHERE {onde} GROUP BY 1
+            )
+            SELECT periodo, abertos, resolvidos,
+                   SUM(abertos - resolvidos) OVER (ORDER BY periodo) AS backlog
+            FROM por_periodo
+        """, params_periodo + params)
+        linhas = [dict(row) for row in cursor.fetchall() if row['periodo'] != '']
+
+        # Mediana pelo histograma de dias de cada período: menor N com metade dos resolvidos até N dias
+        cursor.execute(f"""
+            SELECT {chave} AS periodo, dias, SUM(total) AS total
+            FROM serie_resolucao WHERE {onde} AND dia >= ?
+            GROUP BY 1, 2 ORDER BY 1, 2
+        """, params + [str(data_inicio or '')])
+        histograma = cursor.fetchall()
+        resolvidos = {linha['periodo']: linha['resolvidos'] for linha in linhas}
+        medianas, acumulado = {}, {}
+        for row in histograma:
+            periodo_row = row['periodo']
+            if periodo_row in medianas or periodo_row not in resolvidos:
+                continue
+            acumulado[periodo_row] = acumulado.get(periodo_row, 0) + row['total']
+            if acumulado[periodo_row] * 2 >= resolvidos[periodo_row]:
+                medianas[periodo_row] = row['dias']
+        for linha in linhas:
+            linha['mediana_dias'] = medianas.get(linha['periodo'])
+        return linhas
+
+def renomear_status(nome_atual, nome_novo):
+    """Renomeia um status (altera uma única linha; se o novo nome já existe, os chamados são unificados)"""
+    return renomear_em_lote({'status': {nome_atual: nome_novo}})['itens'][0]['acao'] != 'ausente'
+
+def renomear_categoria(nome_atual, nome_novo):
+    """Renomeia uma categoria (altera uma única linha; se o novo nome já existe, os chamados são unificados)"""
+    return renomear_em_lote({'categoria': {nome_atual: nome_novo}})['itens'][0]['acao'] != 'ausente'
+
+# Tipos aceitos por renomear_em_lote: tabela de códigos e colunas de chamados que apontam para ela
+_TABELAS_RENOMEACAO = {
+    'status': ('status_chamado', ['status_id', 'status_original_id']),
+    'categoria': ('categorias', ['categoria_id']),
+}
+TIPOS_RENOMEACAO = [*_TABELAS_RENOMEACAO, 'classificacao']
+
+def _planejar_renomeacao(cursor, tabela, mapa):
+    """
+    Resolve o mapa {antigo: novo} de uma tabela de códigos, aplicado de uma vez (troca A↔B
+    e cadeias A→B→C funcionam): novo nome livre renomeia a linha; nome já usado por uma linha
+    que fica unifica os chamados nela. Retorna (itens, renomear {id: nome}, unificar {id: id destino}).
+    """
+    cursor.execute(f"SELECT id, nome FROM {tabela}")
+    ids = {row['nome']: row['id'] for row in cursor.fetchall()}
+    ocupados = {nome: id_ for nome, id_ in ids.items() if mapa.get(nome, nome) == nome}
+    itens, renomear, unificar = [], {}, {}
+    for antigo, novo in mapa.items():
+        if antigo not in ids:
+            acao = 'ausente'
+        elif antigo == novo:
+            acao = 'igual'
+        elif novo in ocupados:
+            acao = 'unificar'
+            unificar[ids[antigo]] = ocupados[novo]
+        else:
+            acao = 'renomear'
+            renomear[ids[antigo]] = novo
+            ocupados[novo] = ids[antigo]
+        itens.append({'antigo': antigo, 'novo': novo, 'acao': acao, 'id': ids.get(antigo)})
+    return itens, renomear, unificar
+
+def _atualizar_em_blocos(cursor, tabela, coluna, de_para, tamanho_lote, etapa, ao_progresso):
+    """UPDATE tabela SET coluna = CASE ... em faixas de id de tamanho_lote; retorna as linhas alteradas"""
+    antigos = list(de_para)
+    caso = "CASE " + coluna + " " + " ".join("WHEN ? THEN ?" for _ in antigos) + " END"
+    params_caso = [valor for par in de_para.items() for valor in par]
+    cursor.execute(f"SELECT IFNULL(MAX(id), 0) FROM {tabela}")
+    maximo = cursor.fetchone()[0]
+    alteradas = 0
+    for inicio in range(0, maximo, tamanho_lote):
+        cursor.execute(f"""
+            UPDATE {tabela} SET {coluna} = {caso}
+            WHERE {_lista_in(coluna, antigos)} AND id > ? AND id <= ?
+        """, params_caso + antigos + [inicio, inicio + tamanho_lote])
+        alteradas += cursor.rowcount
+        if ao_progresso:
+            ao_progresso(etapa, min(inicio + tamanho_lote, maximo), maximo)
+    return alteradas
+
+@com_retry
+def renomear_em_lote(renomeacoes, simular=False, tamanho_lote=100_000, ao_progresso=None):
+    """
+    Aplica várias renomeações de status, categoria e classificação (responsável) numa única transação.
+    
+    Status e categorias são tabelas de códigos: renomear altera só a linha do código (status_id
+    e status_original_id continuam apontando para ela). Quando o nome novo já existe, os chamados
+    são unificados com UPDATE ... SET coluna = CASE ... END, em faixas de id de tamanho_lote,
+    e o código antigo é apagado. A classificação é texto em clientes e é atualizada do mesmo jeito.
+    
+    Args:
+        renomeacoes: {'status': {antigo: novo}, 'categoria': {...}, 'classificacao': {...}}
+        simular: só conta o que seria alterado (contagens das tabelas de resumo, sem varrer chamados)
+        tamanho_lote: linhas (faixa de id) por UPDATE
+        ao_progresso: função(etapa, feitos, total) chamada após cada bloco
+    
+    Returns:
+        dict com itens (tipo, antigo, novo, acao e contagens de linhas afetadas),
+        linhas_alteradas e segundos
+    """
+    desconhecidos = set(renomeacoes) - set(TIPOS_RENOMEACAO)
+    if desconhecidos:
+        raise ValueError(f"Tipo de renomeação desconhecido: {', '.join(sorted(desconhecidos))}")
+    inicio = time.perf_counter()
+    itens = []
+    linhas_alteradas = 0
+    with get_db() as conn:
+        cursor = conn.cursor()
+        for tipo, (tabela, colunas) in _TABELAS_RENOMEACAO.items():
+            mapa = renomeacoes.get(tipo) or {}
+            if not mapa:
+                continue
+            itens_tipo, renomear, unificar = _planejar_renomeacao(cursor, tabela, mapa)
+            # Contagens pelo resumo (uma linha por combinação de códigos, não por chamado)
+            for coluna in colunas:
+                cursor.execute(f"SELECT {coluna} as id, SUM(total) as total FROM resumo_chamados GROUP BY {coluna}")
+                contagem = {row['id']: row['total'] for row in cursor.fetchall()}
+                for item in itens_tipo:
+                    item[coluna] = contagem.get(item['id'], 0)
+            itens += [{'tipo': tipo, **{chave: valor for chave, valor in item.items() if chave != 'id'}} for item in itens_tipo]
+            if simular:
+                continue
+            
+            if unificar:
+                for coluna in colunas:
+                    linhas_alteradas += _atualizar_em_blocos(
+                        cursor, 'chamados', coluna, unificar, tamanho_lote, f"{tipo}: {coluna}", ao_progresso
+                    )
+                cursor.execute(f"DELETE FROM {tabela} WHERE {_lista_in('id', list(unificar))}", list(unificar))
+            if renomear:
+                # Em trocas/cadeias o nome novo ainda está em outra linha renomeada: todas passam
+                # antes por um nome provisório, para não violar o UNIQUE no meio do UPDATE
+                cursor.execute(f"SELECT nome FROM {tabela}")
+                nomes_atuais = {row['nome'] for row in cursor.fetchall()}
+                if any(novo in nomes_atuais for novo in renomear.values()):
+                    cursor.execute(f"""
+                        UPDATE {tabela} SET nome = '#renomeando#' || id WHERE {_lista_in('id', list(renomear))}
+                    """, list(renomear))
+                cursor.execute(f"""
+                    UPDATE {tabela} SET nome = CASE id {' '.join('WHEN ? THEN ?' for _ in renomear)} END
+                    WHERE {_lista_in('id', list(renomear))}
+                """, [valor for par in renomear.items() for valor in par] + list(renomear))
+        
+        classificacoes = renomeacoes.get('classificacao') or {}
+        if classificacoes:
+            cursor.execute(f"""
+                SELECT classificacao, COUNT(*) as total FROM clientes
+                WHERE {_lista_in('classificacao', list(classificacoes))}
+                GROUP BY classificacao
+            """, list(classificacoes))
+            contagem = {row['classificacao']: row['total'] for row in cursor.fetchall()}
+            for antigo, novo in classificacoes.items():
+                acao = 'igual' if antigo == novo else 'renomear' if contagem.get(antigo) else 'ausente'
+                itens.append({'tipo': 'classificacao', 'antigo': antigo, 'novo': novo, 'acao': acao,
+                              'clientes': contagem.get(antigo, 0)})
+            mapa = {antigo: novo for antigo, novo in classificacoes.items() if antigo != novo and contagem.get(antigo)}
+            if mapa and not simular:
+                # O trigger das séries moveria cliente a cliente; aqui as séries são renomeadas
+                # de uma vez (mesma transação: um erro desfaz tudo, inclusive o DROP)
+                if not conn.in_transaction:
+                    cursor.execute("BEGIN")  # o sqlite3 não abre transação sozinho antes de DDL
+                cursor.execute("DROP TRIGGER IF EXISTS trg_serie_responsavel")
+                linhas_alteradas += _atualizar_em_blocos(
+                    cursor, 'clientes', 'classificacao', mapa, tamanho_lote, 'classificacao', ao_progresso
+                )
+                _renomear_responsavel_series(cursor, mapa)
+                _criar_series(cursor)
+    return {'itens': itens, 'linhas_alteradas': linhas_alteradas, 'segundos': time.perf_counter() - inicio}
+
+# ==================== BUSCA TEXTUAL ====================
+
+def _consulta_fts(texto):
+    """
+    Converte o texto digitado numa consulta FTS5: cada palavra vira um prefixo ("palavra"*)
+    e todas precisam casar. Retorna None se não houver palavra pesquisável.
+    """
+    termos = re.findall(r'\w+', texto or '')
+    if not termos:
+        return None
+    return ' '.join(f'"{termo}"*' for termo in termos)
+
+@em_cache
+def buscar_chamados(texto, limite=50):
+    """
+    Busca chamados (abertos e resolvidos) por cliente, categoria, observação e resolução.
+    Ignora acentos e maiúsculas, casa prefixos ("funcionario" acha "Funcionários") e
+    ordena por relevância (bm25). Cada chamado traz também o campo 'relevancia'
+    (menor = mais relevante).
+    """
+    consulta = _consulta_fts(texto)
+    if consulta is None:
+        return []
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            WITH encontrados AS (
+                SELECT rowid, rank FROM fts_chamados
+                WHERE fts_chamados MATCH ?
+                ORDER BY rank
+                LIMIT ?
+            )
+            {_SELECT_RESOLVIDOS.replace('ch.data_resolucao', 'ch.data_resolucao, e.rank as relevancia', 1)}
+            JOIN encontrados e ON e.rowid = ch.id
+            ORDER BY e.rank
+        """, (consulta, limite))
+        return [dict(row) for row in cursor.fetchall()]
+
+@em_cache
+def buscar_clientes(texto, limite=20):
+    """Busca clientes ativos pelo nome, ignorando acentos e casando prefixos, por relevância"""
+    consulta = _consulta_fts(texto)
+    if consulta is None:
+        return []
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT c.*
+            FROM fts_clientes f
+            JOIN clientes c ON c.id = f.rowid
+            WHERE fts_clientes MATCH ? AND c.ativo = 1
+            ORDER BY f.rank
+            LIMIT ?
+        """, (consulta, limite))
+        return [dict(row) for row in cursor.fetchall()]
+
 # ==================== FUNÇÕES DE GERENCIAMENTO DE CHECKLIST ==
 
+@com_retry
 def excluir_chamado(chamado_id):
     """Exclui um chamado do sistema"""
     with get_db() as conn:
@@ -299,6 +2024,7 @@ def excluir_chamado(chamado_id):
         cursor.execute("DELETE FROM chamados WHERE id = ?", (chamado_id,))
         return cursor.rowcount > 0
 
+@com_retry
 def excluir_cliente(cliente_id):
     """Exclui um cliente e todos os seus dados relacionados"""
     with get_db() as conn:
@@ -312,79 +2038,155 @@ def excluir_cliente(cliente_id):
 def atualizar_cliente_checklist(cliente_id, status_geral, categorias):
     """
     Atualiza o checklist de um cliente de forma completa.
-    Remove chamados antigos e cria novos baseado no status selecionado.
+    Só grava o que mudou em relação aos chamados abertos (ver atualizar_checklists).
     
     Args:
         cliente_id: ID do cliente
-        status_geral: Status geral (3, 4 ou 6)
+        status_geral: Status geral (3, 5, 6 ou 8)
         categorias: Dict com {categoria: estado} onde estado é "✓ OK", "✗ Problema", "🛠️ Em Construção" ou "N/A"
     """
+    return atualizar_checklists({cliente_id: (status_geral, categorias)})
+
+# Estados de uma categoria no checklist (opções da tela) e status gerais possíveis
+ESTADO_OK = "✓ OK"
+ESTADO_PROBLEMA = "✗ Problema"
+ESTADO_CONSTRUCAO = "🛠️ Em Construção"
+ESTADO_NA = "N/A"
+ESTADOS_CHECKLIST = [ESTADO_OK, ESTADO_PROBLEMA, ESTADO_CONSTRUCAO, ESTADO_NA]
+STATUS_CHECKLIST = [nome for nome, _critico, checklist, _construcao, _normal in STATUS_PADRAO if checklist]
+STATUS_CHECKLIST_PADRAO = STATUS_CHECKLIST[0]
+OBSERVACAO_GERAL = "Status geral do cliente"
+
+@em_cache
+def obter_estados_checklist(cliente_ids):
+    """
+    Estado atual do checklist de cada cliente, no formato aceito por atualizar_checklists:
+    {cliente_id: (status_geral, {categoria: estado})} com estado em ESTADOS_CHECKLIST.
+    Clientes sem chamados de checklist vêm com STATUS_CHECKLIST_PADRAO e tudo OK.
+    """
+    estados = {
+        cliente_id: (None, {categoria: ESTADO_OK for categoria in listar_categorias()})
+        for cliente_id in cliente_ids
+    }
+    with get_db() as conn:
+        cursor = conn.cursor()
+        ids = list(estados)
+        for i in range(0, len(ids), 500):
+            bloco = ids[i:i + 500]
+            cursor.execute(f"""
+                SELECT ch.cliente_id, s.nome as status, s.construcao, cat.nome as categoria, cat.geral, ch.observacao
+                FROM chamados ch
+                JOIN status_chamado s ON s.id = ch.status_id
+                JOIN categorias cat ON cat.id = ch.categoria_id
+                WHERE {_lista_in('ch.cliente_id', bloco)}
+                    AND ch.data_resolucao IS NULL
+                    AND s.checklist = 1
+                ORDER BY ch.id
+            """, bloco)
+            for row in cursor.fetchall():
+                status_geral, categorias = estados[row['cliente_id']]
+                if row['geral']:
+                    # O chamado 'Geral' é a autoridade do status geral
+                    estados[row['cliente_id']] = (row['status'], categorias)
+                    continue
+                if status_geral is None:
+                    estados[row['cliente_id']] = (row['status'], categorias)
+                if row['observacao'] == 'N/A':
+                    categorias[row['categoria']] = ESTADO_NA
+                elif row['construcao']:
+                    categorias[row['categoria']] = ESTADO_CONSTRUCAO
+                else:
+                    categorias[row['categoria']] = ESTADO_PROBLEMA
+    return {
+        cliente_id: (status_geral or STATUS_CHECKLIST_PADRAO, categorias)
+        for cliente_id, (status_geral, categorias) in estados.items()
+    }
+
+def _chamados_desejados(cursor, status_geral, categorias):
+    """{categoria_id: (status_id, observacao)} dos chamados abertos que o checklist pede"""
+    status_geral_id = _id_status(cursor, status_geral)
+    desejados = {_id_categoria(cursor, "Geral"): (status_geral_id, OBSERVACAO_GERAL)}
+    for categoria, estado in categorias.items():
+        if estado == ESTADO_OK:
+            continue  # OK não precisa de chamado
+        if estado == ESTADO_NA:
+            alvo = (status_geral_id, "N/A")
+        elif "🛠" in estado or "Em Construção" in estado:
+            alvo = (_id_status(cursor, STATUS_CONSTRUCAO), f"Atualizado via checklist: {estado}")
+        else:
+            # "✗ Problema" (ou desconhecido): usa o status geral
+            alvo = (status_geral_id, f"Atualizado via checklist: {estado}")
+        desejados[_id_categoria(cursor, categoria)] = alvo
+    return desejados
+
+@com_retry
+def atualizar_checklists(alteracoes):
+    """
+    Aplica o checklist de vários clientes numa única transação, mexendo só no que mudou.
+    
+    Para cada cliente compara os chamados abertos de checklist com os que o novo estado pede
+    (um 'Geral' com o status geral e um por categoria que não esteja OK): chamado igual fica
+    como está, chamado com estado diferente é atualizado no lugar (mantém o id e a
+    data_abertura), o que falta é criado com a data de hoje e o que sobra é removido.
+    Todas as gravações usam executemany.
+    
+    Args:
+        alteracoes: {cliente_id: (status_geral, {categoria: estado})}, estado em ESTADOS_CHECKLIST
+    
+    Returns:
+        dict com inseridos, atualizados e removidos
+    """
+    hoje = datetime.now().date().isoformat()
     with get_db() as conn:
         cursor = conn.cursor()
         
-        # Remove TODOS os chamados abertos do tipo 3, 4 ou 6 deste cliente (incluindo Geral)
-        cursor.execute("""
-            DELETE FROM chamados 
-            WHERE cliente_id = ? 
-            AND (data_resolucao IS NULL OR data_resolucao = '')
-            AND status IN ('3. Novo cliente sem integração', '5. Implantado sem integração', '6. Integração Parcial', '8. Integração em construção')
-        """, (cliente_id,))
+        # Chamados abertos de checklist de todos os clientes do lote (em blocos de 500)
+        atuais = {}
+        ids = list(alteracoes)
+        for i in range(0, len(ids), 500):
+            bloco = ids[i:i + 500]
+            cursor.execute(f"""
+                SELECT id, cliente_id, categoria_id, status_id, observacao
+                FROM chamados
+                WHERE {_lista_in('cliente_id', bloco)}
+                    AND data_resolucao IS NULL
+                    AND status_id IN (SELECT id FROM status_chamado WHERE checklist = 1)
+                ORDER BY id
+            """, bloco)
+            for row in cursor.fetchall():
+                atuais.setdefault((row['cliente_id'], row['categoria_id']), []).append(row)
         
-        # SEMPRE cria um chamado "Geral" com o status escolhido pelo usuário
-        cursor.execute("""
-            INSERT INTO chamados (cliente_id, status, categoria, observacao, data_abertura)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            cliente_id, 
-            status_geral, 
-            "Geral", 
-            "Status geral do cliente",
-            datetime.now().date().isoformat()
-        ))
+        inserir, atualizar, remover = [], [], []
+        for cliente_id, (status_geral, categorias) in alteracoes.items():
+            desejados = _chamados_desejados(cursor, status_geral, categorias)
+            categorias_atuais = {cat for (cid, cat) in atuais if cid == cliente_id}
+            for categoria_id in categorias_atuais | set(desejados):
+                linhas = atuais.get((cliente_id, categoria_id), [])
+                alvo = desejados.get(categoria_id)
+                if alvo is None:
+                    remover += [(row['id'],) for row in linhas]
+                    continue
+                igual = next((row for row in linhas if (row['status_id'], row['observacao']) == alvo), None)
+                if igual is None and linhas:
+                    igual = linhas[0]
+                    atualizar.append(alvo + (igual['id'],))
+                elif igual is None:
+                    inserir.append((cliente_id, alvo[0], categoria_id, alvo[1], hoje))
+                remover += [(row['id'],) for row in linhas if row is not igual]
         
-        # Para cada categoria, cria chamado se necessário
-        for categoria, estado in categorias.items():
-            # OK não precisa de chamado - pula para próxima
-            if estado == "✓ OK":
-                continue
-            
-            # N/A cria um chamado especial para aparecer no dashboard
-            if estado == "N/A":
-                cursor.execute("""
-                    INSERT INTO chamados (cliente_id, status, categoria, observacao, data_abertura)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    cliente_id, 
-                    status_geral, 
-                    categoria, 
-                    "N/A",
-                    datetime.now().date().isoformat()
-                ))
-                continue
-            
-            # Determina o status baseado no estado
-            if "🛠" in estado or "Em Construção" in estado:
-                # Se tem emoji de martelo ou texto "Em Construção", é status 8
-                status_cat = "8. Integração em construção"
-            elif "✗" in estado or "Problema" in estado:
-                # Se tem X ou texto "Problema", usa o status geral (3 ou 4)
-                status_cat = status_geral
-            else:
-                # Fallback: usa o status geral
-                status_cat = status_geral
-            
-            # Cria o chamado
-            cursor.execute("""
-                INSERT INTO chamados (cliente_id, status, categoria, observacao, data_abertura)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                cliente_id, 
-                status_cat, 
-                categoria, 
-                f"Atualizado via checklist: {estado}",
-                datetime.now().date().isoformat()
-            ))
+        cursor.executemany("DELETE FROM chamados WHERE id = ?", remover)
+        cursor.executemany("""
+            UPDATE chamados
+            SET status_id = ?, observacao = ?, atualizado_em = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, atualizar)
+        cursor.executemany("""
+            INSERT INTO chamados (cliente_id, status_id, categoria_id, observacao, data_abertura)
+            VALUES (?, ?, ?, ?, ?)
+        """, inserir)
+        return {'inseridos': len(inserir), 'atualizados': len(atualizar), 'removidos': len(remover)}
 
+@com_retry
 def limpar_checklist_cliente(cliente_id):
     """Remove todos os chamados de checklist (status 3, 4, 6) de um cliente"""
     with get_db() as conn:
@@ -392,22 +2194,24 @@ def limpar_checklist_cliente(cliente_id):
         cursor.execute("""
             DELETE FROM chamados 
             WHERE cliente_id = ? 
-            AND (data_resolucao IS NULL OR data_resolucao = '')
-            AND status IN ('3. Novo cliente sem integração', '5. Implantado sem integração', '6. Integração Parcial', '8. Integração em construção')
+            AND data_resolucao IS NULL
+            AND status_id IN (SELECT id FROM status_chamado WHERE checklist = 1)
         """, (cliente_id,))
         return cursor.rowcount
 
+@com_retry
 def deletar_chamados_por_status(status):
     """Deleta todos os chamados com um status específico"""
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute("""
             DELETE FROM chamados 
-            WHERE status = ?
-            AND (data_resolucao IS NULL OR data_resolucao = '')
+            WHERE status_id = (SELECT id FROM status_chamado WHERE nome = ?)
+            AND data_resolucao IS NULL
         """, (status,))
         return cursor.rowcount
 
+@com_retry
 def deletar_chamados_por_cliente(cliente_id):
     """Deleta todos os chamados abertos de um cliente específico"""
     with get_db() as conn:
@@ -415,7 +2219,532 @@ def deletar_chamados_por_cliente(cliente_id):
         cursor.execute("""
             DELETE FROM chamados 
             WHERE cliente_id = ?
-            AND (data_resolucao IS NULL OR data_resolucao = '')
+            AND data_resolucao IS NULL
         """, (cliente_id,))
         return cursor.rowcount
 
+# ==================== IMPORTAÇÃO EM LOTE ====================
+
+# Colunas aceitas no arquivo de importação (cliente, status e categoria são obrigatórias)
+COLUNAS_IMPORTACAO = ('cliente', 'status', 'categoria', 'observacao', 'data_abertura',
+                      'data_resolucao', 'resolucao', 'classificacao')
+IMPORTACAO_MAX_ERROS = 100
+
+def _ler_csv(arquivo):
+    """Lê um CSV (caminho ou arquivo binário) linha a linha, detectando o separador (, ; ou tab)"""
+    proprio = isinstance(arquivo, (str, os.PathLike))
+    if proprio:
+        arquivo = open(arquivo, 'rb')
+    texto = io.TextIOWrapper(arquivo, encoding='utf-8-sig', newline='')
+    try:
+        amostra = texto.read(8192)
+        texto.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=',;\t')
+        except csv.Error:
+            dialeto = csv.excel
+        leitor = csv.DictReader(texto, dialect=dialeto)
+        if leitor.fieldnames:
+            leitor.fieldnames = [coluna.strip().lower() for coluna in leitor.fieldnames]
+        for linha in leitor:
+            yield linha
+    finally:
+        texto.detach()  # não fecha o arquivo de quem chamou (ex.: upload do Streamlit)
+        if proprio:
+            arquivo.close()
+
+def _ler_xlsx(arquivo):
+    """Lê a primeira planilha de um XLSX em modo streaming (requer openpyxl)"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RuntimeError("Para importar .xlsx instale o openpyxl (pip install openpyxl)")
+    planilha = load_workbook(arquivo, read_only=True, data_only=True).worksheets[0]
+    linhas = planilha.iter_rows(values_only=True)
+    cabecalho = [str(c).strip().lower() if c is not None else '' for c in next(linhas, ())]
+    for valores in linhas:
+        yield dict(zip(cabecalho, valores))
+
+def ler_arquivo_importacao(arquivo, nome_arquivo=None):
+    """
+    Gera as linhas (dicts) de um arquivo CSV ou XLSX, sem carregá-lo inteiro na memória.
+    arquivo pode ser um caminho ou um arquivo binário aberto (ex.: upload do Streamlit);
+    o formato é escolhido pela extensão de nome_arquivo (ou do caminho). Os nomes das
+    colunas vêm sem espaços e em minúsculas.
+    """
+    nome = (nome_arquivo or (arquivo if isinstance(arquivo, str) else '')).lower()
+    if nome.endswith(('.xlsx', '.xlsm')):
+        return _ler_xlsx(arquivo)
+    return _ler_csv(arquivo)
+
+@lru_cache(maxsize=4096)
+def _normalizar_data_texto(texto):
+    """'AAAA-MM-DD[ hh:mm:ss]' ou 'DD/MM/AAAA' -> 'AAAA-MM-DD' (datas se repetem muito num arquivo)"""
+    try:
+        return date.fromisoformat(texto[:10]).isoformat()
+    except ValueError:
+        pass
+    try:
+        dia, mes, ano = texto.split('/')
+        return date(int(ano), int(mes), int(dia)).isoformat()
+    except ValueError:
+        raise ValueError(f"data inválida: {texto!r}")
+
+def _normalizar_data(valor):
+    """Converte date/datetime, 'AAAA-MM-DD' ou 'DD/MM/AAAA' em 'AAAA-MM-DD' (vazio = None)"""
+    if valor is None:
+        return None
+    if isinstance(valor, datetime):
+        return valor.date().isoformat()
+    if isinstance(valor, date):
+        return valor.isoformat()
+    texto = str(valor).strip()
+    return _normalizar_data_texto(texto) if texto else None
+
+def _texto(linha, coluna):
+    """Valor da coluna como texto sem espaços nas pontas (None se vazio)"""
+    valor = linha.get(coluna)
+    if valor is None:
+        return None
+    if not isinstance(valor, str):
+        valor = str(valor)
+    return valor.strip() or None
+
+def importar_chamados(linhas, tamanho_lote=5000, simular=False, ao_progresso=None):
+    """
+    Importa clientes e chamados em lote, numa única transação.
+    
+    Cada linha (dict com as colunas de COLUNAS_IMPORTACAO, em minúsculas) vira um chamado; o cliente é
+    criado pelo nome se ainda não existir (a comparação ignora maiúsculas) e, se a linha
+    trouxer classificacao, o responsável é atualizado. Status e categoria precisam existir
+    nas tabelas de códigos. Linhas com data_resolucao entram resolvidas, como em
+    resolver_chamado. Linhas inválidas são puladas e listadas em 'erros'.
+    
+    Args:
+        linhas: iterável de dicts (ex.: ler_arquivo_importacao), consumido em lotes
+        tamanho_lote: linhas validadas e gravadas (executemany) por vez
+        simular: só valida, sem gravar nada
+        ao_progresso: função chamada com o total de linhas lidas após cada lote
+    
+    Returns:
+        dict com linhas, importados, clientes_novos, total_erros, erros [(linha, mensagem)],
+        segundos e linhas_por_segundo
+    
+    Não usa com_retry: as linhas podem vir de um gerador, que não dá para reler.
+    """
+    inicio = time.perf_counter()
+    relatorio = {'linhas': 0, 'importados': 0, 'clientes_novos': 0, 'total_erros': 0, 'erros': []}
+    
+    def erro(numero, mensagem):
+        relatorio['total_erros'] += 1
+        if len(relatorio['erros']) < IMPORTACAO_MAX_ERROS:
+            relatorio['erros'].append((numero, mensagem))
+    
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, nome, normal FROM status_chamado")
+        status_ids = {}
+        normais = set()
+        for row in cursor.fetchall():
+            status_ids[row['nome'].lower()] = row['id']
+            if row['normal']:
+                normais.add(row['id'])
+        normal_id = _id_status(cursor, STATUS_NORMAL)
+        cursor.execute("SELECT id, nome FROM categorias")
+        categoria_ids = {row['nome'].lower(): row['id'] for row in cursor.fetchall()}
+        cursor.execute("SELECT id, nome FROM clientes")
+        cliente_ids = {row['nome'].lower(): row['id'] for row in cursor.fetchall()}
+        hoje = datetime.now().date().isoformat()
+        
+        if not simular:
+            # Dentro de trigger o FTS5 grava o índice linha a linha; na importação ele é
+            # alimentado de uma vez no final (mesma transação: um erro desfaz tudo, inclusive o DROP)
+            if not conn.in_transaction:
+                cursor.execute("BEGIN")  # o sqlite3 não abre transação sozinho antes de DDL
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM chamados")
+            ultimo_id = cursor.fetchone()[0]
+            cursor.execute("DROP TRIGGER IF EXISTS trg_fts_chamados_insert")
+        
+        iterador = iter(linhas)
+        numero = 1  # linha 1 do arquivo é o cabeçalho
+        while True:
+            lote = list(islice(iterador, tamanho_lote))
+            if not lote:
+                break
+            
+            # Valida o lote e separa os clientes que precisam ser criados/atualizados
+            validas = []
+            clientes = {}
+            for linha in lote:
+                numero += 1
+                if all(valor is None or valor == '' for valor in linha.values()):
+                    continue  # linha em branco (comum no fim de planilhas)
+                cliente = _texto(linha, 'cliente')
+                status = _texto(linha, 'status')
+                categoria = _texto(linha, 'categoria')
+                if not cliente or not status or not categoria:
+                    erro(numero, "cliente, status e categoria são obrigatórios")
+                    continue
+                status_id = status_ids.get(status.lower())
+                if status_id is None:
+                    erro(numero, f"status desconhecido: {status!r}")
+                    continue
+                categoria_id = categoria_ids.get(categoria.lower())
+                if categoria_id is None:
+                    erro(numero, f"categoria desconhecida: {categoria!r}")
+                    continue
+                try:
+                    data_abertura = _normalizar_data(linha.get('data_abertura')) or hoje
+                    data_resolucao = _normalizar_data(linha.get('data_resolucao'))
+                except ValueError as e:
+                    erro(numero, str(e))
+                    continue
+                
+                chave = cliente.lower()
+                classificacao = _texto(linha, 'classificacao')
+                if chave not in cliente_ids or classificacao:
+                    clientes[chave] = (cliente.title(), classificacao)
+                
+                status_original_id = None
+                if data_resolucao:
+                    # Resolvido: guarda o status original e marca como normal (igual a resolver_chamado)
+                    if status_id not in normais:
+                        status_original_id = status_id
+                    status_id = normal_id
+                validas.append((chave, status_id, categoria_id, _texto(linha, 'observacao') or '',
+                                data_abertura, data_resolucao, _texto(linha, 'resolucao'), status_original_id))
+            
+            relatorio['linhas'] = numero - 1
+            if not simular:
+                novos = [chave for chave in clientes if chave not in cliente_ids]
+                cursor.executemany(
+                    "INSERT INTO clientes (nome, classificacao) VALUES (?, COALESCE(?, 'Guilherme'))",
+                    [clientes[chave] for chave in novos]
+                )
+                # Busca os ids dos clientes novos (em blocos, por causa do limite de parâmetros)
+                for i in range(0, len(novos), 500):
+                    bloco = [clientes[chave][0] for chave in novos[i:i + 500]]
+                    cursor.execute(f"SELECT id, nome FROM clientes WHERE {_lista_in('nome', bloco)}", bloco)
+                    for row in cursor.fetchall():
+                        cliente_ids[row['nome'].lower()] = row['id']
+                relatorio['clientes_novos'] += len(novos)
+                criados = set(novos)
+                cursor.executemany("UPDATE clientes SET classificacao = ? WHERE id = ?", [
+                    (classificacao, cliente_ids[chave])
+                    for chave, (_, classificacao) in clientes.items()
+                    if classificacao and chave not in criados
+                ])
+                
+                cursor.executemany("""
+                    INSERT INTO chamados (cliente_id, status_id, categoria_id, observacao,
+                                          data_abertura, data_resolucao, resolucao, status_original_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, [(cliente_ids[linha[0]],) + linha[1:] for linha in validas])
+            else:
+                novos = [chave for chave in clientes if chave not in cliente_ids]
+                relatorio['clientes_novos'] += len(novos)
+                cliente_ids.update(dict.fromkeys(novos))
+            relatorio['importados'] += len(validas)
+            
+            if ao_progresso:
+                ao_progresso(relatorio['linhas'])
+        
+        if not simular:
+            cursor.execute("""
+                INSERT INTO fts_chamados (rowid, cliente, categoria, observacao, resolucao)
+                SELECT ch.id, c.nome, cat.nome, ch.observacao, ch.resolucao
+                FROM chamados ch
+                LEFT JOIN clientes c ON c.id = ch.cliente_id
+                LEFT JOIN categorias cat ON cat.id = ch.categoria_id
+                WHERE ch.id > ?
+            """, (ultimo_id,))
+            _criar_busca_texto(cursor)  # recria o trigger removido acima
+    
+    relatorio['segundos'] = time.perf_counter() - inicio
+    relatorio['linhas_por_segundo'] = relatorio['linhas'] / relatorio['segundos'] if relatorio['segundos'] else 0
+    return relatorio
+
+# ==================== EXPORTAÇÃO ====================
+# Os arquivos são gerados percorrendo o cursor em blocos (fetchmany), sem carregar tudo em memória.
+
+# Conjuntos exportáveis e o nome amigável de cada um
+EXPORTACOES = {
+    'abertos': 'Chamados abertos',
+    'historico': 'Histórico de resolvidos',
+    'checklist': 'Matriz do checklist',
+}
+EXPORTACAO_TAMANHO_BLOCO = 5000
+
+# Colunas numéricas das exportações; as demais são texto
+_COLUNAS_INTEIRAS = {'id', 'chamado_id', 'cliente_id'}
+
+def _consulta_exportacao(conjunto, filtros):
+    """(sql, params) do conjunto exportado, com os filtros de filtrar_chamados/obter_matriz_checklist"""
+    if conjunto == 'abertos':
+        return _consulta_chamados('abertos', **filtros)
+    if conjunto == 'historico':
+        return _consulta_chamados('resolvidos', **filtros)
+    if conjunto == 'checklist':
+        return _consulta_matriz_checklist(**filtros)
+    raise ValueError(f"Conjunto de exportação desconhecido: {conjunto} (use {', '.join(EXPORTACOES)})")
+
+def _blocos(cursor, tamanho_bloco):
+    """Percorre o resultado do cursor em listas de até tamanho_bloco linhas"""
+    return iter(lambda: cursor.fetchmany(tamanho_bloco), [])
+
+@contextmanager
+def _cursor_exportacao(conjunto, filtros):
+    """Cursor já executado sobre o conjunto; as colunas ficam em cursor.description mesmo sem linhas"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(*_consulta_exportacao(conjunto, filtros))
+        yield cursor
+
+def exportar_csv(destino, conjunto, tamanho_bloco=EXPORTACAO_TAMANHO_BLOCO, **filtros):
+    """
+    Exporta um conjunto de EXPORTACOES em CSV (UTF-8 com BOM, abre direto no Excel).
+    
+    Args:
+        destino: caminho ou arquivo binário aberto para escrita
+        conjunto: 'abertos', 'historico' ou 'checklist'
+        filtros: os mesmos de filtrar_chamados (abertos/historico) ou obter_matriz_checklist
+    
+    Returns:
+        número de linhas exportadas
+    """
+    proprio = isinstance(destino, (str, os.PathLike))
+    if proprio:
+        destino = open(destino, 'wb')
+    texto = io.TextIOWrapper(destino, encoding='utf-8-sig', newline='')
+    total = 0
+    try:
+        escritor = csv.writer(texto)
+        with _cursor_exportacao(conjunto, filtros) as cursor:
+            escritor.writerow([descricao[0] for descricao in cursor.description])
+            for linhas in _blocos(cursor, tamanho_bloco):
+                escritor.writerows(linhas)
+                total += len(linhas)
+        texto.flush()
+    finally:
+        texto.detach()  # não fecha o arquivo de quem chamou
+        if proprio:
+            destino.close()
+    return total
+
+def exportar_parquet(destino, conjunto, tamanho_bloco=50_000, **filtros):
+    """
+    Exporta um conjunto de EXPORTACOES em Parquet (requer pyarrow), um row group por bloco.
+    Mesmos argumentos e retorno de exportar_csv.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Para exportar em Parquet instale o pyarrow (pip install pyarrow)")
+    total = 0
+    with _cursor_exportacao(conjunto, filtros) as cursor:
+        esquema = pa.schema([
+            (descricao[0], pa.int64() if descricao[0] in _COLUNAS_INTEIRAS else pa.string())
+            for descricao in cursor.description
+        ])
+        with pq.ParquetWriter(destino, esquema) as escritor:
+            for linhas in _blocos(cursor, tamanho_bloco):
+                colunas = zip(*linhas)
+                escritor.write_batch(pa.record_batch(
+                    [pa.array(valores, type=campo.type) for valores, campo in zip(colunas, esquema)],
+                    schema=esquema,
+                ))
+                total += len(linhas)
+    return total
+
+# ==================== BACKUP ====================
+# Cópias online com a API de backup do SQLite, em passos de poucas páginas com uma pausa
+# entre eles: o app continua lendo e gravando durante a cópia. Os backups ficam na pasta
+# "backups" ao lado do banco, com rotação (mantém os mais recentes) e gzip opcional.
+BACKUP_PAGINAS_POR_PASSO = 256     # páginas copiadas por passo (~1 MB com páginas de 4 KB)
+BACKUP_PAUSA = 0.005               # segundos de pausa entre os passos
+BACKUP_MANTER = 14                 # quantos backups a rotação mantém
+BACKUP_PREFIXO = "integracoes_"
+_backup_lock = threading.Lock()    # um backup por vez neste processo
+
+def _pasta_backups(pasta=None):
+    """Pasta dos backups (padrão: 'backups' ao lado do banco atual)"""
+    return pasta or os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), "backups")
+
+def copiar_banco(destino, paginas_por_passo=BACKUP_PAGINAS_POR_PASSO, pausa=BACKUP_PAUSA):
+    """
+    Copia o banco para destino (caminho) com a API de backup online do SQLite: a cópia é
+    consistente mesmo com o app gravando, ao contrário de ler o arquivo .db direto.
+    
+    A cópia é feita dentro de uma transação de leitura na origem: com WAL ela enxerga um
+    instantâneo fixo e as gravações de outras conexões não a fazem recomeçar (sem isso,
+    um backup em passos pode nunca terminar enquanto houver escritas).
+    """
+    with get_db() as conn:
+        abriu_transacao = not conn.in_transaction
+        if abriu_transacao:
+            conn.execute("BEGIN")
+            conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()  # fixa o instantâneo
+        copia = sqlite3.connect(destino)
+        try:
+            conn.backup(copia, pages=paginas_por_passo,
+                        progress=lambda status, restantes, total: time.sleep(pausa) if restantes else None)
+            copia.execute("PRAGMA journal_mode = DELETE")  # arquivo único, sem -wal/-shm ao lado
+        finally:
+            copia.close()
+            if abriu_transacao:
+                conn.rollback()
+
+def verificar_backup(caminho):
+    """Roda PRAGMA integrity_check no backup (.db ou .db.gz) e retorna o resultado ('ok' se íntegro)"""
+    if caminho.endswith('.gz'):
+        with tempfile.TemporaryDirectory() as pasta:
+            descomprimido = os.path.join(pasta, 'verificacao.db')
+            with gzip.open(caminho, 'rb') as origem, open(descomprimido, 'wb') as destino:
+                shutil.copyfileobj(origem, destino)
+            return verificar_backup(descomprimido)
+    conn = sqlite3.connect(f"file:{caminho}?mode=ro", uri=True)
+    try:
+        return "\n".join(row[0] for row in conn.execute("PRAGMA integrity_check"))
+    finally:
+        conn.close()
+
+def criar_backup(pasta=None, comprimir=False, manter=BACKUP_MANTER):
+    """
+    Cria um backup verificado do banco e aplica a rotação.
+    
+    O arquivo (integracoes_AAAAMMDD_HHMMSS.db, ou .db.gz com comprimir) só é mantido se
+    passar no PRAGMA integrity_check; senão é apagado e a função levanta RuntimeError.
+    
+    Args:
+        pasta: destino (padrão: 'backups' ao lado do banco)
+        comprimir: grava o backup com gzip
+        manter: backups mantidos pela rotação (None = não rotaciona)
+    
+    Returns:
+        dict com arquivo, bytes, segundos e removidos (arquivos apagados pela rotação)
+    """
+    pasta = _pasta_backups(pasta)
+    os.makedirs(pasta, exist_ok=True)
+    inicio = time.perf_counter()
+    with _backup_lock:
+        nome = f"{BACKUP_PREFIXO}{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+        caminho = os.path.join(pasta, nome)
+        temporario = caminho + ".parcial"
+        try:
+            copiar_banco(temporario)
+            integridade = verificar_backup(temporario)
+            if integridade != "ok":
+                raise RuntimeError(f"Backup falhou no integrity_check: {integridade}")
+            if comprimir:
+                caminho += ".gz"
+                with open(temporario, 'rb') as origem, gzip.open(caminho, 'wb', compresslevel=6) as destino:
+                    shutil.copyfileobj(origem, destino, 1024 * 1024)
+                os.remove(temporario)
+            else:
+                os.replace(temporario, caminho)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+        removidos = rotacionar_backups(pasta, manter) if manter is not None else []
+    return {
+        'arquivo': caminho,
+        'bytes': os.path.getsize(caminho),
+        'segundos': time.perf_counter() - inicio,
+        'removidos': removidos,
+    }
+
+def listar_backups(pasta=None):
+    """Backups da pasta, do mais recente para o mais antigo: [{'arquivo', 'data', 'bytes'}]"""
+    pasta = _pasta_backups(pasta)
+    if not os.path.isdir(pasta):
+        return []
+    backups = []
+    for nome in os.listdir(pasta):
+        if not nome.startswith(BACKUP_PREFIXO) or not nome.endswith(('.db', '.db.gz')):
+            continue
+        try:
+            data = datetime.strptime(nome[len(BACKUP_PREFIXO):].split('.')[0], '%Y%m%d_%H%M%S')
+        except ValueError:
+            continue  # arquivo com o prefixo mas fora do padrão: não é nosso
+        caminho = os.path.join(pasta, nome)
+        backups.append({'arquivo': caminho, 'data': data, 'bytes': os.path.getsize(caminho)})
+    return sorted(backups, key=lambda backup: backup['data'], reverse=True)
+
+def rotacionar_backups(pasta=None, manter=BACKUP_MANTER):
+    """Apaga os backups mais antigos, mantendo os `manter` mais recentes; retorna os apagados"""
+    removidos = [backup['arquivo'] for backup in listar_backups(pasta)[manter:]]
+    for caminho in removidos:
+        os.remove(caminho)
+    return removidos
+
+def restaurar_backup(caminho):
+    """
+    Substitui o conteúdo do banco pelo do backup (.db ou .db.gz), também pela API de backup,
+    depois de verificar a integridade do arquivo. Os dados atuais são perdidos: faça um
+    criar_backup() antes se precisar deles.
+    """
+    integridade = verificar_backup(caminho)
+    if integridade != "ok":
+        raise RuntimeError(f"Backup corrompido, nada foi restaurado: {integridade}")
+    with tempfile.TemporaryDirectory() as pasta:
+        if caminho.endswith('.gz'):
+            descomprimido = os.path.join(pasta, 'restauracao.db')
+            with gzip.open(caminho, 'rb') as origem, open(descomprimido, 'wb') as destino:
+                shutil.copyfileobj(origem, destino)
+            caminho = descomprimido
+        origem = sqlite3.connect(f"file:{caminho}?mode=ro", uri=True)
+        destino = sqlite3.connect(DB_PATH, timeout=DB_BUSY_TIMEOUT)
+        try:
+            origem.backup(destino)
+        finally:
+            origem.close()
+            destino.close()
+    fechar_conexoes()
+    invalidar_cache()
+
+# Agendador: uma thread em segundo plano por processo que cria um backup sempre que o mais
+# recente da pasta ficar mais velho que o intervalo (vale também entre reinícios do app)
+_agendador = {'thread': None, 'parar': None}
+_agendador_lock = threading.Lock()
+
+def _rodar_agendador(intervalo, pasta, comprimir, manter, parar):
+    while not parar.is_set():
+        backups = listar_backups(pasta)
+        idade = (datetime.now() - backups[0]['data']).total_seconds() if backups else None
+        if idade is None or idade >= intervalo:
+            try:
+                criar_backup(pasta, comprimir=comprimir, manter=manter)
+            except Exception as e:
+                print(f"⚠️ Backup agendado falhou: {e}")
+            idade = 0
+        parar.wait(max(intervalo - idade, 1))
+
+def iniciar_backups_periodicos(intervalo_horas=24, pasta=None, comprimir=True, manter=BACKUP_MANTER):
+    """
+    Inicia (uma única vez por processo) a thread que faz backups a cada intervalo_horas.
+    Chamar de novo com a thread rodando não faz nada; intervalo_horas <= 0 desativa.
+    """
+    if intervalo_horas <= 0:
+        return False
+    with _agendador_lock:
+        if _agendador['thread'] is not None and _agendador['thread'].is_alive():
+            return False
+        parar = threading.Event()
+        thread = threading.Thread(
+            target=_rodar_agendador,
+            args=(intervalo_horas * 3600, _pasta_backups(pasta), comprimir, manter, parar),
+            name="backup-agendado",
+            daemon=True,
+        )
+        _agendador.update(thread=thread, parar=parar)
+        thread.start()
+        return True
+
+def parar_backups_periodicos():
+    """Para a thread de backups periódicos (se estiver rodando)"""
+    with _agendador_lock:
+        if _agendador['parar'] is not None:
+            _agendador['parar'].set()
+            _agendador['thread'].join()
+            _agendador.update(thread=None, parar=None)
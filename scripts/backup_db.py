@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""scripts/backup_db.py
+
+Backups do integracoes.db pela API de backup online do SQLite (pode rodar com o app aberto).
+Cada backup é verificado com PRAGMA integrity_check antes de ser mantido.
+
+Uso:
+  # Cria um backup em ./backups (mantém os 14 mais recentes)
+  python scripts/backup_db.py
+  python scripts/backup_db.py --comprimir --manter 30 --pasta D:/backups
+
+  # Lista / verifica / restaura
+  python scripts/backup_db.py --listar
+  python scripts/backup_db.py --verificar backups/integracoes_20260123_020000.db.gz
+  python scripts/backup_db.py --restaurar backups/integracoes_20260123_020000.db.gz --apply
+
+  # Fica rodando e faz um backup a cada 6 horas (alternativa ao agendador do Windows/cron)
+  python scripts/backup_db.py --agendar 6 --comprimir
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import database  # noqa: E402
+
+
+def find_db():
+    repo = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    path = os.path.join(repo, 'integracoes.db')
+    if not os.path.exists(path):
+        print('Banco integracoes.db não encontrado no workspace.', file=sys.stderr)
+        sys.exit(2)
+    return path
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description='Backup online do banco (API de backup do SQLite)')
+    p.add_argument('--db', help='Banco de origem (padrão: integracoes.db do projeto)')
+    p.add_argument('--pasta', help='Pasta dos backups (padrão: backups/ ao lado do banco)')
+    p.add_argument('--comprimir', action='store_true', help='Grava o backup com gzip (.db.gz)')
+    p.add_argument('--manter', type=int, default=database.BACKUP_MANTER, help='Backups mantidos pela rotação')
+    acao = p.add_mutually_exclusive_group()
+    acao.add_argument('--listar', action='store_true', help='Lista os backups existentes')
+    acao.add_argument('--verificar', metavar='ARQUIVO', help='Roda o integrity_check num backup')
+    acao.add_argument('--restaurar', metavar='ARQUIVO', help='Substitui o banco pelo backup (requer --apply)')
+    acao.add_argument('--agendar', type=float, metavar='HORAS', help='Faz um backup a cada HORAS até ser interrompido')
+    p.add_argument('--apply', action='store_true', help='Confirma a restauração')
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    database.DB_PATH = args.db or find_db()
+
+    if args.listar:
+        backups = database.listar_backups(args.pasta)
+        for backup in backups:
+            print(f"{backup['data']:%Y-%m-%d %H:%M:%S}  {backup['bytes'] / 1024 / 1024:8.1f} MB  {backup['arquivo']}")
+        print(f'{len(backups)} backup(s).')
+        return
+
+    if args.verificar:
+        resultado = database.verificar_backup(args.verificar)
+        print('✅ Íntegro.' if resultado == 'ok' else f'❌ Problemas encontrados:\n{resultado}')
+        sys.exit(0 if resultado == 'ok' else 1)
+
+    if args.restaurar:
+        if not args.apply:
+            print(f'Isto substitui {database.DB_PATH} pelo conteúdo de {args.restaurar}. Use --apply para confirmar.')
+            return
+        antes = database.criar_backup(args.pasta, comprimir=args.comprimir, manter=None)
+        print('Backup do estado atual:', antes['arquivo'])
+        try:
+            database.restaurar_backup(args.restaurar)
+        except Exception as e:
+            print('Erro ao restaurar:', e, file=sys.stderr)
+            sys.exit(1)
+        print('Restaurado.')
+        return
+
+    if args.agendar:
+        print(f'Backup a cada {args.agendar}h (Ctrl+C para parar).')
+        database.iniciar_backups_periodicos(args.agendar, args.pasta, args.comprimir, args.manter)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            database.parar_backups_periodicos()
+        return
+
+    try:
+        resultado = database.criar_backup(args.pasta, comprimir=args.comprimir, manter=args.manter)
+    except Exception as e:
+        print('Erro no backup:', e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        database.fechar_conexoes()
+    print(f"Backup criado: {resultado['arquivo']} ({resultado['bytes'] / 1024 / 1024:.1f} MB em {resultado['segundos']:.1f}s)")
+    for caminho in resultado['removidos']:
+        print('Removido pela rotação:', caminho)
+
+
+if __name__ == '__main__':
+    main()
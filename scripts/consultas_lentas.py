@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""scripts/consultas_lentas.py
+
+Relatório do log de consultas lentas (consultas_lentas.jsonl ao lado do banco, gravado pelo
+database.py para todo comando acima de BI_CONSULTA_LENTA_MS, padrão 250 ms): agrupa os
+comandos iguais e lista os piores pelo tempo total, com o plano (EXPLAIN QUERY PLAN) da
+execução mais lenta.
+
+Uso:
+  python scripts/consultas_lentas.py                          # 10 piores por tempo total
+  python scripts/consultas_lentas.py --top 5 --completo       # SQL inteiro, parâmetros e plano
+  python scripts/consultas_lentas.py --desde 2026-01-20 --ordem max
+  python scripts/consultas_lentas.py --arquivo D:/logs/consultas_lentas.jsonl
+
+Comandos que só diferem no tamanho de uma lista de parâmetros (IN (?, ?, ...)) contam
+como o mesmo comando.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import database  # noqa: E402
+
+ORDENS = {'total': 'total_ms', 'max': 'max_ms', 'media': 'media_ms', 'vezes': 'vezes'}
+
+
+def find_db():
+    repo = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    path = os.path.join(repo, 'integracoes.db')
+    if not os.path.exists(path):
+        print('Banco integracoes.db não encontrado no workspace.', file=sys.stderr)
+        sys.exit(2)
+    return path
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description='Piores consultas do log de consultas lentas')
+    p.add_argument('--arquivo', help='Log JSONL (padrão: consultas_lentas.jsonl ao lado do banco)')
+    p.add_argument('--db', help='Banco cujo log será lido (padrão: integracoes.db do projeto)')
+    p.add_argument('--top', type=int, default=10, help='Quantos comandos listar')
+    p.add_argument('--ordem', choices=ORDENS, default='total', help='Critério de ordenação')
+    p.add_argument('--desde', help='Só registros a partir desta data (AAAA-MM-DD)')
+    p.add_argument('--completo', action='store_true', help='Mostra o SQL inteiro, parâmetros e plano')
+    return p.parse_args()
+
+
+def normalizar(sql):
+    """Agrupa variações do mesmo comando: listas de '?' viram um só"""
+    return re.sub(r'\?(\s*,\s*\?)+', '?, ...', sql)
+
+
+def agrupar(registros):
+    grupos = {}
+    for registro in registros:
+        chave = normalizar(registro['sql'])
+        grupo = grupos.setdefault(chave, {
+            'sql': chave, 'vezes': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'linhas': 0,
+            'primeira': registro['data'], 'ultima': registro['data'], 'pior': registro,
+        })
+        grupo['vezes'] += 1
+        grupo['total_ms'] += registro['ms']
+        grupo['linhas'] += registro['linhas']
+        grupo['ultima'] = max(grupo['ultima'], registro['data'])
+        grupo['primeira'] = min(grupo['primeira'], registro['data'])
+        if registro['ms'] >= grupo['max_ms']:
+            grupo['max_ms'], grupo['pior'] = registro['ms'], registro
+    for grupo in grupos.values():
+        grupo['media_ms'] = grupo['total_ms'] / grupo['vezes']
+    return list(grupos.values())
+
+
+def ler_registros(caminho, desde=None):
+    registros = []
+    with open(caminho, encoding='utf-8') as f:
+        for numero, linha in enumerate(f, start=1):
+            try:
+                registro = json.loads(linha)
+            except json.JSONDecodeError:
+                print(f'Linha {numero} inválida, ignorada.', file=sys.stderr)
+                continue
+            if desde and registro['data'] < desde:
+                continue
+            registros.append(registro)
+    return registros
+
+
+def main():
+    args = parse_args()
+    if not args.arquivo:
+        database.DB_PATH = args.db or find_db()
+        args.arquivo = database.arquivo_consultas_lentas()
+    if not os.path.exists(args.arquivo):
+        print(f'Log {args.arquivo} não encontrado (nenhuma consulta passou do limite ainda?).', file=sys.stderr)
+        sys.exit(2)
+    registros = ler_registros(args.arquivo, args.desde)
+    if not registros:
+        print('Nenhuma consulta lenta registrada no período.')
+        return
+
+    grupos = sorted(agrupar(registros), key=lambda g: g[ORDENS[args.ordem]], reverse=True)
+    total = sum(g['total_ms'] for g in grupos)
+    print(f"{len(registros)} execuções lentas de {len(grupos)} comandos, {total / 1000:.1f}s no total "
+          f"({min(g['primeira'] for g in grupos)} a {max(g['ultima'] for g in grupos)})\n")
+    print(f"{'#':>3} {'total (s)':>10} {'vezes':>6} {'média (ms)':>11} {'máx (ms)':>10} {'linhas/vez':>11}  SQL")
+    for posicao, grupo in enumerate(grupos[:args.top], start=1):
+        sql = grupo['sql'] if args.completo else grupo['sql'][:80]
+        print(f"{posicao:3d} {grupo['total_ms'] / 1000:10.2f} {grupo['vezes']:6d} {grupo['media_ms']:11.1f} "
+              f"{grupo['max_ms']:10.1f} {grupo['linhas'] // grupo['vezes']:11d}  {sql}")
+        pior = grupo['pior']
+        if args.completo:
+            print(f"      parâmetros da mais lenta ({pior['data']}): {pior['parametros']}")
+        for linha in pior['plano'] or ['(sem plano)']:
+            print(f"      {linha}")
+        if args.completo:
+            print()
+
+
+if __name__ == '__main__':
+    main()
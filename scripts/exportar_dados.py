@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""scripts/exportar_dados.py
+
+Exporta chamados abertos, histórico de resolvidos ou a matriz do checklist em CSV ou
+Parquet, lendo o banco em blocos (não carrega tudo em memória). Com "banco", gera uma
+cópia consistente do integracoes.db pela API de backup do SQLite.
+
+Uso:
+  python scripts/exportar_dados.py abertos abertos.csv
+  python scripts/exportar_dados.py historico historico.parquet
+  python scripts/exportar_dados.py checklist matriz.csv --db outro.db
+  python scripts/exportar_dados.py banco copia.db
+
+O formato vem da extensão do arquivo de saída (.csv ou .parquet; Parquet requer pyarrow).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import database  # noqa: E402
+
+
+def find_db():
+    repo = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    path = os.path.join(repo, 'integracoes.db')
+    if not os.path.exists(path):
+        print('Banco integracoes.db não encontrado no workspace.', file=sys.stderr)
+        sys.exit(2)
+    return path
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description='Exportar dados do BI (CSV/Parquet) ou copiar o banco')
+    p.add_argument('conjunto', choices=[*database.EXPORTACOES, 'banco'], help='O que exportar')
+    p.add_argument('saida', help='Arquivo de saída (.csv, .parquet ou .db para "banco")')
+    p.add_argument('--db', help='Banco de origem (padrão: integracoes.db do projeto)')
+    p.add_argument('--lote', type=int, default=database.EXPORTACAO_TAMANHO_BLOCO, help='Linhas lidas por bloco')
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    database.DB_PATH = args.db or find_db()
+    if not os.path.exists(database.DB_PATH):
+        print(f'Banco {database.DB_PATH} não encontrado.', file=sys.stderr)
+        sys.exit(2)
+    extensao = os.path.splitext(args.saida)[1].lower()
+    if args.conjunto != 'banco' and extensao not in ('.csv', '.parquet'):
+        print('Use um arquivo de saída .csv ou .parquet.', file=sys.stderr)
+        sys.exit(2)
+
+    t0 = time.perf_counter()
+    try:
+        if args.conjunto == 'banco':
+            database.copiar_banco(args.saida)
+            total = None
+        else:
+            database.init_db()  # as consultas usam o schema atual (a cópia do banco sai como está)
+            exportar = database.exportar_parquet if extensao == '.parquet' else database.exportar_csv
+            total = exportar(args.saida, args.conjunto, tamanho_bloco=args.lote)
+    except Exception as e:
+        print('Erro ao exportar:', e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        database.fechar_conexoes()
+
+    segundos = time.perf_counter() - t0
+    if total is None:
+        print(f'Cópia do banco gravada em {args.saida} ({segundos:.1f}s)')
+    else:
+        print(f'{total} linhas exportadas para {args.saida} ({segundos:.1f}s)')
+
+
+if __name__ == '__main__':
+    main()
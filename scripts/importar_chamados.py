@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""scripts/importar_chamados.py
+
+Importa clientes e chamados em lote de um arquivo CSV ou XLSX.
+
+Colunas: cliente, status, categoria (obrigatórias), observacao, data_abertura,
+data_resolucao, resolucao, classificacao. Datas em AAAA-MM-DD ou DD/MM/AAAA.
+O CSV pode usar vírgula, ponto e vírgula ou tab como separador.
+
+Uso:
+  # Só valida (não grava nada)
+  python scripts/importar_chamados.py chamados.csv
+
+  # Importa (uma única transação: se algo falhar, nada é gravado)
+  python scripts/importar_chamados.py chamados.csv --apply
+  python scripts/importar_chamados.py planilha.xlsx --apply --lote 10000
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import database  # noqa: E402
+
+
+def find_db():
+    repo = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    path = os.path.join(repo, 'integracoes.db')
+    if not os.path.exists(path):
+        print('Banco integracoes.db não encontrado no workspace.', file=sys.stderr)
+        sys.exit(2)
+    return path
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description='Importar clientes e chamados (CSV/XLSX)')
+    p.add_argument('arquivo', help='Arquivo .csv ou .xlsx')
+    p.add_argument('--db', help='Banco de destino (padrão: integracoes.db do projeto)')
+    p.add_argument('--lote', type=int, default=5000, help='Linhas por lote (padrão: 5000)')
+    p.add_argument('--apply', action='store_true', help='Grava no banco (por padrão só valida)')
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not os.path.exists(args.arquivo):
+        print(f'Arquivo {args.arquivo} não encontrado.', file=sys.stderr)
+        sys.exit(2)
+    database.DB_PATH = args.db or find_db()
+    database.init_db()
+
+    def progresso(linhas):
+        print(f'  {linhas} linhas lidas...', end='\r', flush=True)
+
+    try:
+        relatorio = database.importar_chamados(
+            database.ler_arquivo_importacao(args.arquivo),
+            tamanho_lote=args.lote,
+            simular=not args.apply,
+            ao_progresso=progresso,
+        )
+    except Exception as e:
+        print('Erro ao importar (nada foi gravado):', e, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        database.fechar_conexoes()
+
+    print(f"Linhas lidas: {relatorio['linhas']}")
+    print(f"Chamados {'importados' if args.apply else 'válidos'}: {relatorio['importados']}")
+    print(f"Clientes novos: {relatorio['clientes_novos']}")
+    print(f"Tempo: {relatorio['segundos']:.1f}s ({relatorio['linhas_por_segundo']:.0f} linhas/s)")
+    if relatorio['total_erros']:
+        print(f"Linhas com erro (puladas): {relatorio['total_erros']}")
+        for numero, mensagem in relatorio['erros']:
+            print(f'  linha {numero}: {mensagem}')
+        if relatorio['total_erros'] > len(relatorio['erros']):
+            print(f"  ... e mais {relatorio['total_erros'] - len(relatorio['erros'])}")
+    if not args.apply:
+        print('Validação apenas. Use --apply para gravar.')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,38 @@
 #!/usr/bin/env python3
 """scripts/rename_statuses_simple.py
 
-
+Renomeia status, categorias e responsáveis (classificação), um por vez ou vários de uma vez
+a partir de um arquivo de mapeamento, numa única transação.
 
 Uso:
   # Ver
   python scripts/rename_statuses_simple.py --old "6. Integração Parcial" --new "6. Integração Nova"
 
-  # aplicar 
+  # aplicar
   python scripts/rename_statuses_simple.py --old "6. Integração Parcial" --new "6. Integração Nova" --apply
 
-O script faz um backup simples do arquivo de banco antes de aplicar se --apply for usado.
+  # vários de uma vez (CSV com as colunas tipo,antigo,novo ou JSON {"status": {"antigo": "novo"}, ...})
+  python scripts/rename_statuses_simple.py --mapa renomeacoes.csv
+  python scripts/rename_statuses_simple.py --mapa renomeacoes.csv --apply --lote 200000
+
+Tipos: status, categoria, classificacao. O mapeamento é aplicado de uma vez, então trocas
+(A→B e B→A) funcionam. Se o nome novo já existe, os chamados do antigo são unificados nele.
+
+O script faz um backup verificado do banco (pasta backups/, pela API de backup do SQLite)
+antes de aplicar se --apply for usado.
+Com as tabelas de códigos (status_chamado, categorias), renomear altera uma única linha; só
+unificações e responsáveis reescrevem linhas, com UPDATE ... CASE em blocos de --lote ids.
+Bancos ainda no schema antigo são migrados (após o backup) antes de renomear.
 """
 import argparse
+import csv
+import json
 import os
-import shutil
 import sqlite3
 import sys
-from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import database  # noqa: E402
 
 
 def find_db():
@@ -30,59 +45,125 @@ def find_db():
 
 
 def backup_db(db_path):
-    ts = datetime.now().strftime('%Y%m%d_%H%M%S')
-    dest = f"{db_path}.backup.{ts}"
-    shutil.copy2(db_path, dest)
-    return dest
+    database.DB_PATH = db_path
+    try:
+        return database.criar_backup(manter=None)['arquivo']
+    finally:
+        database.fechar_conexoes()
 
 
 def parse_args():
-    p = argparse.ArgumentParser(description='Renomear status (simples)')
-    p.add_argument('--old', required=True, help='Status antigo (texto completo)')
-    p.add_argument('--new', required=True, help='Novo texto para o status')
+    p = argparse.ArgumentParser(description='Renomear status, categorias e responsáveis')
+    p.add_argument('--old', help='Status antigo (texto completo)')
+    p.add_argument('--new', help='Novo texto para o status')
+    p.add_argument('--db', help='Banco a alterar (padrão: integracoes.db do projeto)')
+    p.add_argument('--mapa', help='Arquivo .csv (tipo,antigo,novo) ou .json com várias renomeações')
+    p.add_argument('--lote', type=int, default=100_000, help='Faixa de ids por UPDATE (padrão: 100000)')
     p.add_argument('--apply', action='store_true', help='Aplica as alterações (por padrão é dry-run)')
-    return p.parse_args()
+    args = p.parse_args()
+    if not args.mapa and not (args.old and args.new):
+        p.error('informe --old e --new, ou --mapa')
+    return args
+
+
+def ler_mapa(caminho):
+    """{'status': {antigo: novo}, 'categoria': {...}, 'classificacao': {...}} a partir do arquivo"""
+    if caminho.lower().endswith('.json'):
+        with open(caminho, encoding='utf-8') as f:
+            mapa = json.load(f)
+    else:
+        mapa = {}
+        with open(caminho, encoding='utf-8-sig', newline='') as f:
+            for numero, linha in enumerate(csv.DictReader(f), start=2):
+                tipo = (linha.get('tipo') or '').strip().lower()
+                antigo, novo = (linha.get('antigo') or '').strip(), (linha.get('novo') or '').strip()
+                if not (tipo and antigo and novo):
+                    print(f'Linha {numero} incompleta, ignorada.', file=sys.stderr)
+                    continue
+                mapa.setdefault(tipo, {})[antigo] = novo
+    desconhecidos = set(mapa) - set(database.TIPOS_RENOMEACAO)
+    if desconhecidos:
+        print(f"Tipo inválido no mapa: {', '.join(sorted(desconhecidos))} "
+              f"(use {', '.join(database.TIPOS_RENOMEACAO)})", file=sys.stderr)
+        sys.exit(2)
+    return mapa
+
+
+# Colunas de texto do schema antigo (antes das tabelas de códigos) para cada tipo
+COLUNAS_SCHEMA_ANTIGO = {
+    'status': [('chamados', 'status'), ('chamados', 'status_original')],
+    'categoria': [('chamados', 'categoria')],
+    'classificacao': [('clientes', 'classificacao')],
+}
+
+
+def contar_schema_antigo(cur, mapa):
+    """Contagens do dry-run num banco ainda sem as tabelas de códigos (status gravado como texto)"""
+    for tipo, renomeacoes in mapa.items():
+        for antigo, novo in renomeacoes.items():
+            contagens = []
+            for tabela, coluna in COLUNAS_SCHEMA_ANTIGO[tipo]:
+                cur.execute(f'SELECT COUNT(*) FROM {tabela} WHERE {coluna} = ?', (antigo,))
+                contagens.append(f'{coluna}={cur.fetchone()[0]}')
+            print(f"{tipo}: '{antigo}' → '{novo}': {', '.join(contagens)}")
+
+
+def imprimir_itens(itens):
+    for item in itens:
+        contagens = ', '.join(f'{chave}={valor}' for chave, valor in item.items()
+                              if chave not in ('tipo', 'antigo', 'novo', 'acao'))
+        print(f"{item['tipo']}: '{item['antigo']}' → '{item['novo']}' [{item['acao']}]: {contagens}")
 
 
 def main():
     args = parse_args()
-    db = find_db()
+    db = args.db or find_db()
+    mapa = ler_mapa(args.mapa) if args.mapa else {'status': {args.old: args.new}}
+
     conn = sqlite3.connect(db)
     cur = conn.cursor()
-
-    # mostra contagens
-    cur.execute('SELECT COUNT(*) FROM chamados WHERE status = ?', (args.old,))
-    c1 = cur.fetchone()[0]
-    cur.execute('SELECT COUNT(*) FROM chamados WHERE status_original = ?', (args.old,))
-    c2 = cur.fetchone()[0]
-
-    print(f"Encontrado '{args.old}': status={c1}, status_original={c2}")
+    schema_atual = cur.execute('PRAGMA user_version').fetchone()[0] >= database.MIGRACOES[-1][0]
+    if not schema_atual and not args.apply:
+        print('Banco ainda no schema antigo (será migrado ao aplicar).')
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'status_chamado'")
+        if cur.fetchone() is None:
+            contar_schema_antigo(cur, mapa)
+    conn.close()
 
     if not args.apply:
+        if schema_atual:
+            database.DB_PATH = db
+            try:
+                imprimir_itens(database.renomear_em_lote(mapa, simular=True)['itens'])
+            finally:
+                database.fechar_conexoes()
         print('Dry-run. Use --apply para efetivar as mudanças.')
-        conn.close()
         return
 
     # backup
     bak = backup_db(db)
     print('Backup criado em:', bak)
 
-    # aplicar
-    cur.execute('BEGIN')
+    def progresso(etapa, feitos, total):
+        print(f'  {etapa}: {feitos}/{total} ids'.ljust(60), end='\r', flush=True)
+
+    # aplicar (garante o schema atual e aplica tudo numa transação)
+    database.DB_PATH = db
     try:
-        cur.execute('UPDATE chamados SET status = ? WHERE status = ?', (args.new, args.old))
-        u1 = cur.rowcount
-        cur.execute('UPDATE chamados SET status_original = ? WHERE status_original = ?', (args.new, args.old))
-        u2 = cur.rowcount
-        conn.commit()
+        database.init_db()
+        relatorio = database.renomear_em_lote(mapa, tamanho_lote=args.lote, ao_progresso=progresso)
     except Exception as e:
-        conn.rollback()
-        conn.close()
-        print('Erro ao aplicar:', e, file=sys.stderr)
+        print('\nErro ao aplicar (nada foi alterado):', e, file=sys.stderr)
         sys.exit(1)
+    finally:
+        database.fechar_conexoes()
 
-    conn.close()
-    print(f'Aplicado. Atualizado status={u1}, status_original={u2}')
+    print()
+    imprimir_itens(relatorio['itens'])
+    if not any(item['acao'] in ('renomear', 'unificar') for item in relatorio['itens']):
+        print('Nenhum dos nomes está cadastrado; nada a fazer.')
+        return
+    print(f"Aplicado em {relatorio['segundos']:.1f}s ({relatorio['linhas_alteradas']} linhas reescritas).")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""scripts/verificar_indices.py
+
+Verifica (via EXPLAIN QUERY PLAN) se as consultas de listagem do database.py usam índice.
+Roda sobre uma cópia do banco (as migrações são aplicadas na cópia, nunca no original).
+
+Uso:
+  python scripts/verificar_indices.py
+  python scripts/verificar_indices.py --db caminho/outro.db
+
+Sai com código 1 se alguma consulta fizer varredura completa em chamados/clientes
+ou precisar ordenar os chamados abertos em memória.
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO)
+import database  # noqa: E402
+
+# Funções verificadas e os trechos de plano que não podem aparecer em cada uma
+FUNCOES_VERIFICADAS = {
+    'listar_clientes': [],
+    'listar_clientes_pagina': ['USE TEMP B-TREE FOR ORDER BY'],
+    'listar_chamados_abertos': ['USE TEMP B-TREE FOR ORDER BY'],
+    'listar_chamados_abertos_completos': ['USE TEMP B-TREE FOR ORDER BY'],
+    'listar_chamados_problemas': [],
+    'filtrar_chamados': ['USE TEMP B-TREE FOR ORDER BY'],
+    'listar_opcoes_filtro': [],
+    'listar_chamados_resolvidos': ['USE TEMP B-TREE FOR ORDER BY'],
+    'listar_chamados_resolvidos_pagina': ['USE TEMP B-TREE FOR ORDER BY'],
+    'listar_totais_por_cliente': [],
+    'obter_checklist_por_cliente': [],
+    'obter_matriz_checklist': [],
+}
+
+# "SCAN ch" / "SCAN chamados" / "SCAN clientes" sem "USING ... INDEX" = varredura da tabela
+VARREDURA_COMPLETA = re.compile(r'^SCAN (ch|c|chamados|clientes)$')
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description='Verifica o uso de índices nas consultas')
+    p.add_argument('--db', default=os.path.join(REPO, 'integracoes.db'), help='Banco a copiar para a verificação')
+    return p.parse_args()
+
+
+def copiar_banco(origem, destino):
+    """Copia o banco com a API de backup (consistente mesmo com o app rodando)"""
+    src = sqlite3.connect(origem)
+    dst = sqlite3.connect(destino)
+    with dst:
+        src.backup(dst)
+    src.close()
+    dst.close()
+
+
+def planos_da_funcao(nome):
+    """Executa a função capturando as consultas e retorna [(sql, [linhas do plano])]"""
+    func = getattr(database, nome)
+    func = getattr(func, '__wrapped__', func)  # ignora o cache
+    comandos = []
+    with database.get_db() as conn:
+        conn.set_trace_callback(comandos.append)
+        try:
+            func()
+        finally:
+            conn.set_trace_callback(None)
+        planos = []
+        for sql in comandos:
+            if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+                continue
+            plano = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql)]
+            planos.append((sql, plano))
+    return planos
+
+
+def main():
+    args = parse_args()
+    if not os.path.exists(args.db):
+        print(f'Banco {args.db} não encontrado.', file=sys.stderr)
+        sys.exit(2)
+
+    falhas = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = os.path.join(tmp, 'verificacao.db')
+        copiar_banco(args.db, database.DB_PATH)
+        database.init_db()
+
+        for nome, proibidos in FUNCOES_VERIFICADAS.items():
+            for sql, plano in planos_da_funcao(nome):
+                problemas = [linha for linha in plano if VARREDURA_COMPLETA.match(linha)]
+                problemas += [linha for linha in plano if any(p in linha for p in proibidos)]
+                marca = '❌' if problemas else '✅'
+                print(f'{marca} {nome}')
+                for linha in plano:
+                    print(f'     {linha}')
+                if problemas:
+                    falhas += 1
+        database.fechar_conexoes()
+
+    if falhas:
+        print(f'{falhas} consulta(s) sem uso adequado de índice.', file=sys.stderr)
+        sys.exit(1)
+    print('Todas as consultas usam índice.')
+
+
+if __name__ == '__main__':
+    main()